@@ -1,5 +1,3 @@
-print("Hello World!")
-print("Hello World!\nHey again!")
 # i = 3
 # i += 3
 # print(i)
@@ -19,20 +17,36 @@ print("Hello World!\nHey again!")
 # print("a: ", a)
 # print("b: ", b)
 
-print("Hello " + input("What is your name?") + "!")
+def greeting(name: str) -> str:
+    """Greeting for the user."""
+    return "Hello " + name + "!"
 
-#1. Create a greeting for your program.
-print("Welcome to the Band Name Generator")
+def band_name(city_name: str, pet_name: str) -> str:
+    """Combine the name of a city and a pet into a band name."""
+    return f"{city_name} {pet_name}"
 
-#2. Ask the user for the city that they grew up in.
-city_name = input("What's the name of the city you grew up in?\n")
+def main():
+    print("Hello World!")
+    print("Hello World!\nHey again!")
 
-#3. Ask the user for the name of a pet.
-pet_name = input("What's your pet's name?\n")
+    print(greeting(input("What is your name?")))
 
-#4. Combine the name of their city and pet and show them their band name.
+    #1. Create a greeting for your program.
+    print("Welcome to the Band Name Generator")
 
-print("Your band name could be", city_name , pet_name)
+    #2. Ask the user for the city that they grew up in.
+    city_name = input("What's the name of the city you grew up in?\n")
 
-#5. Make sure the input cursor shows on a new line, see the example at:
-#   https://band-name-generator-end.appbrewery.repl.run/
\ No newline at end of file
+    #3. Ask the user for the name of a pet.
+    pet_name = input("What's your pet's name?\n")
+
+    #4. Combine the name of their city and pet and show them their band name.
+
+    print("Your band name could be", band_name(city_name, pet_name))
+
+    #5. Make sure the input cursor shows on a new line, see the example at:
+    #   https://band-name-generator-end.appbrewery.repl.run/
+
+# Nothing runs on import, so the functions above can be reused
+if __name__ == "__main__":
+    main()
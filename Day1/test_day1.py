@@ -0,0 +1,10 @@
+# test_day1.py
+from Day1 import band_name, greeting
+
+
+def test_greeting():
+    assert greeting("Ada") == "Hello Ada!"
+    assert greeting("") == "Hello !"
+
+def test_band_name():
+    assert band_name("Bristol", "Rabbit") == "Bristol Rabbit"
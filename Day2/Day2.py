@@ -13,17 +13,6 @@ def InputTest():
     print(int("5") / int(2.7)) #2.5
     print(int("5") // int(2.7)) #2
 
-InputTest()
-
-score = 100
-height = 1.8
-is_winning = True
-
-print(f"Your score is {score}, your height is {height}, you are winning is {is_winning}")
-print("Welcome to the tip calculator!")
-bill = float(input("What was the total bill? $"))
-tip = int(input("What percentage tip would you like to give? 10, 12, or 15? "))
-people = int(input("How many people to split the bill? "))
 def calculate_bill_per_person(bill, tip, people):
     tip_as_percent = tip / 100
     total_tip_amount = bill * tip_as_percent
@@ -32,9 +21,25 @@ def calculate_bill_per_person(bill, tip, people):
     final_amount = round(bill_per_person, 2)
     final_amount = "{:.2f}".format(final_amount) 
     return final_amount   
-def calculate_bill():
+
+def calculate_bill(bill, tip, people):
     final_amount = calculate_bill_per_person(bill, tip, people)
     print(f"Each person should pay: ${final_amount}") 
-calculate_bill()
 
+def main():
+    InputTest()
+
+    score = 100
+    height = 1.8
+    is_winning = True
+
+    print(f"Your score is {score}, your height is {height}, you are winning is {is_winning}")
+    print("Welcome to the tip calculator!")
+    bill = float(input("What was the total bill? $"))
+    tip = int(input("What percentage tip would you like to give? 10, 12, or 15? "))
+    people = int(input("How many people to split the bill? "))
+    calculate_bill(bill, tip, people)
 
+# Nothing runs on import; for many bills at once see bill_splitter.split_bills
+if __name__ == "__main__":
+    main()
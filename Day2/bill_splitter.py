@@ -0,0 +1,108 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Any, List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, plain sequences are handled in pure Python
+    np = None
+
+# Batch version of the Day2 tip calculator.
+# All money is handled as integer cents, so there is no float rounding error:
+#   per person = bill * (100 + tip%) / 100 / people, rounded to the cent (half to even, like round())
+
+
+def to_cents(amount: Any) -> int:
+    """Convert a money amount (int, float, str or Decimal) to integer cents."""
+    if isinstance(amount, int):
+        return amount * 100
+    # str() gives the shortest repr of a float, so 19.99 stays 19.99 and not 19.989999...
+    return int((Decimal(str(amount)) * 100).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+def format_cents(cents: int) -> str:
+    """Format integer cents like calculate_bill_per_person does ("{:.2f}")."""
+    sign = "-" if cents < 0 else ""
+    whole, part = divmod(abs(int(cents)), 100)
+    return f"{sign}{whole}.{part:02d}"
+
+
+def _check_columns(bills, tips, people):
+    if not len(bills) == len(tips) == len(people):
+        raise ValueError("Bills, tips and people must have the same length.")
+
+
+def split_bills(bills: Sequence[Any], tips: Sequence[int], people: Sequence[int], as_strings: bool = False):
+    """
+    Split many bills at once.
+
+    Args:
+        bills: total bill per row (money amounts; a NumPy array is processed in one vectorized pass).
+        tips: tip per row, as a whole percentage (10, 12, 15, ...).
+        people: number of people sharing each bill.
+        as_strings: return "12.34" strings instead of integer cents.
+
+    Returns:
+        Amount each person pays, per row, in integer cents (a NumPy array for NumPy input),
+        or a list of formatted strings when as_strings is True.
+    """
+    _check_columns(bills, tips, people)
+
+    if np is not None and any(isinstance(column, np.ndarray) for column in (bills, tips, people)):
+        cents = _split_bills_numpy(bills, tips, people)
+    else:
+        cents = _split_bills_python(bills, tips, people)
+
+    if as_strings:
+        return [format_cents(c) for c in cents]
+    return cents
+
+
+def _split_bills_python(bills, tips, people) -> List[int]:
+    result = []
+    for bill, tip, party in zip(bills, tips, people):
+        if party <= 0:
+            raise ValueError("Number of people must be positive.")
+        if int(party) != party:
+            raise ValueError("Number of people must be a whole number.")
+        if int(tip) != tip:
+            raise ValueError("Tip must be a whole percentage.")
+        numerator = to_cents(bill) * (100 + int(tip))
+        denominator = 100 * int(party)
+        quotient, remainder = divmod(numerator, denominator)
+        # Round half to even, the same rule round() uses
+        if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2 == 1):
+            quotient += 1
+        result.append(quotient)
+    return result
+
+
+def _split_bills_numpy(bills, tips, people):
+    tips = np.asarray(tips)
+    people = np.asarray(people)
+    if np.any(people <= 0):
+        raise ValueError("Number of people must be positive.")
+    if np.any(people != np.rint(people)):
+        raise ValueError("Number of people must be a whole number.")
+    party = people.astype(np.int64)
+    if np.any(tips != np.rint(tips)):
+        raise ValueError("Tip must be a whole percentage.")
+
+    bills = np.asarray(bills)
+    if bills.dtype.kind in "iu":
+        cents = bills.astype(np.int64) * 100
+    else:
+        # np.rint gives the same cents as to_cents, except for amounts on (or within float error of)
+        # half a cent: 0.575 * 100 == 57.49999999999999 rounds down, to_cents rounds the 0.575 that
+        # str() shows. Those few rows go through to_cents itself.
+        amounts = bills.astype(np.float64)
+        scaled = amounts * 100
+        cents = np.rint(scaled).astype(np.int64)
+        near_half = np.abs(np.abs(scaled - np.rint(scaled)) - 0.5) <= 1e-6 * np.maximum(1.0, np.abs(scaled))
+        for i in np.flatnonzero(near_half):
+            cents[i] = to_cents(float(amounts[i]))
+
+    numerator = cents * (100 + tips.astype(np.int64))
+    denominator = 100 * party
+    quotient, remainder = np.divmod(numerator, denominator)
+    round_up = (2 * remainder > denominator) | ((2 * remainder == denominator) & (quotient % 2 == 1))
+    return quotient + round_up
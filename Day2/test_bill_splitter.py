@@ -0,0 +1,52 @@
+# test_bill_splitter.py
+import pytest
+from bill_splitter import format_cents, split_bills, to_cents
+
+
+def test_to_cents():
+    assert to_cents(150) == 15000
+    assert to_cents(19.99) == 1999
+    assert to_cents("124.56") == 12456
+
+
+def test_format_cents():
+    assert format_cents(3380) == "33.80"
+    assert format_cents(5) == "0.05"
+    assert format_cents(-250) == "-2.50"
+
+
+def test_split_bills_matches_single_bill_calculator():
+    # 124.56 with 12% tip split by 7 -> 19.93 (the classic Day2 example)
+    assert split_bills([124.56], [12], [7], as_strings=True) == ["19.93"]
+    assert split_bills([150, 100.0, 33.33], [12, 10, 15], [5, 3, 1]) == [3360, 3667, 3833]
+
+
+def test_split_bills_rounds_half_to_even():
+    # 0.25 split by 2 -> 0.125 per person -> 0.12; 0.75 split by 2 -> 0.375 -> 0.38
+    assert split_bills([0.25, 0.75], [0, 0], [2, 2]) == [12, 38]
+
+
+def test_split_bills_invalid_rows():
+    with pytest.raises(ValueError, match="same length"):
+        split_bills([10, 20], [10], [1, 2])
+    with pytest.raises(ValueError, match="people must be positive"):
+        split_bills([10], [10], [0])
+    with pytest.raises(ValueError, match="whole percentage"):
+        split_bills([10], [12.5], [2])
+    with pytest.raises(ValueError, match="people must be a whole number"):
+        split_bills([10], [10], [2.5])
+
+
+def test_split_bills_numpy_matches_python():
+    np = pytest.importorskip("numpy")
+    bills, tips, people = [124.56, 150, 0.25, 0.75, 33.33], [12, 12, 0, 0, 15], [7, 5, 2, 2, 1]
+    result = split_bills(np.array(bills), np.array(tips), np.array(people))
+    assert result.tolist() == split_bills(bills, tips, people)
+    # Half-cent amounts: 0.575 * 100 is 57.4999... as a float, to_cents rounds the decimal 0.575
+    half_cents = [0.575, 1.005, 2.675, 0.125, 0.135, 1234567.125]
+    ones = [0] * len(half_cents), [1] * len(half_cents)
+    assert split_bills(half_cents, *ones) == [58, 100, 268, 12, 14, 123456712]
+    assert split_bills(np.array(half_cents), *map(np.array, ones)).tolist() == split_bills(half_cents, *ones)
+    with pytest.raises(ValueError, match="people must be a whole number"):
+        split_bills(np.array([10.0]), np.array([10]), np.array([2.5]))
+    assert split_bills(np.array([10.0]), np.array([10]), np.array([2.0])).tolist() == [550]
@@ -0,0 +1,12 @@
+# test_day2.py
+from Day2 import calculate_bill, calculate_bill_per_person
+
+
+def test_calculate_bill_per_person():
+    assert calculate_bill_per_person(150, 12, 5) == "33.60"
+    assert calculate_bill_per_person(124.56, 12, 7) == "19.93"
+    assert calculate_bill_per_person(100, 0, 3) == "33.33"
+
+def test_calculate_bill_prints_the_share(capsys):
+    calculate_bill(150, 12, 5)
+    assert capsys.readouterr().out == "Each person should pay: $33.60\n"
@@ -0,0 +1,37 @@
+# bench_bmi.py - per-call latency of interpret_bmi / bmi_category
+# Usage: python bench_bmi.py [calls]   (default: 10,000,000 calls per variant)
+import sys
+import time
+from itertools import cycle, islice
+
+from bmi_calculator import _bmi_category_uncached, _interpret_bmi_uncached, bmi_category, interpret_bmi
+
+
+def time_calls(func, values) -> float:
+    """Return seconds spent calling func once per value."""
+    start_time = time.perf_counter()
+    for value in values:
+        func(value)
+    return time.perf_counter() - start_time
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    # Typical adult BMIs, repeated to the requested number of calls
+    values = list(islice(cycle(range(15, 40)), calls))
+
+    baseline = time_calls(lambda value: None, values)  # cost of the loop and the call itself
+    variants = [
+        ("interpret_bmi (f-string, before)", _interpret_bmi_uncached),
+        ("interpret_bmi (lookup table)", interpret_bmi),
+        ("bmi_category (comparisons)", _bmi_category_uncached),
+        ("bmi_category (lookup table)", bmi_category),
+    ]
+    print(f"{calls:,} calls per variant, empty call: {baseline / calls * 1e9:.1f} ns/call")
+    for name, func in variants:
+        seconds = time_calls(func, values)
+        print(f"{name:34s} {seconds / calls * 1e9:7.1f} ns/call ({seconds:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,21 @@
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+from array import array
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, TextIO
+
 import pytest
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the batch API falls back to array.array
+    np = None
+
 def calculate_bmi(weight: float, height: float) -> float:
     """Calculate BMI based on weight and height."""
     if height <= 0:
@@ -9,17 +25,318 @@ def calculate_bmi(weight: float, height: float) -> float:
 
     return round(weight / (height ** 2))
 
-def interpret_bmi(bmi: float) -> str:
-    """Interpret BMI and return a string with the interpretation."""
+def _interpret_bmi_uncached(bmi: float) -> str:
+    """Build the interpretation string from scratch (any int or float BMI)."""
     if bmi < 18.5:
         return f"Your BMI is {bmi}, you are underweight."
     elif bmi < 25:
         return f"Your BMI is {bmi}, you have a normal weight."
     
     return f"Your BMI is {bmi}, you are overweight."
-    
 
-def main():
+
+# calculate_bmi returns a rounded int, so almost every BMI we see is a small
+# non-negative integer. Those messages are built once and looked up by index.
+BMI_TABLE_SIZE = 200
+_BMI_MESSAGES = tuple(sys.intern(_interpret_bmi_uncached(bmi)) for bmi in range(BMI_TABLE_SIZE))
+
+
+def interpret_bmi(bmi: float) -> str:
+    """Interpret BMI and return a string with the interpretation."""
+    # type() rather than isinstance(): True/False must not hit the table
+    if type(bmi) is int and 0 <= bmi < BMI_TABLE_SIZE:
+        return _BMI_MESSAGES[bmi]
+    return _interpret_bmi_uncached(bmi)
+
+# --- Batch API (many people per call) ---
+
+# Category codes returned by calculate_bmi_batch. Negative codes mark rows that
+# calculate_bmi would reject with a ValueError.
+BMI_UNDERWEIGHT = 0
+BMI_NORMAL = 1
+BMI_OVERWEIGHT = 2
+BMI_INVALID_HEIGHT = -1
+BMI_INVALID_WEIGHT = -2
+BMI_INVALID_VALUE = -3
+
+BMI_ERROR_MESSAGES = {
+    BMI_INVALID_HEIGHT: "Height must be positive.",
+    BMI_INVALID_WEIGHT: "Weight must be positive.",
+    BMI_INVALID_VALUE: "BMI is not a finite number that fits in 64 bits.",
+}
+
+
+class BmiBatch(NamedTuple):
+    """Result of calculate_bmi_batch, one entry per input row."""
+    bmi: Any    # rounded BMI (0 where the row is invalid)
+    codes: Any  # BMI_* category code
+    valid: Any  # True/1 where the row passed the calculate_bmi checks
+
+
+def _bmi_category_uncached(bmi: float) -> int:
+    if bmi < 18.5:
+        return BMI_UNDERWEIGHT
+    elif bmi < 25:
+        return BMI_NORMAL
+    return BMI_OVERWEIGHT
+
+
+_BMI_CATEGORIES = tuple(_bmi_category_uncached(bmi) for bmi in range(BMI_TABLE_SIZE))
+
+
+def bmi_category(bmi: float) -> int:
+    """Return the BMI_* category code that interpret_bmi would describe (no strings involved)."""
+    if type(bmi) is int and 0 <= bmi < BMI_TABLE_SIZE:
+        return _BMI_CATEGORIES[bmi]
+    return _bmi_category_uncached(bmi)
+
+
+def calculate_bmi_batch(weights: Sequence[float], heights: Sequence[float]) -> BmiBatch:
+    """
+    Calculate BMI and category codes for whole columns of weights and heights.
+
+    Invalid rows do not raise: they get a negative code (see BMI_ERROR_MESSAGES)
+    and a false entry in the `valid` mask, so one bad record does not stop the batch.
+    NumPy arrays are processed in one vectorized pass and give NumPy results;
+    any other sequence (e.g. array.array('d')) gives array.array results.
+    """
+    if len(weights) != len(heights):
+        raise ValueError("Weights and heights must have the same length.")
+
+    if np is not None and (isinstance(weights, np.ndarray) or isinstance(heights, np.ndarray)):
+        return _calculate_bmi_batch_numpy(weights, heights)
+    return _calculate_bmi_batch_python(weights, heights)
+
+
+def _calculate_bmi_batch_numpy(weights, heights) -> BmiBatch:
+    w = np.asarray(weights, dtype=np.float64)
+    h = np.asarray(heights, dtype=np.float64)
+
+    # Same order of checks as calculate_bmi: height first, then weight
+    bad_height = h <= 0
+    bad_weight = ~bad_height & (w <= 0)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        squared = h * h
+        raw = w / squared
+    # round() in calculate_bmi raises on NaN/inf, np.rint also rounds half to even.
+    # A non-finite h*h (h=1e200) gives a finite raw of 0, and raw >= 2**63 does not fit in int64:
+    # both are rejected here, before the int64 cast could turn them into garbage.
+    bad_value = ~bad_height & ~bad_weight & (~np.isfinite(raw) | ~np.isfinite(squared) | (raw >= 2.0 ** 63))
+    valid = ~(bad_height | bad_weight | bad_value)
+
+    bmi = np.where(valid, np.rint(np.where(valid, raw, 0.0)), 0).astype(np.int64)
+    codes = np.where(bmi < 18.5, BMI_UNDERWEIGHT, np.where(bmi < 25, BMI_NORMAL, BMI_OVERWEIGHT)).astype(np.int8)
+    codes[bad_height] = BMI_INVALID_HEIGHT
+    codes[bad_weight] = BMI_INVALID_WEIGHT
+    codes[bad_value] = BMI_INVALID_VALUE
+    return BmiBatch(bmi, codes, valid)
+
+
+def _calculate_bmi_batch_python(weights, heights) -> BmiBatch:
+    bmi = array("q", bytes(8 * len(weights)))
+    codes = array("b", bytes(len(weights)))
+    valid = array("b", bytes(len(weights)))
+
+    for i, (weight, height) in enumerate(zip(weights, heights)):
+        if height <= 0:
+            codes[i] = BMI_INVALID_HEIGHT
+        elif weight <= 0:
+            codes[i] = BMI_INVALID_WEIGHT
+        else:
+            try:
+                squared = height ** 2 # OverflowError for a huge height
+                if not math.isfinite(squared):
+                    raise OverflowError("height ** 2 is not finite")
+                # ZeroDivisionError when height ** 2 underflows to 0; round() raises on NaN/inf,
+                # and array('q') raises OverflowError for a BMI beyond int64
+                bmi[i] = round(weight / squared)
+            except (ZeroDivisionError, OverflowError, ValueError):
+                codes[i] = BMI_INVALID_VALUE
+                continue
+            codes[i] = bmi_category(bmi[i])
+            valid[i] = 1
+    return BmiBatch(bmi, codes, valid)
+
+
+def interpret_bmi_batch(batch: BmiBatch) -> List[str]:
+    """
+    Build the message for every row of a BmiBatch.
+    Valid rows get the interpret_bmi text, invalid rows the calculate_bmi error text.
+    Only call this when the strings are actually needed.
+    """
+    return [
+        interpret_bmi(int(bmi)) if valid else BMI_ERROR_MESSAGES[int(code)]
+        for bmi, code, valid in zip(batch.bmi, batch.codes, batch.valid)
+    ]
+
+
+# --- File-driven mode (stream CSV/JSONL records in fixed-size chunks) ---
+
+DEFAULT_CHUNK_SIZE = 10_000
+RESULT_FIELDS = ["height", "weight", "bmi", "interpretation"]
+REJECT_FIELDS = ["row", "height", "weight", "error"]
+
+
+class StreamStats(NamedTuple):
+    """Summary of one file-driven run."""
+    rows: int
+    rejected: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+def error_message(e: Exception) -> str:
+    """Return the message main() shows for an exception raised while scoring."""
+    if isinstance(e, ValueError):
+        return f"Error: {e}"
+    if isinstance(e, ZeroDivisionError):
+        return "Error: Height cannot be zero."
+    return f"An unexpected error occurred: {e}"
+
+
+def file_format(path: str) -> str:
+    """Pick 'jsonl' or 'csv' from the file extension."""
+    return "jsonl" if path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def iter_records(f: TextIO, fmt: str, fieldnames: Optional[List[str]] = None) -> Iterable[Any]:
+    """
+    Yield the raw records of an open input file, one per data row.
+    CSV rows come back as dicts, JSONL rows as the undecoded line so that
+    a malformed line is rejected by score_record instead of stopping the run.
+    """
+    if fmt == "jsonl":
+        return (line for line in f if line.strip())
+    return csv.DictReader(f, fieldnames=fieldnames)
+
+
+def score_record(record: Any) -> Dict[str, Any]:
+    """Score one record with calculate_bmi/interpret_bmi. Raises just like main() input would."""
+    if isinstance(record, str):
+        record = json.loads(record)
+    height = float(record["height"])
+    weight = float(record["weight"])
+    bmi = calculate_bmi(weight, height)
+    return {"height": height, "weight": weight, "bmi": bmi, "interpretation": interpret_bmi(bmi)}
+
+
+def _raw_field(record: Any, name: str) -> Any:
+    """Best-effort copy of an input field for the reject file."""
+    if isinstance(record, str):
+        try:
+            record = json.loads(record)
+        except ValueError:
+            return record.strip() if name == "height" else None
+    return record.get(name) if isinstance(record, dict) else None
+
+
+def make_writer(f: TextIO, fmt: str, fields: List[str], header: bool = True) -> Callable[[List[dict]], None]:
+    """Return a function that writes a list of dicts to `f` as CSV or JSONL."""
+    if fmt == "jsonl":
+        return lambda rows: f.write("".join(json.dumps(row) + "\n" for row in rows))
+    writer = csv.DictWriter(f, fieldnames=fields, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    return writer.writerows
+
+
+def score_records(
+    records: Iterable[Any],
+    write_results: Callable[[List[dict]], None],
+    write_rejects: Callable[[List[dict]], None],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    first_row: int = 1,
+) -> StreamStats:
+    """
+    Score `records` chunk by chunk, so only `chunk_size` rows are held in memory.
+    Good rows go to write_results, bad rows (with main()'s error text) to write_rejects.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive.")
+
+    start_time = time.perf_counter()
+    records = iter(records)
+    row_number = first_row
+    rows = rejected = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        results, rejects = [], []
+        for record in chunk:
+            try:
+                results.append(score_record(record))
+            except Exception as e:
+                rejects.append({
+                    "row": row_number,
+                    "height": _raw_field(record, "height"),
+                    "weight": _raw_field(record, "weight"),
+                    "error": error_message(e),
+                })
+            row_number += 1
+        write_results(results)
+        if rejects:
+            write_rejects(rejects)
+        rows += len(chunk)
+        rejected += len(rejects)
+    return StreamStats(rows, rejected, time.perf_counter() - start_time)
+
+
+def default_reject_path(out_path: str) -> str:
+    """results.csv -> results.rejects.csv"""
+    root, ext = os.path.splitext(out_path)
+    return f"{root}.rejects{ext}"
+
+
+def process_file(
+    in_path: str,
+    out_path: str,
+    reject_path: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> StreamStats:
+    """Stream `in_path` through score_records into `out_path` (and the reject file)."""
+    reject_path = reject_path or default_reject_path(out_path)
+    in_fmt, out_fmt, reject_fmt = file_format(in_path), file_format(out_path), file_format(reject_path)
+    with open(in_path, newline="", encoding="utf-8") as fin, \
+         open(out_path, "w", newline="", encoding="utf-8") as fout, \
+         open(reject_path, "w", newline="", encoding="utf-8") as frej:
+        return score_records(
+            iter_records(fin, in_fmt),
+            make_writer(fout, out_fmt, RESULT_FIELDS),
+            make_writer(frej, reject_fmt, REJECT_FIELDS),
+            chunk_size=chunk_size,
+        )
+
+
+def report(stats: StreamStats) -> str:
+    return (f"Processed {stats.rows} rows ({stats.rejected} rejected) in {stats.seconds:.2f}s "
+            f"- {stats.rows_per_second:,.0f} rows/sec")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="BMI calculator (interactive, or file-driven with --in/--out).")
+    parser.add_argument("--in", dest="in_path", help="input records (.csv or .jsonl) with height and weight")
+    parser.add_argument("--out", dest="out_path", help="output file (.csv or .jsonl)")
+    parser.add_argument("--rejects", dest="reject_path", help="reject file (default: <out>.rejects.<ext>)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    args = parser.parse_args(argv)
+    if bool(args.in_path) != bool(args.out_path):
+        parser.error("--in and --out must be used together")
+    return args
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the calculator. argv are the command-line options (none by default, so calling
+    main() from another script never parses that script's sys.argv)."""
+    args = parse_args(argv if argv is not None else [])
+    if args.in_path:
+        stats = process_file(args.in_path, args.out_path, args.reject_path, args.chunk_size)
+        print(report(stats))
+        return
+
     try:
         # Get height and weight inputs from the user
         height = float(input("Enter your height in meters: "))
@@ -31,16 +348,12 @@ def main():
         # Interpret BMI and print the result
         print(interpret_bmi(bmi))
 
-    except ValueError as e:
-        print(f"Error: {e}")
-    except ZeroDivisionError:
-        print("Error: Height cannot be zero.")
     except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+        print(error_message(e))
 
 # This makes the script runnable directrly but allows importing functions
 if  __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
 
 
 # BMI Calculator with Interpretations
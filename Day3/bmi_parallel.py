@@ -0,0 +1,204 @@
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from bmi_calculator import (
+    DEFAULT_CHUNK_SIZE, REJECT_FIELDS, RESULT_FIELDS,
+    default_reject_path, file_format, iter_records, make_writer, report, score_records, StreamStats,
+)
+
+# Multiprocess version of `bmi_calculator.py --in/--out`.
+# The input file is split into byte ranges (shards), every shard is scored by
+# score_records in its own worker process, and the per-shard part files are
+# concatenated back together in the original row order.
+
+
+class ShardTiming(NamedTuple):
+    """What one worker did."""
+    index: int
+    start: int      # first byte of the shard
+    end: int        # first byte after the shard
+    rows: int
+    rejected: int
+    seconds: float
+
+
+def _has_multiline_records(in_path: str, data_start: int) -> bool:
+    """
+    True if a quoted CSV field spans lines. Quotes inside a field are doubled (""), so a line
+    with an odd number of '"' characters opens (or closes) a field that continues on the next line.
+    """
+    with open(in_path, "rb") as f:
+        f.seek(data_start)
+        for block in iter(lambda: f.read(1 << 20), b""):
+            if b'"' in block:
+                break
+        else:
+            return False  # No quotes at all (the usual case): every newline ends a record
+        f.seek(data_start)
+        return any(line.count(b'"') % 2 for line in f)
+
+
+def plan_shards(in_path: str, shards: int) -> Tuple[Optional[List[str]], List[Tuple[int, int]]]:
+    """
+    Split the data part of `in_path` into `shards` byte ranges of (almost) equal size.
+    Returns the CSV header fields (None for JSONL) and the list of (start, end) ranges.
+    Ranges do not need to fall on line boundaries, read_shard_lines takes care of that.
+    Shards are aligned on lines, so a CSV whose quoted fields contain newlines (one record
+    over several lines) is not split: it gets a single shard, scored like process_file does.
+    """
+    if shards <= 0:
+        raise ValueError("Number of shards must be positive.")
+
+    fieldnames = None
+    data_start = 0
+    if file_format(in_path) == "csv":
+        with open(in_path, "rb") as f:
+            header = f.readline()
+        data_start = len(header)
+        fieldnames = next(csv.reader([header.decode("utf-8")]), [])
+        if _has_multiline_records(in_path, data_start):
+            shards = 1
+
+    size = os.path.getsize(in_path)
+    step = max(1, -(-(size - data_start) // shards))  # ceiling division
+    ranges = [(start, min(start + step, size)) for start in range(data_start, size, step)]
+    return fieldnames, ranges
+
+
+def read_shard_lines(in_path: str, start: int, end: int) -> Iterator[str]:
+    """
+    Yield the lines that *begin* inside [start, end).
+    A line that starts in this shard but ends in the next one still belongs here,
+    so every line is read by exactly one shard.
+    """
+    with open(in_path, "rb") as f:
+        if start > 0:
+            # Skip the tail of a line that started in the previous shard
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode("utf-8")
+
+
+def score_shard(
+    index: int,
+    in_path: str,
+    start: int,
+    end: int,
+    fieldnames: Optional[List[str]],
+    out_part: str,
+    reject_part: str,
+    chunk_size: int,
+) -> ShardTiming:
+    """Worker: score one shard into its own (header-less) result and reject part files."""
+    in_fmt, out_fmt, reject_fmt = file_format(in_path), file_format(out_part), file_format(reject_part)
+    with open(out_part, "w", newline="", encoding="utf-8") as fout, \
+         open(reject_part, "w", newline="", encoding="utf-8") as frej:
+        stats = score_records(
+            iter_records(read_shard_lines(in_path, start, end), in_fmt, fieldnames),
+            make_writer(fout, out_fmt, RESULT_FIELDS, header=False),
+            make_writer(frej, reject_fmt, REJECT_FIELDS, header=False),
+            chunk_size=chunk_size,
+        )
+    return ShardTiming(index, start, end, stats.rows, stats.rejected, stats.seconds)
+
+
+def _part_path(path: str, index: int) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.part{index}{ext}"
+
+
+def _merge_rejects(parts: List[str], timings: List[ShardTiming], reject_path: str):
+    """Concatenate reject parts, turning shard-local row numbers into file row numbers."""
+    fmt = file_format(reject_path)
+    row_offset = 0
+    with open(reject_path, "w", newline="", encoding="utf-8") as fout:
+        write = make_writer(fout, fmt, REJECT_FIELDS)
+        for part, timing in zip(parts, timings):
+            with open(part, newline="", encoding="utf-8") as fin:
+                if fmt == "jsonl":
+                    rejects = (json.loads(line) for line in fin if line.strip())
+                else:
+                    rejects = csv.DictReader(fin, fieldnames=REJECT_FIELDS)
+                for reject in rejects:
+                    reject["row"] = int(reject["row"]) + row_offset
+                    write([reject])
+            row_offset += timing.rows
+
+
+def run_sharded(
+    in_path: str,
+    out_path: str,
+    reject_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[StreamStats, List[ShardTiming]]:
+    """
+    Score `in_path` with `workers` processes (default: one per CPU core).
+    The merged output is identical to bmi_calculator.process_file on the same input.
+    """
+    workers = workers or os.cpu_count() or 1
+    reject_path = reject_path or default_reject_path(out_path)
+    start_time = time.perf_counter()
+
+    fieldnames, ranges = plan_shards(in_path, workers)
+    out_parts = [_part_path(out_path, i) for i in range(len(ranges))]
+    reject_parts = [_part_path(reject_path, i) for i in range(len(ranges))]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(score_shard, i, in_path, start, end, fieldnames, out_parts[i], reject_parts[i], chunk_size)
+                for i, (start, end) in enumerate(ranges)
+            ]
+            # Collect in submission order = original row order
+            timings = [future.result() for future in futures]
+
+        with open(out_path, "w", newline="", encoding="utf-8") as fout:
+            make_writer(fout, file_format(out_path), RESULT_FIELDS)([])  # header only
+            for part in out_parts:
+                with open(part, newline="", encoding="utf-8") as fin:
+                    shutil.copyfileobj(fin, fout)
+        _merge_rejects(reject_parts, timings, reject_path)
+    finally:
+        for part in out_parts + reject_parts:
+            if os.path.exists(part):
+                os.remove(part)
+
+    stats = StreamStats(
+        sum(t.rows for t in timings),
+        sum(t.rejected for t in timings),
+        time.perf_counter() - start_time,
+    )
+    return stats, timings
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Score a large BMI record file with several processes.")
+    parser.add_argument("--in", dest="in_path", required=True, help="input records (.csv or .jsonl)")
+    parser.add_argument("--out", dest="out_path", required=True, help="output file (.csv or .jsonl)")
+    parser.add_argument("--rejects", dest="reject_path", help="reject file (default: <out>.rejects.<ext>)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    args = parser.parse_args(argv if argv is not None else [])
+
+    stats, timings = run_sharded(args.in_path, args.out_path, args.reject_path, args.workers, args.chunk_size)
+    for t in timings:
+        print(f"Shard {t.index}: bytes {t.start}-{t.end}, {t.rows} rows ({t.rejected} rejected) in {t.seconds:.2f}s")
+    print(report(stats))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,17 @@
 # test_bmi_calculator.py
+import csv
+import json
+import warnings
+from array import array
+
 import pytest
 from bmi_calculator import calculate_bmi, interpret_bmi # Import from your refactored file
+from bmi_calculator import (
+    BMI_ERROR_MESSAGES, BMI_INVALID_HEIGHT, BMI_INVALID_VALUE, BMI_INVALID_WEIGHT, BMI_NORMAL, BMI_OVERWEIGHT, BMI_UNDERWEIGHT,
+    bmi_category, calculate_bmi_batch, interpret_bmi_batch,
+)
+from bmi_calculator import main, process_file
+from bmi_calculator import BMI_TABLE_SIZE, _bmi_category_uncached, _interpret_bmi_uncached
 
 
 # --- Tests for calculate_bmi ---
@@ -48,6 +59,17 @@ def test_interpret_overweight():
 def test_interpret_zero_bmi():
     assert interpret_bmi(0) == "Your BMI is 0, you are underweight."
 
+def test_interpret_lookup_table_matches_formatting():
+    for bmi in range(-5, BMI_TABLE_SIZE + 5):
+        assert interpret_bmi(bmi) == _interpret_bmi_uncached(bmi)
+        assert bmi_category(bmi) == _bmi_category_uncached(bmi)
+
+def test_interpret_float_falls_back():
+    assert interpret_bmi(18.4) == "Your BMI is 18.4, you are underweight."
+    assert interpret_bmi(18.5) == "Your BMI is 18.5, you have a normal weight."
+    assert interpret_bmi(25.0) == "Your BMI is 25.0, you are overweight."
+    assert bmi_category(24.9) == BMI_NORMAL
+
 # --- Integration style test (optional, tests combined logic) ---
 def test_calculation_and_interpretation():
     weight = 50
@@ -60,4 +82,125 @@ def test_calculation_and_interpretation():
     height = 1.7
     bmi = calculate_bmi(weight, height) # bmi = 25
     message = interpret_bmi(bmi)
-    assert message == "Your BMI is 25, you are overweight."
\ No newline at end of file
+    assert message == "Your BMI is 25, you are overweight."
+
+
+# --- Batch API: must agree with the scalar functions ---
+# The last three rows overflow: height ** 2 underflows to 0, height ** 2 overflows, BMI beyond int64
+BATCH_WEIGHTS = [70, 70.5, 72, 50, 0, 60, 60, 95.2, 44.1, 70, 70, 1e20]
+BATCH_HEIGHTS = [1.75, 1.7, 1.7, 1.7, 1.7, 0, -1.7, 1.81, 1.62, 1e-200, 1e200, 1.0]
+
+
+def scalar_bmi(weight, height):
+    """calculate_bmi, plus the int64 limit of the batch results."""
+    bmi = calculate_bmi(weight, height)
+    if bmi >= 2 ** 63:
+        raise OverflowError("BMI does not fit in 64 bits")
+    return bmi
+
+
+def scalar_message(weight, height):
+    """What main() would show for one row (without the 'Error: ' prefix)."""
+    try:
+        return interpret_bmi(scalar_bmi(weight, height))
+    except ValueError as e:
+        return str(e)
+    except ArithmeticError: # ZeroDivisionError, OverflowError
+        return BMI_ERROR_MESSAGES[BMI_INVALID_VALUE]
+
+
+def test_bmi_category_matches_interpret_bmi():
+    assert bmi_category(18) == BMI_UNDERWEIGHT
+    assert bmi_category(19) == BMI_NORMAL
+    assert bmi_category(24) == BMI_NORMAL
+    assert bmi_category(25) == BMI_OVERWEIGHT
+
+
+def test_batch_matches_scalar_array_columns():
+    batch = calculate_bmi_batch(array("d", BATCH_WEIGHTS), array("d", BATCH_HEIGHTS))
+    for i, (weight, height) in enumerate(zip(BATCH_WEIGHTS, BATCH_HEIGHTS)):
+        if batch.valid[i]:
+            assert batch.bmi[i] == scalar_bmi(weight, height)
+            assert batch.codes[i] == bmi_category(batch.bmi[i])
+        else:
+            assert batch.bmi[i] == 0
+            with pytest.raises((ValueError, ArithmeticError)):
+                scalar_bmi(weight, height)
+    assert interpret_bmi_batch(batch) == [scalar_message(w, h) for w, h in zip(BATCH_WEIGHTS, BATCH_HEIGHTS)]
+
+
+def test_batch_invalid_rows_follow_scalar_rules():
+    batch = calculate_bmi_batch([0, 60, 60, -5], [1.7, 0, -1.7, 0])
+    # Height is checked before weight, just like calculate_bmi
+    assert list(batch.codes) == [BMI_INVALID_WEIGHT, BMI_INVALID_HEIGHT, BMI_INVALID_HEIGHT, BMI_INVALID_HEIGHT]
+    assert not any(batch.valid)
+
+
+def test_batch_length_mismatch():
+    with pytest.raises(ValueError, match="same length"):
+        calculate_bmi_batch([70, 80], [1.75])
+
+
+def test_batch_matches_scalar_numpy_columns():
+    np = pytest.importorskip("numpy")
+    weights = np.array(BATCH_WEIGHTS)
+    heights = np.array(BATCH_HEIGHTS)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error") # no RuntimeWarning from the overflow rows
+        batch = calculate_bmi_batch(weights, heights)
+    expected = calculate_bmi_batch(array("d", BATCH_WEIGHTS), array("d", BATCH_HEIGHTS))
+    assert batch.bmi.tolist() == list(expected.bmi)
+    assert batch.codes.tolist() == list(expected.codes)
+    assert batch.valid.tolist() == [bool(v) for v in expected.valid]
+    assert interpret_bmi_batch(batch) == interpret_bmi_batch(expected)
+
+
+# --- File-driven mode ---
+def test_process_file_csv_matches_scalar(tmp_path):
+    in_path = tmp_path / "records.csv"
+    in_path.write_text("height,weight\n1.75,70\n1.7,abc\n0,60\n1.7,72\n1.7,50\n")
+    out_path = tmp_path / "results.csv"
+
+    stats = process_file(str(in_path), str(out_path), chunk_size=2)
+
+    assert (stats.rows, stats.rejected) == (5, 2)
+    with open(out_path, newline="") as f:
+        messages = [row["interpretation"] for row in csv.DictReader(f)]
+    assert messages == [interpret_bmi(calculate_bmi(70, 1.75)), interpret_bmi(calculate_bmi(72, 1.7)),
+                        interpret_bmi(calculate_bmi(50, 1.7))]
+    with open(tmp_path / "results.rejects.csv", newline="") as f:
+        rejects = list(csv.DictReader(f))
+    assert [r["row"] for r in rejects] == ["2", "3"]
+    assert rejects[0]["error"] == "Error: could not convert string to float: 'abc'"
+    assert rejects[1]["error"] == "Error: Height must be positive."
+
+
+def test_process_file_jsonl(tmp_path):
+    in_path = tmp_path / "records.jsonl"
+    in_path.write_text('{"height": 1.7, "weight": 72}\nnot json\n{"height": 1.7, "weight": -1}\n')
+    out_path = tmp_path / "results.jsonl"
+    reject_path = tmp_path / "bad.jsonl"
+
+    stats = process_file(str(in_path), str(out_path), str(reject_path))
+
+    assert (stats.rows, stats.rejected) == (3, 2)
+    results = [json.loads(line) for line in out_path.read_text().splitlines()]
+    assert results == [{"height": 1.7, "weight": 72.0, "bmi": 25, "interpretation": "Your BMI is 25, you are overweight."}]
+    rejects = [json.loads(line) for line in reject_path.read_text().splitlines()]
+    assert [r["row"] for r in rejects] == [2, 3]
+    assert rejects[1]["error"] == "Error: Weight must be positive."
+
+
+def test_main_interactive_error_message(monkeypatch, capsys):
+    answers = iter(["0", "60"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    main([])
+    assert capsys.readouterr().out == "Error: Height must be positive.\n"
+
+
+def test_main_ignores_the_callers_command_line(monkeypatch, capsys):
+    monkeypatch.setattr("sys.argv", ["pytest", "--not-a-bmi-option"])
+    answers = iter(["1.7", "72"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    main() # no SystemExit from argparse
+    assert capsys.readouterr().out == "Your BMI is 25, you are overweight.\n"
@@ -0,0 +1,54 @@
+# test_bmi_parallel.py
+import pytest
+from bmi_calculator import process_file
+from bmi_parallel import plan_shards, read_shard_lines, run_sharded
+
+
+def write_records(path, rows):
+    lines = ["height,weight"]
+    for i in range(rows):
+        # Every 7th row is bad, so rejects land in several shards
+        lines.append("0,60" if i % 7 == 3 else f"{1.5 + (i % 50) / 100},{40 + i % 60}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_shards_cover_every_line_once(tmp_path):
+    in_path = tmp_path / "records.csv"
+    write_records(in_path, 101)
+    fieldnames, ranges = plan_shards(str(in_path), 4)
+    assert fieldnames == ["height", "weight"]
+    lines = [line for start, end in ranges for line in read_shard_lines(str(in_path), start, end)]
+    assert lines == in_path.read_text().splitlines(keepends=True)[1:]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_sharded_output_matches_single_process(tmp_path, workers):
+    in_path = tmp_path / "records.csv"
+    write_records(in_path, 250)
+    process_file(str(in_path), str(tmp_path / "single.csv"), chunk_size=16)
+
+    stats, timings = run_sharded(str(in_path), str(tmp_path / "sharded.csv"), workers=workers, chunk_size=16)
+
+    assert len(timings) == workers
+    assert (stats.rows, stats.rejected) == (250, 36)
+    assert (tmp_path / "sharded.csv").read_text() == (tmp_path / "single.csv").read_text()
+    assert (tmp_path / "sharded.rejects.csv").read_text() == (tmp_path / "single.rejects.csv").read_text()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "records.csv", "sharded.csv", "sharded.rejects.csv", "single.csv", "single.rejects.csv"]
+
+
+def test_multiline_csv_records_are_not_split(tmp_path):
+    in_path = tmp_path / "records.csv"
+    # A quoted field with a newline inside: the second physical line is not a record of its own
+    rows = [f'{1.5 + i / 100},{50 + i},"note {i}\nsecond line"' for i in range(40)]
+    in_path.write_text("height,weight,note\n" + "\n".join(rows) + "\n")
+    _, ranges = plan_shards(str(in_path), 4)
+    assert len(ranges) == 1
+    process_file(str(in_path), str(tmp_path / "single.csv"))
+    stats, _ = run_sharded(str(in_path), str(tmp_path / "sharded.csv"), workers=4)
+    assert (stats.rows, stats.rejected) == (40, 0)
+    assert (tmp_path / "sharded.csv").read_text() == (tmp_path / "single.csv").read_text()
+
+    quoted = tmp_path / "quoted.csv" # quotes, but every record on one line: still sharded
+    quoted.write_text("height,weight\n" + "".join(f'"1.7","{60 + i}"\n' for i in range(40)))
+    assert len(plan_shards(str(quoted), 4)[1]) == 4
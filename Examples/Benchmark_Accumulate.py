@@ -0,0 +1,154 @@
+"""
+Benchmarks for the running-total helpers in Example_Accumulate.py.
+
+Usage:
+    python Benchmark_Accumulate.py [ledger] [floor] [scan] [--size N] [--workers N]
+    python Benchmark_Accumulate.py floor --size 10000000      # 10M transactions
+    python Benchmark_Accumulate.py scan --size 10000000 --workers 8
+"""
+
+import argparse
+import operator
+import os
+import random
+import time
+from itertools import accumulate
+from typing import Callable
+
+from Example_Accumulate import FenwickLedger, running_balance_non_negative
+from Example_ParallelScan import parallel_scan
+
+
+def seconds(func: Callable, *args) -> float:
+    """Wall time of one call."""
+    start_time = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start_time
+
+
+def bench_ledger(size: int):
+    """FenwickLedger vs recomputing list(accumulate(...)) for correction + balance queries."""
+    rng = random.Random(1)
+    transactions = [rng.randint(-1000, 1000) for _ in range(size)]
+    ledger = FenwickLedger(transactions)
+    print(f"\nledger: {size:,} transactions")
+    print(f"  build: list(accumulate(...)) {seconds(lambda: list(accumulate(transactions))):.3f} s, "
+          f"FenwickLedger(...) {seconds(FenwickLedger, transactions):.3f} s")
+
+    def correct_and_query_accumulate(ops):
+        for index, amount, count in ops:
+            transactions[index] = amount
+            running_totals = list(accumulate(transactions, initial=0)) # everything again after a correction
+            running_totals[count]
+
+    def correct_and_query_ledger(ops):
+        for index, amount, count in ops:
+            ledger.update(index, amount)
+            ledger.balance(count)
+
+    def make_ops(n):
+        return [(rng.randrange(size), rng.randint(-1000, 1000), rng.randint(0, size)) for _ in range(n)]
+
+    slow_ops, fast_ops = make_ops(5), make_ops(100_000)
+    print(f"  correction + balance query: recompute accumulate "
+          f"{seconds(correct_and_query_accumulate, slow_ops) / len(slow_ops) * 1e6:12,.1f} us/op")
+    print(f"  correction + balance query: FenwickLedger        "
+          f"{seconds(correct_and_query_ledger, fast_ops) / len(fast_ops) * 1e6:12,.1f} us/op")
+
+    running_totals = list(accumulate(transactions, initial=0))
+    counts = [rng.randint(0, size) for _ in range(100_000)]
+    print(f"  balance query only (no corrections): list index "
+          f"{seconds(lambda: [running_totals[c] for c in counts]) / len(counts) * 1e6:.3f} us/op, "
+          f"FenwickLedger {seconds(lambda: [ledger.balance(c) for c in counts]) / len(counts) * 1e6:.3f} us/op")
+    appends = make_ops(100_000)
+    print(f"  append: FenwickLedger "
+          f"{seconds(lambda: [ledger.append(amount) for _, amount, _ in appends]) / len(appends) * 1e6:.3f} us/op")
+
+
+def floored_with_closure(transactions, initial_balance=0):
+    """The accumulate + add_with_floor computation of show_running_balance_non_negative, without printing."""
+    def add_with_floor(current_balance, transaction):
+        potential_new_balance = current_balance + transaction
+        return max(0, potential_new_balance)
+    return list(accumulate(transactions, func=add_with_floor, initial=initial_balance))
+
+
+def bench_floor(size: int):
+    """Floored running balance: Python closure vs C-speed accumulate passes vs NumPy."""
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    rng = random.Random(2)
+    ledgers = [
+        ("balanced ledger", [rng.randint(-1000, 1000) for _ in range(size)]),
+        ("overdrawn ledger (floor hit all the time)", [rng.randint(-1000, 900) for _ in range(size)]),
+    ]
+    for title, transactions in ledgers:
+        print(f"\nfloor, {title}: {size:,} transactions")
+        start_time = time.perf_counter()
+        expected = floored_with_closure(transactions, 500)
+        closure_seconds = time.perf_counter() - start_time
+        print(f"  accumulate + add_with_floor closure  {closure_seconds:7.3f} s")
+
+        start_time = time.perf_counter()
+        balances = running_balance_non_negative(transactions, 500)
+        batch_seconds = time.perf_counter() - start_time
+        assert balances == expected
+        print(f"  running_balance_non_negative (list)  {batch_seconds:7.3f} s  ({closure_seconds / batch_seconds:.1f}x)")
+        del balances
+
+        if np is None:
+            print("  NumPy not installed, skipping the array version")
+            continue
+        array = np.array(transactions, dtype=np.int64)
+        start_time = time.perf_counter()
+        balances = running_balance_non_negative(array, 500)
+        numpy_seconds = time.perf_counter() - start_time
+        assert balances.tolist() == expected
+        print(f"  running_balance_non_negative (NumPy) {numpy_seconds:7.3f} s  ({closure_seconds / numpy_seconds:.1f}x)")
+
+
+def bench_scan(size: int, workers: int):
+    """parallel_scan with 1..workers processes vs list(accumulate(...)), for add and max."""
+    rng = random.Random(3)
+    transactions = [rng.randint(-1000, 1000) for _ in range(size)]
+    print(f"\nscan: {size:,} transactions, {os.cpu_count()} CPU core(s) available")
+    for func in (operator.add, max):
+        start_time = time.perf_counter()
+        expected = list(accumulate(transactions, func))
+        baseline_seconds = time.perf_counter() - start_time
+        print(f"  {func.__name__}: accumulate             {baseline_seconds:7.3f} s")
+        for count in range(1, workers + 1):
+            start_time = time.perf_counter()
+            result = parallel_scan(transactions, func, workers=count)
+            scan_seconds = time.perf_counter() - start_time
+            assert result == expected
+            print(f"  {func.__name__}: parallel_scan, {count:2d} worker(s) {scan_seconds:7.3f} s "
+                  f"({baseline_seconds / scan_seconds:.2f}x)")
+        del expected, result
+
+
+BENCHMARKS = {
+    "ledger": bench_ledger,
+    "floor": bench_floor,
+    "scan": bench_scan,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmarks", nargs="*", choices=[[]] + list(BENCHMARKS), help="default: all")
+    parser.add_argument("--size", type=int, default=1_000_000, help="number of transactions")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="scan: largest number of worker processes (default: CPU cores)")
+    args = parser.parse_args()
+    for name in args.benchmarks or BENCHMARKS:
+        if name == "scan":
+            bench_scan(args.size, args.workers)
+        else:
+            BENCHMARKS[name](args.size)
+
+
+if __name__ == "__main__":
+    main()
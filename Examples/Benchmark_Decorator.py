@@ -0,0 +1,304 @@
+"""
+Benchmarks for the decorators in Example_Decorator.py.
+
+Usage:
+    python Benchmark_Decorator.py [memoize] [keys] [log_calls] [time_execution] [permissions] [fibonacci] [fused] [--calls N]
+"""
+
+import argparse
+import functools
+import logging
+import sys
+import time
+from typing import Callable, List, Tuple
+
+from Example_Decorator import (
+    _KWARGS_MARK, MetricsRegistry, fast_fibonacci, fast_fibonacci_batch, fused, log_calls, memoize, require_permission,
+    signature_key_builder, slow_fibonacci, time_execution,
+)
+
+
+def per_call_ns(func: Callable, args_list: List[tuple], repeat: int = 3) -> float:
+    """Best-of-`repeat` time per call in nanoseconds, calling func(*args) for every args tuple."""
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        for args in args_list:
+            func(*args)
+        best = min(best, time.perf_counter() - start_time)
+    return best / len(args_list) * 1e9
+
+
+def print_table(title: str, rows: List[Tuple[str, float]], baseline: float):
+    print(f"\n{title}")
+    for name, ns in rows:
+        print(f"  {name:40s} {ns:8.1f} ns/call  (+{ns - baseline:.1f} ns over a plain call)")
+
+
+def bench_memoize(calls: int):
+    """Cache-hit overhead of memoize vs functools.lru_cache (the key space fits in every cache)."""
+    def add(a, b):
+        return a + b
+
+    args_list = [(i % 100, 1) for i in range(calls)]
+    variants = [
+        ("plain function", add),
+        ("functools.lru_cache(maxsize=None)", functools.lru_cache(maxsize=None)(add)),
+        ("functools.lru_cache(maxsize=128)", functools.lru_cache(maxsize=128)(add)),
+        ("memoize", memoize(add)),
+        ("memoize(maxsize=128)", memoize(maxsize=128)(add)),
+        ("memoize(maxsize=128, ttl=60)", memoize(maxsize=128, ttl=60)(add)),
+        ("memoize(thread_safe=True)", memoize(thread_safe=True)(add)),
+        ("memoize(normalize_args=True)", memoize(normalize_args=True)(add)),
+    ]
+    rows = [(name, per_call_ns(func, args_list)) for name, func in variants]
+    print_table(f"memoize: {calls:,} cache hits per variant", rows, rows[0][1])
+
+
+def bench_keys(calls: int):
+    """Cost of building one cache key: the default tuple key vs signature_key_builder."""
+    def tuple_key(args, kwargs):
+        # The expression memoize uses without normalize_args
+        return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items())) if kwargs else args
+
+    def target(a, b, c=3):
+        return a
+
+    signature_key = signature_key_builder(target)
+    cases = [
+        ("f(1, 2, 3)", (1, 2, 3), {}),
+        ("f(1, b=2)", (1,), {"b": 2}),
+        ("f(a=1, b=2, c=3)", (), {"a": 1, "b": 2, "c": 3}),
+        ("f([1..10], {'k': 1})", (list(range(10)), {"k": 1}), {}),
+    ]
+    try:
+        import numpy as np
+        cases.append(("f(ndarray[10000])", (np.arange(10_000), 0), {}))
+    except ImportError:
+        pass
+
+    print(f"\nkeys: {calls:,} keys per case (tuple key fails on unhashable arguments)")
+    for name, args, kwargs in cases:
+        row = f"  {name:24s}"
+        for label, build in (("tuple key", tuple_key), ("signature key", signature_key)):
+            try:
+                hash(build(args, kwargs))
+                row += f" {label} {per_call_ns(build, [(args, kwargs)] * calls):7.1f} ns |"
+            except TypeError:
+                row += f" {label} {'unhashable':>10} |"
+        print(row)
+
+
+def eager_log_calls(func: Callable) -> Callable:
+    """The original log_calls: builds reprs and f-strings on every call, whatever the log level."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        args_repr = [repr(a) for a in args]
+        kwargs_repr = [f"{k}={v!r}" for k, v in kwargs.items()]
+        signature = ", ".join(args_repr + kwargs_repr)
+        logging.info(f"Entering {func.__name__}({signature})")
+        result = func(*args, **kwargs)
+        logging.info(f"Exiting {func.__name__} with result: {result!r}")
+        return result
+    return wrapper
+
+
+def passthrough(func: Callable) -> Callable:
+    """A wrapper that does nothing: the floor for any *args/**kwargs decorator."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def bench_log_calls(calls: int):
+    """log_calls overhead with INFO filtered out, and with INFO enabled but sampled."""
+    def pick(a, b):
+        return b  # a 50-item list, so the result repr is not trivial either
+
+    args_list = [(i, [i] * 50) for i in range(1000)] * max(1, calls // 1000)
+    handler = logging.NullHandler()  # records are created and "emitted", but nothing is printed
+    root = logging.getLogger()
+    root.addHandler(handler)
+    old_level = root.level
+    try:
+        for level, label in ((logging.WARNING, "INFO disabled"), (logging.INFO, "INFO enabled")):
+            root.setLevel(level)
+            variants = [
+                ("plain function", pick),
+                ("do-nothing wrapper", passthrough(pick)),
+                ("original log_calls (eager)", eager_log_calls(pick)),
+                ("log_calls", log_calls(pick)),
+                ("log_calls(sample_every=100)", log_calls(sample_every=100)(pick)),
+                ("log_calls(max_repr=40)", log_calls(max_repr=40)(pick)),
+            ]
+            rows = [(name, per_call_ns(func, args_list)) for name, func in variants]
+            print_table(f"log_calls, {label}: {len(args_list):,} calls per variant", rows, rows[0][1])
+    finally:
+        root.setLevel(old_level)
+        root.removeHandler(handler)
+
+
+def bench_time_execution(calls: int):
+    """Cost of recording one duration into the histogram (no per-call log line)."""
+    def add(a, b):
+        return a + b
+
+    registry = MetricsRegistry()
+    args_list = [(i, 1) for i in range(calls)]
+    variants = [
+        ("plain function", add),
+        ("do-nothing wrapper", passthrough(add)),
+        ("time_execution(log=False)", time_execution(log=False, registry=registry)(add)),
+    ]
+    rows = [(name, per_call_ns(func, args_list)) for name, func in variants]
+    print_table(f"time_execution: {calls:,} calls per variant", rows, rows[0][1])
+    print(registry.report())
+
+
+def eager_require_permission(required_permission: str, permissions: set) -> Callable:
+    """The original require_permission: a set lookup plus an INFO f-string on every call."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if required_permission in permissions:
+                logging.info(f"Permission '{required_permission}' granted for {func.__name__}.")
+                return func(*args, **kwargs)
+            raise PermissionError(required_permission)
+        return wrapper
+    return decorator
+
+
+def bench_permissions(calls: int):
+    """Per-call cost of the update_record stack: @require_permission('edit') @log_calls."""
+    def update_record(record_id, data):
+        return data
+
+    args_list = [(i, {"value": i}) for i in range(calls)]
+    handler = logging.NullHandler()
+    root = logging.getLogger()
+    root.addHandler(handler)
+    old_level = root.level
+    try:
+        for level, label in ((logging.WARNING, "WARNING level"), (logging.INFO, "INFO level (the demo)")):
+            root.setLevel(level)
+            variants = [
+                ("plain function", update_record),
+                ("original stack (eager)", eager_require_permission("edit", {"view", "edit"})(
+                    eager_log_calls(update_record))),
+                ("require_permission only", require_permission("edit")(update_record)),
+                ("require_permission + log_calls", require_permission("edit")(log_calls(update_record))),
+                ("... + log_calls(sample_every=100)", require_permission("edit")(
+                    log_calls(sample_every=100)(update_record))),
+            ]
+            rows = [(name, per_call_ns(func, args_list)) for name, func in variants]
+            print_table(f"permissions, {label}: {calls:,} calls per variant", rows, rows[0][1])
+    finally:
+        root.setLevel(old_level)
+        root.removeHandler(handler)
+
+
+def seconds_or_error(func: Callable, *args) -> str:
+    """Wall time of one call as text, or the name of the exception it raised."""
+    start_time = time.perf_counter()
+    try:
+        func(*args)
+    except (RecursionError, MemoryError) as e:
+        return type(e).__name__
+    return f"{time.perf_counter() - start_time:.6f} s"
+
+
+def bench_fibonacci(calls: int):
+    """
+    fast_fibonacci vs the memoized recursive slow_fibonacci (the `calls` option is not used).
+    The warmed column is linear-time memoized recursion; n = 10^6 takes about ten seconds there.
+    """
+    @memoize(maxsize=3)
+    def bottom_up(n):
+        # Memoized recursion without the log/timing wrappers, warmed from 0 up to n
+        return n if n <= 1 else bottom_up(n - 1) + bottom_up(n - 2)
+
+    def warm_bottom_up(n):
+        bottom_up.cache_clear()
+        for k in range(n + 1):
+            bottom_up(k) # every call finds k-1 and k-2 in the cache, so the recursion stays 1 level deep
+        return bottom_up(n)
+
+    def cold_slow_fibonacci(n):
+        slow_fibonacci.cache_clear()
+        return slow_fibonacci(n)
+
+    # log_calls would log the RecursionError of slow_fibonacci once per stack frame
+    logging.disable(logging.CRITICAL)
+    try:
+        print(f"\nfibonacci: one call per cell (recursion limit {sys.getrecursionlimit()})")
+        print(f"  {'n':>9} | {'fast_fibonacci':>14} | {'slow_fibonacci (cold)':>21} | {'memoize, warmed 0..n':>20}")
+        for n in (10, 100, 1_000, 10_000, 100_000, 1_000_000):
+            print(f"  {n:9,d} | {seconds_or_error(fast_fibonacci, n):>14} | "
+                  f"{seconds_or_error(cold_slow_fibonacci, n):>21} | {seconds_or_error(warm_bottom_up, n):>20}")
+
+        ns = list(range(100_000, 102_000))
+        batch = seconds_or_error(fast_fibonacci_batch, ns)
+        single = seconds_or_error(lambda values: [fast_fibonacci(n) for n in values], ns)
+        print(f"  F(100,000..101,999): fast_fibonacci_batch {batch}, one fast_fibonacci per n {single}")
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def bench_fused(calls: int):
+    """Naive decorator stacks vs fused() with the same decorators (INFO disabled, so nothing is logged)."""
+    def update_record(record_id, data):
+        return data
+
+    registry = MetricsRegistry()
+    timed = time_execution(log=False, registry=registry)
+    stacks = [
+        ("update_record: require_permission, log_calls", [require_permission("edit"), log_calls],
+         [(i, {"value": i}) for i in range(calls)]),
+        # maxsize < calls: every repeat of the miss run misses again
+        ("memoize, time_execution, log_calls (misses)", [memoize(maxsize=1000), timed, log_calls],
+         [(i, i) for i in range(calls)]),
+        ("memoize, time_execution, log_calls (hits)", [memoize(maxsize=1000), timed, log_calls],
+         [(i % 100, 0) for i in range(calls)]),
+        ("time_execution, log_calls", [timed, log_calls], [(i, i) for i in range(calls)]),
+    ]
+    root = logging.getLogger()
+    old_level = root.level
+    root.setLevel(logging.WARNING)
+    try:
+        for title, decorators, args_list in stacks:
+            stacked = update_record
+            for decorator in reversed(decorators):
+                stacked = decorator(stacked)
+            rows = [
+                ("plain function", per_call_ns(update_record, args_list)),
+                ("stacked decorators", per_call_ns(stacked, args_list)),
+                ("fused(...)", per_call_ns(fused(*decorators)(update_record), args_list)),
+            ]
+            print_table(f"fused, {title}: {calls:,} calls", rows, rows[0][1])
+    finally:
+        root.setLevel(old_level)
+
+
+BENCHMARKS = {
+    "memoize": bench_memoize,
+    "keys": bench_keys,
+    "log_calls": bench_log_calls,
+    "time_execution": bench_time_execution,
+    "permissions": bench_permissions,
+    "fibonacci": bench_fibonacci,
+    "fused": bench_fused,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmarks", nargs="*", choices=[[]] + list(BENCHMARKS), help="default: all")
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name](args.calls)
+
+
+if __name__ == "__main__":
+    main()
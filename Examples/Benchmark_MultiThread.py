@@ -0,0 +1,76 @@
+"""
+Benchmark: threaded fetch_all vs asyncio async_fetch_all.
+
+Every (engine, number of URLs) combination runs in a fresh interpreter,
+so the reported peak RSS belongs to that run only.
+
+Usage:
+    python Benchmark_MultiThread.py                       # 100, 10k and 100k URLs
+    python Benchmark_MultiThread.py --sizes 100 1000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+from Example_MultiThread import async_fetch_all, async_fetch_data, fetch_all, fetch_data
+
+
+def run_engine(engine: str, n: int, concurrency: int, min_latency: float, max_latency: float) -> Dict[str, Any]:
+    """Fetch n simulated URLs with one engine and report wall-clock time and peak RSS."""
+    urls = (f"http://example.com/api/items/{i}" for i in range(n))
+    start_time = time.perf_counter()
+    if engine == "threaded":
+        results = fetch_all(
+            urls, max_workers=concurrency,
+            fetch=lambda url, task_id: fetch_data(url, task_id, min_latency, max_latency, verbose=False),
+        )
+    else:
+        results = asyncio.run(async_fetch_all(
+            urls, max_concurrency=concurrency,
+            fetch=lambda url, task_id: async_fetch_data(url, task_id, min_latency, max_latency, verbose=False),
+        ))
+    seconds = time.perf_counter() - start_time
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024
+    return {"engine": engine, "n": len(results), "seconds": seconds, "peak_rss_mb": peak_kb / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+    parser.add_argument("--concurrency", type=int, default=100, help="worker threads / concurrent tasks")
+    parser.add_argument("--min-latency", type=float, default=0.001)
+    parser.add_argument("--max-latency", type=float, default=0.005)
+    parser.add_argument("--child", choices=["threaded", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Runs inside the fresh interpreter started below
+        print(json.dumps(run_engine(args.child, args.sizes[0], args.concurrency, args.min_latency, args.max_latency)))
+        return
+
+    print(f"concurrency={args.concurrency}, latency {args.min_latency}-{args.max_latency}s per URL")
+    print(f"{'URLs':>8} | {'engine':8} | {'seconds':>8} | {'URLs/sec':>9} | {'peak RSS':>9}")
+    for n in args.sizes:
+        for engine in ("threaded", "async"):
+            completed = subprocess.run(
+                [sys.executable, __file__, "--child", engine, "--sizes", str(n),
+                 "--concurrency", str(args.concurrency),
+                 "--min-latency", str(args.min_latency), "--max-latency", str(args.max_latency)],
+                capture_output=True, text=True, check=True,
+            )
+            row = json.loads(completed.stdout.strip().splitlines()[-1])
+            print(f"{row['n']:8d} | {engine:8} | {row['seconds']:8.2f} | {row['n'] / row['seconds']:9,.0f} | "
+                  f"{row['peak_rss_mb']:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmarks for parallel_reduce in Example_Reduce.py against functools.reduce.
+
+Usage:
+    python Benchmark_Reduce.py [sum] [max] [factorial] [--size N] [--workers N]
+    python Benchmark_Reduce.py sum --size 100000000 --workers 8   # the default size: 100M items
+
+sum and max reduce range(size), which parallel_reduce sends to the workers as small range
+objects; pass --list to reduce a list instead (every chunk is then pickled to its worker).
+factorial multiplies 1..size // 2000 (50,000 for the default size) to show the tree shape.
+"""
+
+import argparse
+import operator
+import os
+import time
+from functools import reduce
+from typing import Callable
+
+from Example_Reduce import parallel_reduce
+
+
+def compare(title: str, func: Callable, items, workers: int, **options):
+    """reduce once, then parallel_reduce with 1..workers processes; every result must be equal."""
+    print(f"\n{title}, {os.cpu_count()} CPU core(s) available")
+    start_time = time.perf_counter()
+    expected = reduce(func, items)
+    baseline_seconds = time.perf_counter() - start_time
+    print(f"  reduce                          {baseline_seconds:7.3f} s")
+    for count in range(1, workers + 1):
+        start_time = time.perf_counter()
+        result = parallel_reduce(func, items, workers=count, **options)
+        seconds = time.perf_counter() - start_time
+        assert result == expected
+        print(f"  parallel_reduce, {count:2d} worker(s)   {seconds:7.3f} s  ({baseline_seconds / seconds:.2f}x)")
+
+
+def bench_sum(size: int, workers: int, as_list: bool):
+    items = list(range(size)) if as_list else range(size)
+    compare(f"sum: operator.add over {size:,} items ({type(items).__name__})", operator.add, items, workers)
+
+
+def bench_max(size: int, workers: int, as_list: bool):
+    items = list(range(size)) if as_list else range(size)
+    compare(f"max: max over {size:,} items ({type(items).__name__})", max, items, workers)
+
+
+def bench_factorial(size: int, workers: int, as_list: bool):
+    n = max(1, size // 2000)
+    # Small chunks, so most of the multiplications happen in the balanced tree
+    compare(f"factorial: operator.mul over 1..{n:,}", operator.mul, range(1, n + 1), workers, chunk_size=16)
+
+
+BENCHMARKS = {
+    "sum": bench_sum,
+    "max": bench_max,
+    "factorial": bench_factorial,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmarks", nargs="*", choices=[[]] + list(BENCHMARKS), help="default: all")
+    parser.add_argument("--size", type=int, default=100_000_000, help="number of items")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="largest number of worker processes (default: CPU cores)")
+    parser.add_argument("--list", action="store_true", help="sum/max: reduce a list instead of a range")
+    args = parser.parse_args()
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name](args.size, args.workers, args.list)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 # Add this to the end of /Users/alexeygerasymov/Documents/Repos/Python100/Tests/TestIter.py
 
-print("\n--- Accumulate Example (Running Balance) ---")
-from itertools import accumulate
+from itertools import accumulate, islice, repeat
 import operator # For functions like mul, max etc.
+from typing import Iterable, List
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, plain sequences are handled with itertools
+    np = None
 
 """
 Running Balance:
@@ -35,12 +40,85 @@ def show_running_balance(transactions, initial_balance=0):
         print(f"{transaction:11d} | {new_balance}")
     print("----------------------")
 
-# --- Example Usage ---
-daily_transactions = [100, -50, 200, -120, 30, -40]
-show_running_balance(daily_transactions, initial_balance=500)
 
+"""
+Ledger Index (Fenwick tree):
+
+- show_running_balance recomputes every running total to answer one question. That is O(n) per question, and
+  O(n) again after every correction.
+- FenwickLedger keeps partial sums in a Fenwick (binary indexed) tree: entry i holds the sum of the last
+  (i & -i) transactions up to i. Any prefix sum is the sum of at most log2(n) entries, and changing one
+  transaction touches at most log2(n) entries.
+- So balance at any step, net flow over any range, appends and corrections are all O(log n).
+"""
+
+class FenwickLedger:
+    """
+    Transactions with O(log n) point-in-time balances, range sums, appends and corrections.
+
+    ledger.balance(i) equals list(accumulate(transactions, initial=initial_balance))[i],
+    i.e. the balance after the first i transactions.
+    """
+
+    def __init__(self, transactions: Iterable = (), initial_balance=0):
+        self.initial_balance = initial_balance
+        self._values: List = list(transactions)
+        # 1-based tree; built in O(n) by pushing each partial sum to its parent once
+        tree = [0] + self._values
+        n = len(self._values)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index: int):
+        """The transaction at `index` (0-based)."""
+        return self._values[index]
+
+    def _prefix_sum(self, count: int):
+        """Sum of the first `count` transactions."""
+        tree = self._tree
+        total = 0
+        while count > 0:
+            total += tree[count]
+            count &= count - 1 # drop the lowest set bit: jump to the previous covered block
+        return total
+
+    def balance(self, count: int):
+        """Balance after the first `count` transactions (0 <= count <= len(ledger))."""
+        if not 0 <= count <= len(self._values):
+            raise IndexError("ledger index out of range")
+        return self.initial_balance + self._prefix_sum(count)
+
+    def range_sum(self, start: int, stop: int):
+        """Net flow of transactions[start:stop] (0 <= start <= stop <= len(ledger))."""
+        if not 0 <= start <= stop <= len(self._values):
+            raise IndexError("ledger range out of bounds")
+        return self._prefix_sum(stop) - self._prefix_sum(start)
+
+    def append(self, transaction):
+        """Adds a transaction at the end."""
+        self._values.append(transaction)
+        i = len(self._values)
+        # Node i covers transactions (i - lowbit(i), i]: the new one plus the ones before it in that block
+        self._tree.append(transaction + self._prefix_sum(i - 1) - self._prefix_sum(i - (i & -i)))
+
+    def update(self, index: int, transaction):
+        """Corrects the transaction at `index` (0-based) to a new amount."""
+        delta = transaction - self._values[index] # also raises IndexError for a bad index
+        if index < 0:
+            index += len(self._values)
+        self._values[index] = transaction
+        tree, n = self._tree, len(self._values)
+        i = index + 1
+        while i <= n:
+            tree[i] += delta
+            i += i & -i # move to the next block that contains this transaction
 
-print("\n--- Accumulate Example (Running Maximum) ---")
 
 """
 Running Maximum:
@@ -61,6 +139,7 @@ def track_running_maximum(values):
         values (list): A list of numbers.
     """
     # Use operator.max (or simply max) as the function
+    # (For an endless stream, don't build a list: see Example_RunningStats.py)
     running_max = list(accumulate(values, func=max)) # Could also use func=operator.max
 
     print(f"Original Values: {values}")
@@ -72,9 +151,6 @@ def track_running_maximum(values):
          print(f"{value:5d} | {current_max}")
     print("----------------------")
 
-# --- Example Usage ---
-temperatures = [15, 18, 17, 22, 20, 25, 23]
-track_running_maximum(temperatures)
 
 # Example with cumulative product (like factorial if starting near 1)
 
@@ -84,11 +160,6 @@ Cumulative Product:
 Shows how to use a different function (operator.mul for multiplication). When applied to [1, 2, 3, 4, 5], it effectively calculates the factorials (1!, 2!, 3!, 4!, 5!).
 """
 
-print("\n--- Accumulate Example (Cumulative Product) ---")
-numbers_to_multiply = [1, 2, 3, 4, 5]
-cumulative_product = list(accumulate(numbers_to_multiply, func=operator.mul))
-print(f"Numbers: {numbers_to_multiply}")
-print(f"Cumulative Product (Factorials): {cumulative_product}")
 
 """
 Explanation of Changes:
@@ -143,24 +214,124 @@ def show_running_balance_non_negative(transactions, initial_balance=0):
         # print(f"{transaction:11.2f} | {new_balance:.2f}")
     print("----------------------")
 
-# --- Example Usage ---
-daily_transactions_orig = [100, -50, 200, -120, 30, -40]
-print("Original behavior (can go negative):")
-# Assuming the original function is still available or renamed for comparison
-# show_running_balance(daily_transactions_orig, initial_balance=500) # Original call
-
-print("\nNon-negative behavior:")
-show_running_balance_non_negative(daily_transactions_orig, initial_balance=500)
-
-print("\nNon-negative behavior (starting low):")
-# This transaction list would normally go negative quickly
-low_start_transactions = [20, -50, 10, -100, 30]
-show_running_balance_non_negative(low_start_transactions, initial_balance=10)
+"""
+Floored Running Balance at Scale:
+
+- add_with_floor is a Python function call per transaction, which makes it the slow part of
+  show_running_balance_non_negative on big ledgers.
+- With S_0 = initial balance and S_i = S_0 + (first i transactions), the floored balance has a
+  closed form (it is a "reflected" random walk):
+      b_i = S_i - min(0, min(S_0, ..., S_i))
+  Every time the balance would go below 0, the floor "absorbs" the missing amount, and the total
+  absorbed so far is exactly how far the lowest unfloored total went below 0.
+- Both S (a running sum) and the running minimum are plain accumulate() calls with C functions
+  (no lambda), or np.cumsum / np.minimum.accumulate on arrays, so no Python code runs per item.
+- Without NumPy the running minimum is the expensive pass (builtin min() is slow per call), but it
+  only changes at a new low: blocks whose min() stays above the lowest total so far skip it.
+"""
 
-# Example with negative initial balance (will be reset to 0)
-print("\nNon-negative behavior (negative initial balance):")
-show_running_balance_non_negative([10, -5, 20], initial_balance=-100)
+DEFAULT_CHUNK_SIZE = 1_000_000 # items per pass when the input is not a NumPy array
+_LOW_CHECK_BLOCK = 4096 # accumulate(..., min) calls min() per item, so it only runs on blocks with a new low
 
-# --- Keep the rest of the file (Running Maximum, Cumulative Product) as is ---
-# ... (rest of the code for track_running_maximum and cumulative product) ...
+def running_balance_non_negative(transactions, initial_balance=0, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Batch version of show_running_balance_non_negative: the balance after every transaction,
+    never below zero, computed without a Python call per transaction.
 
+    Args:
+        transactions: numbers (any iterable, or a NumPy array for the vectorized path).
+        initial_balance: starting balance; a negative one is treated as 0, like the closure version.
+        chunk_size: the iterable is processed this many items at a time, so the temporary lists
+            stay small however long the ledger is.
+
+    Returns:
+        [initial_balance, balance after transaction 1, ...] (like running_totals in
+        show_running_balance_non_negative); a NumPy array for NumPy input.
+        Identical to the closure version for integers; with floats the sums are grouped
+        differently, so results can differ in the last bits.
+    """
+    initial_balance = max(initial_balance, 0)
+
+    if np is not None and isinstance(transactions, np.ndarray):
+        sums = np.empty(len(transactions) + 1, dtype=np.result_type(transactions, initial_balance))
+        sums[0] = initial_balance
+        np.cumsum(transactions, out=sums[1:])
+        sums[1:] += initial_balance
+        lowest = np.minimum.accumulate(sums) # S_0 >= 0, so min(0, lowest) only matters once it goes negative
+        return sums - np.minimum(lowest, 0)
+
+    balances = [initial_balance]
+    total, lowest = initial_balance, 0 # lowest = min(0, S_0, ..., S_i) so far
+    iterator = iter(transactions)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return balances
+        sums = list(accumulate(chunk, initial=total))
+        del sums[0]
+        total = sums[-1]
+        for start in range(0, len(sums), _LOW_CHECK_BLOCK):
+            block = sums[start:start + _LOW_CHECK_BLOCK]
+            if min(block) >= lowest:
+                # No new low in this block: the floor stays where it is, no running minimum needed
+                balances.extend(map(operator.sub, block, repeat(lowest)))
+            else:
+                lows = list(accumulate(block, min, initial=lowest))
+                del lows[0]
+                balances.extend(map(operator.sub, block, lows))
+                lowest = lows[-1]
+
+
+def main():
+    print("\n--- Accumulate Example (Running Balance) ---")
+    # --- Example Usage ---
+    daily_transactions = [100, -50, 200, -120, 30, -40]
+    show_running_balance(daily_transactions, initial_balance=500)
+
+    print("\n--- Ledger Index Example (FenwickLedger) ---")
+    ledger = FenwickLedger(daily_transactions, initial_balance=500)
+    print(f"Balance after 3 transactions: {ledger.balance(3)}") # 500 + 100 - 50 + 200 = 750
+    print(f"Net flow of transactions 2..4: {ledger.range_sum(2, 5)}") # 200 - 120 + 30 = 110
+    ledger.update(1, -60) # correct the second transaction
+    ledger.append(75)
+    print(f"After a correction and an append: balance after 3 = {ledger.balance(3)}, final = {ledger.balance(len(ledger))}")
+
+    print("\n--- Accumulate Example (Running Maximum) ---")
+    # --- Example Usage ---
+    temperatures = [15, 18, 17, 22, 20, 25, 23]
+    track_running_maximum(temperatures)
+
+    print("\n--- Accumulate Example (Cumulative Product) ---")
+    numbers_to_multiply = [1, 2, 3, 4, 5]
+    cumulative_product = list(accumulate(numbers_to_multiply, func=operator.mul))
+    print(f"Numbers: {numbers_to_multiply}")
+    print(f"Cumulative Product (Factorials): {cumulative_product}")
+
+    print("\n--- Accumulate Example (Non-negative Running Balance) ---")
+    # --- Example Usage ---
+    daily_transactions_orig = [100, -50, 200, -120, 30, -40]
+    print("Original behavior (can go negative):")
+    # Assuming the original function is still available or renamed for comparison
+    # show_running_balance(daily_transactions_orig, initial_balance=500) # Original call
+
+    print("\nNon-negative behavior:")
+    show_running_balance_non_negative(daily_transactions_orig, initial_balance=500)
+
+    print("\nNon-negative behavior (starting low):")
+    # This transaction list would normally go negative quickly
+    low_start_transactions = [20, -50, 10, -100, 30]
+    show_running_balance_non_negative(low_start_transactions, initial_balance=10)
+
+    # Example with negative initial balance (will be reset to 0)
+    print("\nNon-negative behavior (negative initial balance):")
+    show_running_balance_non_negative([10, -5, 20], initial_balance=-100)
+
+    print("\nSame balances from the batch version (no Python call per transaction):")
+    print(running_balance_non_negative(low_start_transactions, initial_balance=10))
+
+    # --- Keep the rest of the file (Running Maximum, Cumulative Product) as is ---
+    # ... (rest of the code for track_running_maximum and cumulative product) ...
+
+
+if __name__ == "__main__":
+    main()
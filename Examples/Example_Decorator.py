@@ -1,96 +1,1128 @@
 # Create a new file, e.g., /Users/alexeygerasymov/Documents/Repos/Python100/Examples/Example_Decorators.py
 
+import asyncio
+import contextvars
 import time
 import functools # Essential for writing well-behaved decorators
+import hashlib
+import inspect
+import itertools
 import logging
-from typing import Callable, Any
+import os
+import pickle
+import reprlib
+import sqlite3
+import sys
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
 
-# --- Setup Basic Logging ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+def _with_options(decorator: Callable, factory: Callable, **options) -> Callable:
+    """Remembers how a configured decorator was made, so fused() can rebuild it (see section 5)."""
+    decorator.fuse_options = (factory, options)
+    return decorator
 
 # ==============================================================================
 # 1. Logging Decorator
 # ==============================================================================
-def log_calls(func: Callable) -> Callable:
-    """Decorator that logs when a function is entered and exited, along with args and result."""
+class _CallRepr:
+    """Formats "arg1, arg2, key=value" only when a log record is actually written (lazy %s formatting)."""
+    __slots__ = ("args", "kwargs", "short_repr")
+
+    def __init__(self, args: tuple, kwargs: dict, short_repr: Callable[[Any], str]):
+        self.args, self.kwargs, self.short_repr = args, kwargs, short_repr
+
+    def __str__(self) -> str:
+        args_repr = [self.short_repr(a) for a in self.args]
+        kwargs_repr = [f"{k}={self.short_repr(v)}" for k, v in self.kwargs.items()]
+        return ", ".join(args_repr + kwargs_repr)
+
+class _ResultRepr:
+    """Lazy repr of a single value."""
+    __slots__ = ("value", "short_repr")
+
+    def __init__(self, value: Any, short_repr: Callable[[Any], str]):
+        self.value, self.short_repr = value, short_repr
+
+    def __str__(self) -> str:
+        return self.short_repr(self.value)
+
+def _make_short_repr(max_repr: Optional[int]) -> Callable[[Any], str]:
+    """repr() limited to about max_repr characters; reprlib never builds the full repr of big containers."""
+    if max_repr is None:
+        return repr
+    limited = reprlib.Repr()
+    limited.maxstring = limited.maxother = limited.maxlong = max(max_repr, 8)
+    # Every item or nesting level adds at least 2 characters, so a container only loses items
+    # (or levels) to these limits when its repr would pass max_repr anyway: small arguments
+    # show in full, and the character limit below decides where long ones are cut.
+    items = max(max_repr // 2, 6)
+    limited.maxlevel = limited.maxdict = limited.maxlist = limited.maxtuple = items
+    limited.maxset = limited.maxfrozenset = limited.maxdeque = limited.maxarray = items
+
+    def short_repr(value: Any) -> str:
+        text = limited.repr(value)
+        return text if len(text) <= max_repr else text[:max(max_repr - 3, 0)] + "..."
+    return short_repr
+
+def log_calls(func: Optional[Callable] = None, *, level: int = logging.INFO, sample_every: int = 1,
+              max_repr: Optional[int] = None) -> Callable:
+    """
+    Decorator that logs when a function is entered and exited, along with args and result.
+    Use it as @log_calls or @log_calls(sample_every=100, max_repr=80).
+
+    Args:
+        level (int): Log level of the entry/exit records. If the logger filters it out,
+            the wrapper does nothing but call the function (no repr, no formatting).
+        sample_every (int): Log only 1 in N calls (exceptions are always logged).
+        max_repr (int): Truncate the repr of each argument/result to about this many characters.
+            The default (None) logs full reprs; set it where calls may get big arguments.
+    """
+    if func is None:
+        return _with_options(lambda f: log_calls(f, level=level, sample_every=sample_every, max_repr=max_repr),
+                             log_calls, level=level, sample_every=sample_every, max_repr=max_repr)
+    if sample_every < 1:
+        raise ValueError("sample_every must be >= 1")
+
+    short_repr = _make_short_repr(max_repr)
+    counter = itertools.count() # next() on itertools.count is atomic, so sampling is thread-safe
+    name = func.__name__
+    is_enabled = logging.root.isEnabledFor # bound once; the level check itself is cached by logging
+
     @functools.wraps(func) # Preserves original function metadata (name, docstring, etc.)
     def wrapper(*args, **kwargs):
-        args_repr = [repr(a) for a in args]
-        kwargs_repr = [f"{k}={v!r}" for k, v in kwargs.items()]
-        signature = ", ".join(args_repr + kwargs_repr)
-        logging.info(f"Entering {func.__name__}({signature})")
+        if not is_enabled(level) or (sample_every > 1 and next(counter) % sample_every):
+            # Fast path: nothing will be logged for this call
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                logging.exception("Exception in %s: %s", name, e)
+                raise
+        # %s arguments are formatted by logging only if a handler really emits the record
+        logging.log(level, "Entering %s(%s)", name, _CallRepr(args, kwargs, short_repr))
         try:
             result = func(*args, **kwargs)
-            logging.info(f"Exiting {func.__name__} with result: {result!r}")
+            logging.log(level, "Exiting %s with result: %s", name, _ResultRepr(result, short_repr))
             return result
         except Exception as e:
-            logging.exception(f"Exception in {func.__name__}: {e}")
+            logging.exception("Exception in %s: %s", name, e)
             raise # Re-raise the exception after logging
-    return wrapper
+
+    @functools.wraps(func)
+    async def async_wrapper(*args, **kwargs):
+        # Same as wrapper, but the call is awaited, so "Exiting" shows the real result, not a coroutine
+        if not is_enabled(level) or (sample_every > 1 and next(counter) % sample_every):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                logging.exception("Exception in %s: %s", name, e)
+                raise
+        logging.log(level, "Entering %s(%s)", name, _CallRepr(args, kwargs, short_repr))
+        try:
+            result = await func(*args, **kwargs)
+            logging.log(level, "Exiting %s with result: %s", name, _ResultRepr(result, short_repr))
+            return result
+        except Exception as e:
+            logging.exception("Exception in %s: %s", name, e)
+            raise
+
+    return async_wrapper if inspect.iscoroutinefunction(func) else wrapper
 
 # ==============================================================================
 # 2. Timing Decorator
 # ==============================================================================
-def time_execution(func: Callable) -> Callable:
-    """Decorator that measures and prints the execution time of a function."""
+_SUB_BUCKET_BITS = 4 # 16 buckets per power of two: any recorded value is off by at most 1/16 (6.25%)
+_FLUSH_EVERY = 1024 # LatencyHistogram.record() only appends; buckets are updated in batches of this size
+
+def _bucket_index(ns: int) -> int:
+    """HDR-style log bucket of a duration in ns: exact below 32 ns, then 16 buckets per doubling."""
+    shift = ns.bit_length() - _SUB_BUCKET_BITS - 1
+    return (shift << _SUB_BUCKET_BITS) + (ns >> shift) if shift > 0 else ns
+
+def _bucket_upper_ns(index: int) -> int:
+    """Largest duration (ns) that falls into the bucket."""
+    shift = max(0, (index >> _SUB_BUCKET_BITS) - 1)
+    top = index - (shift << _SUB_BUCKET_BITS)
+    return ((top + 1) << shift) - 1
+
+class LatencySummary(NamedTuple):
+    """Summary of a latency histogram, in seconds."""
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+    max: float
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram: constant memory (a few hundred buckets at most)
+    however many durations are recorded, percentiles accurate to about 6%.
+    """
+
+    def __init__(self):
+        self._pending: list = []
+        self._buckets: Counter = Counter()
+        self._lock = threading.Lock()
+        self._count = 0
+        self._total_ns = 0
+        self._max_ns = 0
+
+    def record(self, ns: int):
+        """Adds one duration, in nanoseconds."""
+        pending = self._pending
+        pending.append(ns) # list.append is atomic, so the hot path needs no lock
+        if len(pending) >= _FLUSH_EVERY:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            pending = self._pending
+            n = len(pending)
+            batch = pending[:n]
+            del pending[:n] # values appended meanwhile by other threads stay for the next flush
+            if not batch:
+                return
+            self._buckets.update(map(_bucket_index, batch))
+            self._count += n
+            self._total_ns += sum(batch)
+            self._max_ns = max(self._max_ns, max(batch))
+
+    def percentile(self, fraction: float) -> float:
+        """Duration in seconds below which `fraction` (0..1) of the recorded calls fall."""
+        self._flush()
+        with self._lock:
+            if not self._count:
+                return 0.0
+            rank = max(1, round(fraction * self._count)) # nearest-rank
+            seen = 0
+            for index in sorted(self._buckets):
+                seen += self._buckets[index]
+                if seen >= rank:
+                    return min(_bucket_upper_ns(index), self._max_ns) / 1e9
+            return self._max_ns / 1e9
+
+    def summary(self) -> LatencySummary:
+        self._flush()
+        count = self._count
+        return LatencySummary(
+            count,
+            self._total_ns / count / 1e9 if count else 0.0,
+            self.percentile(0.50),
+            self.percentile(0.95),
+            self.percentile(0.99),
+            self._max_ns / 1e9,
+        )
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+            self._buckets.clear()
+            self._count = self._total_ns = self._max_ns = 0
+
+class MetricsRegistry:
+    """Process-wide collection of latency histograms, one per function name."""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Returns the histogram called `name`, creating it on first use."""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = LatencyHistogram()
+            return self._histograms[name]
+
+    def snapshot(self) -> Dict[str, LatencySummary]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.summary() for name, histogram in sorted(histograms.items())}
+
+    def report(self) -> str:
+        """Human readable table, one row per function (times in milliseconds)."""
+        lines = [f"{'function':40s} {'count':>8} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"]
+        for name, s in self.snapshot().items():
+            lines.append(f"{name:40s} {s.count:8d} " + " ".join(
+                f"{value * 1000:9.3f}" for value in (s.mean, s.p50, s.p95, s.p99, s.max)))
+        return "\n".join(lines)
+
+    def export_text(self, path: Optional[str] = None) -> str:
+        """
+        Prometheus text exposition format (a "summary" with quantiles, in seconds).
+        Written to `path` if given (a node-exporter textfile collector can pick it up), and returned.
+        """
+        lines = [
+            "# HELP function_latency_seconds Execution time of functions decorated with @time_execution.",
+            "# TYPE function_latency_seconds summary",
+        ]
+        for name, s in self.snapshot().items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for quantile, value in (("0.5", s.p50), ("0.95", s.p95), ("0.99", s.p99), ("1", s.max)):
+                lines.append(f'function_latency_seconds{{function="{label}",quantile="{quantile}"}} {value:.9f}')
+            lines.append(f'function_latency_seconds_sum{{function="{label}"}} {s.mean * s.count:.9f}')
+            lines.append(f'function_latency_seconds_count{{function="{label}"}} {s.count}')
+        text = "\n".join(lines) + "\n"
+        if path is not None:
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path) # atomic, a scraper never sees a half-written file
+        return text
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+METRICS = MetricsRegistry() # The default, process-wide registry
+
+def time_execution(func: Optional[Callable] = None, *, name: Optional[str] = None, log: bool = True,
+                   registry: Optional[MetricsRegistry] = None) -> Callable:
+    """
+    Decorator that measures the execution time of a function.
+    Every duration goes into a histogram in `registry` (default: METRICS); print METRICS.report()
+    or call METRICS.export_text(path) to see the distribution.
+
+    Args:
+        name (str): Histogram name (default: module.qualname of the function).
+        log (bool): Also log one INFO line per call. Use @time_execution(log=False) on hot paths.
+        registry (MetricsRegistry): Where the histogram lives.
+    """
+    if func is None:
+        return _with_options(lambda f: time_execution(f, name=name, log=log, registry=registry),
+                             time_execution, name=name, log=log, registry=registry)
+
+    histogram = (registry or METRICS).histogram(name or f"{func.__module__}.{func.__qualname__}")
+    record = histogram.record
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.perf_counter() # More precise than time.time() for duration
-        result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        total_time = end_time - start_time
-        logging.info(f"Function {func.__name__} took {total_time:.4f} seconds to execute.")
+        start_time = time.perf_counter_ns() # Integer ns: more precise than time.time() for duration
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            total_ns = time.perf_counter_ns() - start_time
+            record(total_ns) # failed calls count too, they are part of the latency distribution
+        if log:
+            logging.info("Function %s took %.4f seconds to execute.", func.__name__, total_ns / 1e9)
         return result
-    return wrapper
+
+    @functools.wraps(func)
+    async def async_wrapper(*args, **kwargs):
+        # Times the awaited execution (including time spent waiting on I/O), not just creating the coroutine
+        start_time = time.perf_counter_ns()
+        try:
+            result = await func(*args, **kwargs)
+        finally:
+            total_ns = time.perf_counter_ns() - start_time
+            record(total_ns)
+        if log:
+            logging.info("Function %s took %.4f seconds to execute.", func.__name__, total_ns / 1e9)
+        return result
+
+    decorated = async_wrapper if inspect.iscoroutinefunction(func) else wrapper
+    decorated.histogram = histogram
+    return decorated
 
 # ==============================================================================
 # 3. Authorization Decorator (Simulated)
 # ==============================================================================
-# Simulate a global user context (in real apps, this might come from a request, session, etc.)
-CURRENT_USER_PERMISSIONS = {'view', 'edit'}
+class UserContext(NamedTuple):
+    """Who is calling: an id (the permission cache key) and the roles they hold."""
+    user_id: str
+    roles: FrozenSet[str]
+    extra_permissions: FrozenSet[str] = frozenset() # granted directly, outside any role
+
+class PermissionResolver:
+    """
+    Turns role-based, nested permission definitions into one flat set per user.
+
+    Role hierarchies are expanded once (when the resolver is built or update_roles is called),
+    and the effective permission set of each user is computed on their first check and cached
+    by user_id. Call invalidate(user_id) when a user's roles change, or invalidate() for everyone.
+    """
+
+    def __init__(self, role_permissions: Dict[str, Iterable[str]],
+                 role_parents: Optional[Dict[str, Iterable[str]]] = None):
+        self._lock = threading.Lock()
+        self._cache: Dict[str, FrozenSet[str]] = {}
+        self._generation = 0 # bumped by every invalidation, so a slow resolve can't store a stale set
+        self.update_roles(role_permissions, role_parents)
+
+    @staticmethod
+    def _expand_roles(role_permissions, role_parents) -> Dict[str, FrozenSet[str]]:
+        """Permissions of each role including everything inherited from its parent roles."""
+        expanded: Dict[str, FrozenSet[str]] = {}
+
+        def expand(role: str, path: tuple) -> FrozenSet[str]:
+            if role in expanded:
+                return expanded[role]
+            if role in path:
+                raise ValueError(f"Role hierarchy has a cycle: {' -> '.join(path + (role,))}")
+            if role not in role_permissions:
+                raise ValueError(f"Unknown role: {role!r}")
+            permissions = set(role_permissions[role])
+            for parent in role_parents.get(role, ()):
+                permissions |= expand(parent, path + (role,))
+            expanded[role] = frozenset(permissions)
+            return expanded[role]
+
+        for role in role_permissions:
+            expand(role, ())
+        return expanded
+
+    def update_roles(self, role_permissions: Dict[str, Iterable[str]],
+                     role_parents: Optional[Dict[str, Iterable[str]]] = None):
+        """Replaces the role definitions and drops every cached user."""
+        expanded = self._expand_roles(role_permissions, role_parents or {})
+        with self._lock:
+            self._roles = expanded
+            self._cache.clear()
+            self._generation += 1
+
+    def effective_permissions(self, user: UserContext) -> FrozenSet[str]:
+        """All permissions of `user` (cached after the first call)."""
+        try:
+            return self._cache[user.user_id] # Hot path: one dict lookup
+        except KeyError:
+            pass
+        with self._lock:
+            generation, roles = self._generation, self._roles
+        permissions = frozenset(user.extra_permissions).union(
+            *(roles[role] for role in user.roles if role in roles))
+        with self._lock:
+            if generation == self._generation:
+                self._cache[user.user_id] = permissions
+        return permissions
 
-def require_permission(required_permission: str) -> Callable:
+    def invalidate(self, user_id: Optional[str] = None):
+        """Forget the cached permissions of one user (or of all users)."""
+        with self._lock:
+            if user_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(user_id, None)
+            self._generation += 1
+
+# Simulated roles and user context (in real apps, these come from a database and the request/session).
+# editor inherits everything a viewer can do, admin everything an editor can do.
+PERMISSIONS = PermissionResolver(
+    role_permissions={'viewer': {'view'}, 'editor': {'edit'}, 'admin': {'admin'}},
+    role_parents={'editor': {'viewer'}, 'admin': {'editor'}},
+)
+# A ContextVar, so every thread and every asyncio task can act as a different user
+CURRENT_USER: contextvars.ContextVar = contextvars.ContextVar(
+    "CURRENT_USER", default=UserContext("alice", frozenset({'editor'})))
+
+def require_permission(required_permission: str, *, resolver: Optional[PermissionResolver] = None,
+                       log_every: int = 100) -> Callable:
     """
-    Decorator factory that checks if the 'current user' has the required permission.
+    Decorator factory that checks if the 'current user' (CURRENT_USER) has the required permission.
     Note: This takes an argument, so it requires an extra layer of nesting.
+
+    Args:
+        resolver (PermissionResolver): Where permissions are looked up (default: PERMISSIONS).
+        log_every (int): Grants are logged at DEBUG, only 1 in this many. Denials are always
+            logged at WARNING.
     """
+    if log_every < 1:
+        raise ValueError("log_every must be >= 1")
+
     def decorator(func: Callable) -> Callable:
+        counter = itertools.count()
+        is_enabled = logging.root.isEnabledFor
+
+        def deny(user: UserContext):
+            logging.warning(f"Permission '{required_permission}' denied to {user.user_id} for {func.__name__}.")
+            # In a real app, you might return an error response instead
+            raise PermissionError(f"User lacks required permission: '{required_permission}'")
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            if required_permission in CURRENT_USER_PERMISSIONS:
-                logging.info(f"Permission '{required_permission}' granted for {func.__name__}.")
-                return func(*args, **kwargs)
-            else:
-                logging.warning(f"Permission '{required_permission}' denied for {func.__name__}.")
-                # In a real app, you might raise an exception or return an error response
-                raise PermissionError(f"User lacks required permission: '{required_permission}'")
-        return wrapper
-    return decorator # The factory returns the actual decorator
+            user = CURRENT_USER.get()
+            if required_permission not in (resolver or PERMISSIONS).effective_permissions(user):
+                deny(user)
+            if is_enabled(logging.DEBUG) and next(counter) % log_every == 0:
+                logging.debug("Permission '%s' granted to %s for %s.", required_permission, user.user_id, func.__name__)
+            return func(*args, **kwargs)
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            # Checked when the coroutine starts running, i.e. when it is awaited
+            user = CURRENT_USER.get()
+            if required_permission not in (resolver or PERMISSIONS).effective_permissions(user):
+                deny(user)
+            if is_enabled(logging.DEBUG) and next(counter) % log_every == 0:
+                logging.debug("Permission '%s' granted to %s for %s.", required_permission, user.user_id, func.__name__)
+            return await func(*args, **kwargs)
+
+        return async_wrapper if inspect.iscoroutinefunction(func) else wrapper
+    # The factory returns the actual decorator
+    return _with_options(decorator, require_permission, required_permission=required_permission,
+                         resolver=resolver, log_every=log_every)
 
 # ==============================================================================
 # 4. Caching/Memoization Decorator
 # ==============================================================================
-def memoize(func: Callable) -> Callable:
-    """Basic memoization decorator to cache results of function calls."""
-    cache = {}
+class CacheInfo(NamedTuple):
+    """Same fields as functools.lru_cache's cache_info()."""
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+_MISSING = object() # Sentinel: "not in the cache" (None is a valid cached result)
+
+class _KeyTag:
+    """Marker inside a cache key. Only equal to itself, so it can never be confused with an argument."""
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"<{self.name}>"
+
+_KWARGS_MARK = _KeyTag("kwargs") # Separates positional from keyword arguments in a cache key
+_LIST_TAG = _KeyTag("list")
+_DICT_TAG = _KeyTag("dict")
+_SET_TAG = _KeyTag("set")
+_NDARRAY_TAG = _KeyTag("ndarray")
+
+# --- Cache keys for unhashable arguments ---
+def freeze_arg(value: Any) -> Any:
+    """
+    Return a hashable stand-in for `value`: equal values (e.g. two lists with the same items)
+    give equal stand-ins, and a list never collides with a tuple of the same items.
+    Lists, dicts, sets (and their subclasses, e.g. defaultdict) and NumPy arrays (hashed by
+    dtype, shape and contents) are supported.
+    """
+    if isinstance(value, tuple):
+        return tuple(freeze_arg(item) for item in value)
+    if isinstance(value, list):
+        return (_LIST_TAG,) + tuple(freeze_arg(item) for item in value)
+    if isinstance(value, OrderedDict):
+        # Order matters when comparing two OrderedDicts, so it is part of the key
+        return (_DICT_TAG, tuple((freeze_arg(k), freeze_arg(v)) for k, v in value.items()))
+    if isinstance(value, dict):
+        # frozenset: {"a": 1, "b": 2} and {"b": 2, "a": 1} are equal dicts
+        return (_DICT_TAG, frozenset((freeze_arg(k), freeze_arg(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return (_SET_TAG, frozenset(freeze_arg(item) for item in value))
+    if hasattr(value, "__array_interface__") and hasattr(value, "dtype"):
+        # NumPy array (checked by duck typing, so NumPy is not needed to import this module)
+        if value.dtype.hasobject:
+            return (_NDARRAY_TAG, value.dtype.str, value.shape, freeze_arg(value.tolist()))
+        if not value.flags["C_CONTIGUOUS"]:
+            value = value.copy(order="C")
+        # SHA-1 of the raw buffer (no copy): hardware-accelerated on most CPUs, and not used for security
+        return (_NDARRAY_TAG, value.dtype.str, value.shape, hashlib.sha1(value, usedforsecurity=False).digest())
+    hash(value) # Anything else must be hashable: raises TypeError otherwise
+    return value
+
+def _freeze_values(values) -> tuple:
+    key = tuple(values)
+    try:
+        hash(key) # Fast path: all arguments hashable (no Python-level loop)
+        return key
+    except TypeError:
+        return tuple(freeze_arg(value) for value in values)
+
+def signature_key_builder(func: Callable) -> Callable[[tuple, dict], Any]:
+    """
+    Build a key function key(args, kwargs) for `func` that normalizes calls through its signature:
+    f(1, 2), f(1, b=2) and f(b=2, a=1) (and f(1) if b defaults to 2) all give the same key.
+    Unhashable arguments are frozen with freeze_arg. Invalid calls raise TypeError, like the call would.
+    """
+    signature = inspect.signature(func)
+    params = list(signature.parameters.values())
+    positional_kinds = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+    def general_key(args: tuple, kwargs: dict):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return _freeze_values(bound.args) + (_KWARGS_MARK,) + _freeze_values(sorted(bound.kwargs.items()))
+
+    if not all(param.kind in positional_kinds for param in params):
+        return general_key # *args, **kwargs or keyword-only parameters
+
+    # Only plain parameters: map keywords to positions without inspect.Signature.bind
+    names = [param.name if param.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD else None for param in params]
+    defaults = [param.default for param in params]
+    count = len(params)
+
+    def simple_key(args: tuple, kwargs: dict):
+        if not kwargs and len(args) == count:
+            return _freeze_values(args)
+        if len(args) > count:
+            return general_key(args, kwargs) # Raises the TypeError
+        values = list(args)
+        used = 0
+        for i in range(len(args), count):
+            name = names[i]
+            if name is not None and name in kwargs:
+                values.append(kwargs[name])
+                used += 1
+            elif defaults[i] is not inspect.Parameter.empty:
+                values.append(defaults[i])
+            else:
+                return general_key(args, kwargs) # Missing argument: raises the TypeError
+        if used != len(kwargs):
+            return general_key(args, kwargs) # Unknown or duplicate keyword: raises the TypeError
+        return _freeze_values(values)
+
+    return simple_key
+
+# --- Cache backends ---
+# memoize stores results through a backend: get(key) -> result or _MISSING, set(key, result),
+# clear() and len(). bind(func) is called once when the backend is attached to a function.
+# A backend with thread_safe = True locks itself, so memoize(thread_safe=True) calls its get/set
+# without holding memoize's own lock (a slow disk read then only blocks the thread doing it).
+
+class MemoryBackend:
+    """In-process cache: an OrderedDict in LRU order, with optional size limit and TTL."""
+    thread_safe = False # Dict operations are fast: memoize runs them under its lock
+
+    def __init__(self, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or >= 0")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (result, expiry time or None)
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def bind(self, func: Callable):
+        pass
+
+    def get(self, key):
+        entry = self._data.get(key, _MISSING)
+        if entry is not _MISSING:
+            result, expires_at = entry
+            if expires_at is None or expires_at > time.monotonic():
+                if self.maxsize is not None:
+                    self._data.move_to_end(key)
+                return result
+            del self._data[key] # Expired
+        return _MISSING
+
+    def set(self, key, result):
+        if self.maxsize != 0:
+            self._data[key] = (result, time.monotonic() + self.ttl if self.ttl is not None else None)
+            if self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False) # Evict the least recently used entry
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _feed_digest(digest, obj):
+    """Feed a type-tagged encoding of obj into a hashlib object (same value -> same bytes in every process)."""
+    if isinstance(obj, _KeyTag):
+        digest.update(b"T" + obj.name.encode() + b";")
+    elif obj is None or isinstance(obj, (bool, int, float, complex)):
+        digest.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, str):
+        digest.update(b"s%d:" % len(obj) + obj.encode("utf-8", "surrogatepass"))
+    elif isinstance(obj, bytes):
+        digest.update(b"b%d:" % len(obj) + obj)
+    elif isinstance(obj, tuple):
+        digest.update(b"t%d(" % len(obj))
+        for item in obj:
+            _feed_digest(digest, item)
+        digest.update(b")")
+    elif isinstance(obj, frozenset):
+        # Set order is not stable between processes (string hashing is randomized): sort the item digests
+        items = sorted(stable_digest(item) for item in obj)
+        digest.update(b"f%d(" % len(items) + b"".join(items) + b")")
+    else:
+        digest.update(b"p:" + pickle.dumps(obj, protocol=4))
+
+def stable_digest(key) -> bytes:
+    """SHA-256 of a cache key that does not change between runs (unlike hash())."""
+    digest = hashlib.sha256()
+    _feed_digest(digest, key)
+    return digest.digest()
+
+def function_version(func: Callable) -> str:
+    """Hash of the function's source code (or bytecode if the source is not available)."""
+    try:
+        source = inspect.getsource(func).encode()
+    except (OSError, TypeError):
+        code = func.__code__
+        source = code.co_code + repr(code.co_consts).encode()
+    return hashlib.sha256(source).hexdigest()
+
+
+class SqliteBackend:
+    """
+    On-disk cache in a SQLite file, shared by every function (and process) that uses the same path.
+
+    Results survive restarts. Each row remembers the hash of the function's source code, so
+    after the function is edited its old results are dropped instead of being served stale
+    (rows written later by another version, e.g. an older process, are never returned either).
+    Results must be picklable. Use one SqliteBackend object per decorated function.
+
+    Args:
+        path (str): SQLite database file.
+        maxsize (int): Keep at most this many results per function (least recently used are evicted).
+        ttl (float): Results older than this many seconds are computed again.
+    """
+
+    thread_safe = True # Every query takes self._lock
+
+    def __init__(self, path: str, maxsize: Optional[int] = None, ttl: Optional[float] = None):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or >= 0")
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = ""
+        self.version = ""
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS memoize ("
+            " func TEXT, key BLOB, version TEXT, value BLOB, created REAL, used REAL,"
+            " PRIMARY KEY (func, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS memoize_lru ON memoize (func, used)")
+
+    def bind(self, func: Callable):
+        """Attach to `func` and drop results stored by other versions of its source code."""
+        if self.name:
+            raise ValueError(f"This backend is already used by {self.name}")
+        module = func.__module__
+        if module == "__main__":
+            # Same name whether the file is run as a script or imported
+            module = os.path.splitext(os.path.basename(getattr(sys.modules["__main__"], "__file__", "main")))[0]
+        self.name = f"{module}.{func.__qualname__}"
+        self.version = function_version(func)
+        with self._lock:
+            self._db.execute("DELETE FROM memoize WHERE func = ? AND version != ?", (self.name, self.version))
+
+    def get(self, key):
+        digest = stable_digest(key)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, created FROM memoize WHERE func = ? AND key = ? AND version = ?",
+                (self.name, digest, self.version),
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            if self.ttl is not None and row[1] + self.ttl <= now:
+                self._db.execute("DELETE FROM memoize WHERE func = ? AND key = ?", (self.name, digest))
+                return _MISSING
+            if self.maxsize is not None:
+                self._db.execute("UPDATE memoize SET used = ? WHERE func = ? AND key = ?", (now, self.name, digest))
+        return pickle.loads(row[0])
+
+    def set(self, key, result):
+        if self.maxsize == 0:
+            return
+        digest = stable_digest(key)
+        value = pickle.dumps(result, protocol=4)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO memoize (func, key, version, value, created, used) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.name, digest, self.version, value, now, now),
+            )
+            if self.maxsize is not None:
+                # Keep the `maxsize` most recently used rows of this function
+                self._db.execute(
+                    "DELETE FROM memoize WHERE func = ? AND key IN ("
+                    " SELECT key FROM memoize WHERE func = ? AND version = ? ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self.name, self.name, self.version, self.maxsize),
+                )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM memoize WHERE func = ?", (self.name,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM memoize WHERE func = ? AND version = ?", (self.name, self.version)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class _InFlight:
+    """A result that one thread is computing and other threads can wait for (single-flight)."""
+    __slots__ = ("owner", "done", "result", "error")
+
+    def __init__(self):
+        self.owner = threading.get_ident()
+        self.done = threading.Event() # Acts as the per-key lock: waiters block on it, not on the cache
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+def memoize(func: Optional[Callable] = None, *, maxsize: Optional[int] = None, ttl: Optional[float] = None,
+            thread_safe: bool = False, backend: Any = None, normalize_args: bool = False) -> Callable:
+    """
+    Memoization decorator to cache results of function calls.
+    Use it as @memoize (unbounded) or @memoize(maxsize=128, ttl=60.0).
+
+    Args:
+        maxsize (int): Keep at most this many results, evicting the least recently used one.
+        ttl (float): Results older than this many seconds are computed again.
+        thread_safe (bool): Protect the cache with a lock and compute each missing key only once
+            when several threads ask for it at the same time (the others wait for that result).
+        backend: Where results are stored, e.g. SqliteBackend("cache.db", maxsize=10_000).
+            Defaults to MemoryBackend(maxsize, ttl); a custom backend has its own maxsize/ttl.
+        normalize_args (bool): Build keys with signature_key_builder, so f(1, 2) and f(1, b=2)
+            share a cache entry and lists/dicts/sets/NumPy arrays can be arguments.
+
+    The wrapper gets cache_info() and cache_clear(), like functools.lru_cache.
+    On an `async def` function the awaited result is cached, and concurrent awaiters
+    of the same missing key share one asyncio Task (single-flight on the event loop).
+    """
+    if func is None:
+        # Called with options: @memoize(maxsize=...) -> return the actual decorator
+        return _with_options(
+            lambda f: memoize(f, maxsize=maxsize, ttl=ttl, thread_safe=thread_safe, backend=backend,
+                              normalize_args=normalize_args),
+            memoize, maxsize=maxsize, ttl=ttl, thread_safe=thread_safe, backend=backend, normalize_args=normalize_args)
+    if backend is None:
+        backend = MemoryBackend(maxsize, ttl)
+    elif maxsize is not None or ttl is not None:
+        raise ValueError("Set maxsize and ttl on the backend, not on memoize")
+    backend.bind(func)
+    make_key = signature_key_builder(func) if normalize_args else None
+    hits = misses = 0
+
+    def lookup(key):
+        """Return the cached result (and count a hit) or _MISSING."""
+        nonlocal hits
+        result = backend.get(key)
+        if result is not _MISSING:
+            # Cache hit: the hot path, so no logging here (see cache_info() for hit counts)
+            hits += 1
+        return result
+
+    store = backend.set
+
+    def log_miss(key):
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f"Cache miss for {func.__name__} with key {key}. Computing...")
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        nonlocal misses
         # Create a cache key from arguments (must be hashable)
-        # Note: This simple key doesn't handle unhashable args like lists/dicts directly
-        # or keyword argument order differences. More robust keys might be needed.
-        key_args = tuple(args)
-        key_kwargs = tuple(sorted(kwargs.items()))
-        key = (key_args, key_kwargs)
-
-        if key in cache:
-            logging.info(f"Cache hit for {func.__name__} with key {key}")
-            return cache[key]
+        # Note: This simple key doesn't handle unhashable args like lists/dicts, and f(1, 2)
+        # and f(1, b=2) get different keys. normalize_args=True handles both.
+        if make_key is None:
+            key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items())) if kwargs else args
         else:
-            logging.info(f"Cache miss for {func.__name__} with key {key}. Computing...")
-            result = func(*args, **kwargs)
-            cache[key] = result
+            key = make_key(args, kwargs)
+
+        result = lookup(key)
+        if result is not _MISSING:
             return result
-    return wrapper
+        misses += 1
+        log_miss(key)
+        result = func(*args, **kwargs)
+        store(key, result)
+        return result
+
+    # --- thread_safe=True ---
+    # One lock guards the cache dictionaries, but it is only held for quick dict operations,
+    # never while func runs. Each key being computed has its own _InFlight entry to wait on.
+    # A thread-safe backend (SqliteBackend) is read and written outside the lock, so threads do
+    # not queue behind each other's disk I/O; the lock then only covers in_flight and the counters.
+    lock = threading.Lock()
+    in_flight: Dict[Any, _InFlight] = {}
+    unlocked_backend = getattr(backend, "thread_safe", False)
+    stored = 0 # Results stored by leaders; a change means a backend miss read earlier may be stale
+
+    @functools.wraps(func)
+    def safe_wrapper(*args, **kwargs):
+        nonlocal hits, misses, stored
+        if make_key is None:
+            key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items())) if kwargs else args
+        else:
+            key = make_key(args, kwargs)
+
+        while True:
+            if unlocked_backend:
+                seen = stored
+                result = backend.get(key) # Disk I/O without memoize's lock
+                if result is not _MISSING:
+                    with lock:
+                        hits += 1
+                    return result
+            with lock:
+                if not unlocked_backend:
+                    result = lookup(key)
+                    if result is not _MISSING:
+                        return result
+                elif stored != seen:
+                    # A leader stored a result after our read (maybe for this key): read again,
+                    # instead of becoming the leader and computing it a second time
+                    continue
+                call = in_flight.get(key)
+                if call is None:
+                    # We are the leader: compute it
+                    call = in_flight[key] = _InFlight()
+                    misses += 1
+                    leader = True
+                else:
+                    # Someone is already computing it: wait for their result
+                    hits += 1
+                    leader = False
+            break
+
+        if not leader:
+            if call.owner == threading.get_ident():
+                # The same thread asked for the same key again (recursion): waiting would deadlock
+                return func(*args, **kwargs)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        log_miss(key)
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e # Waiters get the same exception, nothing is cached
+            raise
+        finally:
+            # Stored before leaving in_flight, so no one recomputes it
+            if unlocked_backend:
+                if call.error is None:
+                    store(key, call.result)
+                with lock:
+                    stored += call.error is None
+                    del in_flight[key]
+            else:
+                with lock:
+                    if call.error is None:
+                        store(key, call.result)
+                    del in_flight[key]
+            call.done.set()
+        return call.result
+
+    # --- async def functions ---
+    # Caching the coroutine object would be wrong (it can only be awaited once), so the cache
+    # stores the awaited result. Concurrent awaiters of a missing key share one asyncio Task.
+    tasks: Dict[Any, asyncio.Task] = {}
+
+    def task_done(key, task: asyncio.Task):
+        del tasks[key]
+        if not task.cancelled() and task.exception() is None:
+            store(key, task.result())
+
+    @functools.wraps(func)
+    async def async_wrapper(*args, **kwargs):
+        nonlocal hits, misses
+        if make_key is None:
+            key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items())) if kwargs else args
+        else:
+            key = make_key(args, kwargs)
+
+        result = lookup(key)
+        if result is not _MISSING:
+            return result
+        task = tasks.get(key)
+        if task is None:
+            misses += 1
+            log_miss(key)
+            task = tasks[key] = asyncio.get_running_loop().create_task(func(*args, **kwargs))
+            task.add_done_callback(functools.partial(task_done, key))
+        else:
+            hits += 1
+        # shield: one awaiter being cancelled must not cancel the computation the others wait for
+        return await asyncio.shield(task)
+
+    def cache_info() -> CacheInfo:
+        with lock:
+            return CacheInfo(hits, misses, backend.maxsize, len(backend))
+
+    def cache_clear():
+        nonlocal hits, misses
+        with lock:
+            backend.clear()
+            hits = misses = 0
+
+    if inspect.iscoroutinefunction(func):
+        decorated = async_wrapper # Runs on one event loop thread, so single-flight needs no lock
+    else:
+        decorated = safe_wrapper if thread_safe else wrapper
+    decorated.cache_info = cache_info
+    decorated.cache_clear = cache_clear
+    decorated.cache_backend = backend
+    return decorated
+
+
+# ==============================================================================
+# 5. Fused Decorator Stacks
+# ==============================================================================
+# A stack like @memoize @time_execution @log_calls costs three wrapper frames and three
+# *args/**kwargs repacks per call. fused(memoize, time_execution, log_calls) takes the same
+# decorators in the same order and generates the source code of ONE wrapper doing all three
+# (the way dataclasses generates __init__), then compiles it with exec().
+# Every layer below gets the lines of the layers inside it and returns its own lines around them.
+# The layers never `return` early, so the outer layers always see `result` (or an exception).
+
+def _indent(lines: List[str]) -> List[str]:
+    return ["    " + line for line in lines]
+
+def _fuse_log_calls(inner: List[str], env: Dict[str, Any], level: int = logging.INFO, sample_every: int = 1,
+                    max_repr: Optional[int] = None) -> List[str]:
+    if sample_every < 1:
+        raise ValueError("sample_every must be >= 1")
+    env.update(log_level=level, log_counter=itertools.count(), log_sample_every=sample_every,
+               log_short_repr=_make_short_repr(max_repr))
+    skip = "not is_enabled(log_level)"
+    if sample_every > 1:
+        skip += " or next(log_counter) % log_sample_every"
+    log_error = ["except Exception as e:",
+                 "    logging.exception('Exception in %s: %s', name, e)",
+                 "    raise"]
+    return [f"if {skip}:",
+            *_indent(["try:", *_indent(inner), *log_error]),
+            "else:",
+            *_indent(["logging.log(log_level, 'Entering %s(%s)', name, _CallRepr(args, kwargs, log_short_repr))",
+                      "try:", *_indent(inner), *log_error,
+                      "logging.log(log_level, 'Exiting %s with result: %s', name, _ResultRepr(result, log_short_repr))"])]
+
+def _fuse_time_execution(inner: List[str], env: Dict[str, Any], name: Optional[str] = None, log: bool = True,
+                         registry: Optional[MetricsRegistry] = None) -> List[str]:
+    func = env["func"]
+    histogram = (registry or METRICS).histogram(name or f"{func.__module__}.{func.__qualname__}")
+    env.update(timing_record=histogram.record, perf_counter_ns=time.perf_counter_ns)
+    env["attributes"]["histogram"] = histogram
+    lines = ["start_ns = perf_counter_ns()",
+             "try:", *_indent(inner),
+             "finally:",
+             "    total_ns = perf_counter_ns() - start_ns",
+             "    timing_record(total_ns)"]
+    if log:
+        lines.append("logging.info('Function %s took %.4f seconds to execute.', name, total_ns / 1e9)")
+    return lines
+
+def _fuse_require_permission(inner: List[str], env: Dict[str, Any], required_permission: str,
+                             resolver: Optional[PermissionResolver] = None, log_every: int = 100) -> List[str]:
+    # The decorator made by require_permission() already checked log_every
+    name = env["name"]
+
+    def deny(user: UserContext):
+        logging.warning(f"Permission '{required_permission}' denied to {user.user_id} for {name}.")
+        raise PermissionError(f"User lacks required permission: '{required_permission}'")
+
+    env.update(permission=required_permission, permission_resolver=resolver, permission_deny=deny,
+               permission_counter=itertools.count(), permission_log_every=log_every)
+    return ["user = CURRENT_USER.get()",
+            "if permission not in (permission_resolver or PERMISSIONS).effective_permissions(user):",
+            "    permission_deny(user)",
+            "if is_enabled(logging.DEBUG) and next(permission_counter) % permission_log_every == 0:",
+            "    logging.debug(\"Permission '%s' granted to %s for %s.\", permission, user.user_id, name)",
+            *inner]
+
+def _fuse_memoize(inner: List[str], env: Dict[str, Any], maxsize: Optional[int] = None, ttl: Optional[float] = None,
+                  thread_safe: bool = False, backend: Any = None, normalize_args: bool = False) -> List[str]:
+    if thread_safe:
+        raise ValueError("fused() has no single-flight mode; stack @memoize(thread_safe=True) instead")
+    if backend is None:
+        backend = MemoryBackend(maxsize, ttl)
+    elif maxsize is not None or ttl is not None:
+        raise ValueError("Set maxsize and ttl on the backend, not on memoize")
+    backend.bind(env["func"])
+    env.update(cache_backend=backend, cache_get=backend.get, cache_set=backend.set)
+    if normalize_args:
+        env["make_key"] = signature_key_builder(env["func"])
+        key = "key = make_key(args, kwargs)"
+    else:
+        key = "key = args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items())) if kwargs else args"
+    return [key,
+            "result = cache_get(key)",
+            "if result is _MISSING:",
+            "    misses += 1",
+            "    if is_enabled(logging.DEBUG):",
+            "        logging.debug(f'Cache miss for {name} with key {key}. Computing...')",
+            *_indent(inner),
+            "    cache_set(key, result)",
+            "else:",
+            "    hits += 1"]
+
+_FUSE_LAYERS = {
+    log_calls: _fuse_log_calls,
+    time_execution: _fuse_time_execution,
+    require_permission: _fuse_require_permission,
+    memoize: _fuse_memoize,
+}
+
+_CACHE_FUNCTIONS = """
+    def cache_info():
+        return CacheInfo(hits, misses, cache_backend.maxsize, len(cache_backend))
+    def cache_clear():
+        nonlocal hits, misses
+        cache_backend.clear()
+        hits = misses = 0
+"""
+
+def fused(*decorators: Callable) -> Callable:
+    """
+    Fuses a stack of this file's decorators into a single generated wrapper (one frame per call).
+    @fused(memoize, time_execution, log_calls) behaves like @memoize @time_execution @log_calls:
+    the first decorator is the outermost layer. Configured decorators work too, e.g.
+    @fused(require_permission('edit'), memoize(maxsize=128), log_calls(sample_every=100)).
+    Only synchronous functions; memoize(thread_safe=True) is not supported.
+    The generated code is kept in wrapper.fused_source.
+    """
+    layers = []
+    for decorator in decorators:
+        factory, options = getattr(decorator, "fuse_options", (decorator, {}))
+        if factory not in _FUSE_LAYERS:
+            raise TypeError(f"fused() cannot fuse {decorator!r}")
+        if any(factory is other for other, _ in layers):
+            raise ValueError(f"{factory.__name__} appears twice in fused()")
+        layers.append((factory, options))
+
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            raise TypeError("fused() makes synchronous wrappers; stack the decorators on an async def")
+        env: Dict[str, Any] = {"func": func, "name": func.__name__, "is_enabled": logging.root.isEnabledFor,
+                               "attributes": {}}
+        lines = ["result = func(*args, **kwargs)"]
+        for factory, options in reversed(layers): # innermost first
+            lines = _FUSE_LAYERS[factory](lines, env, **options)
+        lines.append("return result")
+
+        attributes = env.pop("attributes")
+        cached = "cache_backend" in env
+        if cached:
+            lines.insert(0, "nonlocal hits, misses")
+        source = (f"def __create_fn__({', '.join(env)}):\n"
+                  + ("    hits = misses = 0\n" if cached else "")
+                  + "    def wrapper(*args, **kwargs):\n"
+                  + "".join(f"        {line}\n" for line in lines)
+                  + (_CACHE_FUNCTIONS if cached else "")
+                  + f"    return wrapper{', cache_info, cache_clear' if cached else ''}\n")
+        namespace: Dict[str, Any] = {}
+        exec(source, globals(), namespace) # globals(): CURRENT_USER, PERMISSIONS etc. are looked up per call
+        created = namespace["__create_fn__"](**env)
+
+        wrapper = functools.wraps(func)(created[0] if cached else created)
+        if cached:
+            wrapper.cache_info, wrapper.cache_clear = created[1], created[2]
+            wrapper.cache_backend = env["cache_backend"]
+        for attribute, value in attributes.items():
+            setattr(wrapper, attribute, value)
+        wrapper.fused_source = source
+        return wrapper
+    return decorate
 
 
 # --- Example Functions Using Decorators ---
@@ -108,6 +1140,19 @@ def simulate_long_task(duration: float):
     logging.info("Simulation complete.")
     return "Task Finished"
 
+@memoize
+@require_permission('view')
+@time_execution # Times the awaited fetch, not the creation of the coroutine
+async def fetch_profile(user_id: int) -> dict:
+    """Simulates an async API call (like Example_MultiThread.async_fetch_data)."""
+    await asyncio.sleep(0.2)
+    return {"id": user_id, "name": f"user{user_id}"}
+
+@time_execution(log=False) # Hot path: only the histogram, no log line per call
+def quick_task():
+    """A short task called many times."""
+    return sum(range(1000))
+
 @require_permission('edit')
 @log_calls # Decorators stack - executed top-down at call time
 def update_record(record_id: int, data: dict):
@@ -115,7 +1160,7 @@ def update_record(record_id: int, data: dict):
     print(f"  --> Actually updating record {record_id} with data {data}")
     return {"status": "success", "id": record_id}
 
-@require_permission('admin') # This permission is not in CURRENT_USER_PERMISSIONS
+@require_permission('admin') # alice is an editor, not an admin
 def delete_system_file(filename: str):
     """Simulates a highly sensitive operation."""
     print(f"  --> Deleting system file {filename} !!!")
@@ -134,43 +1179,130 @@ def slow_fibonacci(n: int) -> int:
         # Recursive calls will also be logged and timed individually if not cached
         return slow_fibonacci(n-1) + slow_fibonacci(n-2)
 
+def _fibonacci_pair(n: int) -> Tuple[int, int]:
+    """(F(n), F(n+1)) by fast doubling, walking the bits of n from the top (no recursion)."""
+    a, b = 0, 1 # F(0), F(1)
+    for bit in bin(n)[2:]:
+        # F(2k) = F(k) * (2*F(k+1) - F(k)),  F(2k+1) = F(k)^2 + F(k+1)^2
+        c = a * ((b << 1) - a)
+        d = a * a + b * b
+        a, b = (d, c + d) if bit == "1" else (c, d)
+    return a, b
+
+def fast_fibonacci(n: int) -> int:
+    """F(n) in O(log n) big-int multiplications; no cache and no recursion limit."""
+    if n < 0:
+        raise ValueError("Input must be non-negative")
+    return _fibonacci_pair(n)[0]
+
+# Batch mode: when the next n is at most this far away, adding forward is cheaper than doubling again
+_FIBONACCI_STEP_LIMIT = 64
+
+def fast_fibonacci_batch(ns: Iterable[int]) -> List[int]:
+    """
+    F(n) for many n, in input order. The distinct values are visited in increasing order and
+    each one continues from the previous pair: a small gap is walked with additions, a large
+    gap starts a new fast doubling.
+    """
+    ns = list(ns)
+    if any(n < 0 for n in ns):
+        raise ValueError("Input must be non-negative")
+    values: Dict[int, int] = {}
+    current, a, b = 0, 0, 1 # a, b = F(current), F(current + 1)
+    for n in sorted(set(ns)):
+        if n - current > _FIBONACCI_STEP_LIMIT:
+            current, (a, b) = n, _fibonacci_pair(n)
+        while current < n:
+            current, a, b = current + 1, b, a + b
+        values[n] = a
+    return [values[n] for n in ns]
+
 
 # --- Running the Examples ---
-print("\n--- Running Decorated Functions ---")
+def main():
+    # --- Setup Basic Logging ---
+    # (DEBUG shows every memoize cache hit/miss)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    print("\n--- Running Decorated Functions ---")
+
+    print("\n1. Testing @log_calls:")
+    greet("Alice")
+    greet("Bob", greeting="Hi")
+
+    print("\n2. Testing @time_execution:")
+    simulate_long_task(1.5)
+
+    print("\n3. Testing @require_permission and stacking:")
+    try:
+        update_record(101, data={"value": 42})
+    except PermissionError as e:
+        print(f"Caught expected error: {e}") # Should not happen as user has 'edit'
+
+    try:
+        # This call should fail the permission check
+        delete_system_file("/etc/important.conf")
+    except PermissionError as e:
+        print(f"Caught expected error: {e}") # Should happen as user lacks 'admin'
 
-print("\n1. Testing @log_calls:")
-greet("Alice")
-greet("Bob", greeting="Hi")
+    print("\n4. Testing @memoize (and stacking):")
+    print("First call to slow_fibonacci(8):")
+    fib8_result1 = slow_fibonacci(8)
+    print(f"Result 1: {fib8_result1}")
 
-print("\n2. Testing @time_execution:")
-simulate_long_task(1.5)
+    print("\nSecond call to slow_fibonacci(8) (should be cached):")
+    fib8_result2 = slow_fibonacci(8)
+    print(f"Result 2: {fib8_result2}")
 
-print("\n3. Testing @require_permission and stacking:")
-try:
-    update_record(101, data={"value": 42})
-except PermissionError as e:
-    print(f"Caught expected error: {e}") # Should not happen as user has 'edit'
+    print("\nFirst call to slow_fibonacci(10):")
+    fib10_result1 = slow_fibonacci(10)
+    print(f"Result 1: {fib10_result1}")
+    print(f"slow_fibonacci cache: {slow_fibonacci.cache_info()}")
+    # slow_fibonacci(1000) would exceed the recursion limit (4 stack frames per level)
+    print(f"fast_fibonacci(100_000) has {fast_fibonacci(100_000).bit_length():,} bits; "
+          f"fast_fibonacci_batch([8, 10, 12]) = {fast_fibonacci_batch([8, 10, 12])}")
 
-try:
-    # This call should fail the permission check
-    delete_system_file("/etc/important.conf")
-except PermissionError as e:
-    print(f"Caught expected error: {e}") # Should happen as user lacks 'admin'
+    print("\n5. Testing @memoize(maxsize=2) (LRU eviction):")
+    @memoize(maxsize=2)
+    def square(x: int) -> int:
+        return x * x
 
-print("\n4. Testing @memoize (and stacking):")
-print("First call to slow_fibonacci(8):")
-fib8_result1 = slow_fibonacci(8)
-print(f"Result 1: {fib8_result1}")
+    for x in [1, 2, 1, 3, 2]: # 3 evicts 2 (least recently used), then 2 evicts 1
+        square(x)
+    print(f"square cache: {square.cache_info()}")
 
-print("\nSecond call to slow_fibonacci(8) (should be cached):")
-fib8_result2 = slow_fibonacci(8)
-print(f"Result 2: {fib8_result2}")
+    print("\n6. Testing @memoize(backend=SqliteBackend(...)) (run the script twice):")
+    cache_path = os.path.join(tempfile.gettempdir(), "example_decorator_cache.db")
+    @memoize(backend=SqliteBackend(cache_path, maxsize=100))
+    def slow_cube(x: int) -> int:
+        time.sleep(0.2)
+        return x ** 3
 
-print("\nFirst call to slow_fibonacci(10):")
-fib10_result1 = slow_fibonacci(10)
-print(f"Result 1: {fib10_result1}")
+    start_time = time.perf_counter()
+    cubes = [slow_cube(x) for x in range(5)]
+    print(f"Cubes {cubes} in {time.perf_counter() - start_time:.2f}s, cache: {slow_cube.cache_info()}")
 
-print("\n--- End of Decorator Examples ---")
+    print("\n7. Latency histograms recorded by @time_execution:")
+    for _ in range(200):
+        quick_task()
+    print(METRICS.report())
+
+    print("\n8. Testing the decorators on async def (5 concurrent awaiters, 1 fetch):")
+    async def fetch_five():
+        return await asyncio.gather(*(fetch_profile(42) for _ in range(5)))
+    profiles = asyncio.run(fetch_five())
+    print(f"Profiles: {profiles[0]} x{len(profiles)}, cache: {fetch_profile.cache_info()}")
+
+    print("\n9. Testing fused(require_permission('edit'), log_calls) (one wrapper frame):")
+    original_update = update_record.__wrapped__.__wrapped__ # functools.wraps keeps a link to the wrapped function
+    fused_update = fused(require_permission('edit'), log_calls)(original_update)
+    print(f"Result: {fused_update(102, data={'value': 7})}")
+
+    print("\n--- End of Decorator Examples ---")
+
+# Nothing runs on import, so the decorators can be reused (and benchmarked)
+if __name__ == "__main__":
+    main()
 
 """
 Explanation:
@@ -179,24 +1311,56 @@ Explanation:
 When greet is called, the wrapper inside log_calls executes. 
 It logs the entry message with arguments, calls the original greet, 
 logs the exit message with the result, and returns the result.
+The messages use logging's lazy "%s" arguments, and the wrapper first asks
+logging.root.isEnabledFor(level): when INFO is filtered out, no repr() is built at all.
+@log_calls(sample_every=N) logs only every N-th call. By default the full repr of every
+argument is logged; @log_calls(max_repr=200) shortens big arguments (reprlib stops reading
+items once the repr is past that length, so even a huge list is cheap to show, while small
+lists and dicts still appear in full).
 
 2. @time_execution: 
 The wrapper records the time before calling simulate_long_task, calls it, 
 records the time after, calculates the difference, logs it, and returns the result.
+Every duration also goes into a LatencyHistogram in the METRICS registry. The histogram
+keeps counts in log-spaced buckets (16 per doubling, like HdrHistogram), so memory stays
+constant and p50/p95/p99 are accurate to about 6%. METRICS.report() prints a table and
+METRICS.export_text(path) writes a Prometheus-style text file.
 
 3. @require_permission: 
 This is a decorator factory. 
 Calling @require_permission('edit') first calls require_permission with 'edit', 
 which returns the actual decorator. This decorator then receives the update_record function. 
-The wrapper inside checks CURRENT_USER_PERMISSIONS before deciding 
-whether to call the original update_record or raise an error. 
+The wrapper inside asks PERMISSIONS (a PermissionResolver) for the permissions of CURRENT_USER
+before deciding whether to call the original update_record or raise an error. 
 Notice how delete_system_file fails because the user lacks the 'admin' permission.
+The resolver flattens the role tree once (admin -> editor -> viewer) and caches each user's
+effective set, so a check is one dict lookup and one set lookup. After changing a user's roles,
+call PERMISSIONS.invalidate(user_id). Grants are logged at DEBUG, 1 in log_every calls.
 
 4. @memoize: 
 The wrapper creates a key based on the arguments passed to slow_fibonacci. 
 If the key is in its cache dictionary, it returns the cached value immediately (cache hit). 
 Otherwise, it calls the original slow_fibonacci (which is slow), stores the result in the cache, 
 and then returns it (cache miss). Subsequent calls with the same arguments are much faster.
+With @memoize(maxsize=N) the cache is an OrderedDict used as an LRU list: a hit moves the key
+to the end, and when there are more than N entries the first (least recently used) one is dropped.
+With ttl=seconds every entry also stores an expiry time. cache_info() and cache_clear()
+work like they do for functools.lru_cache.
+With @memoize(thread_safe=True) a lock protects the cache, and a key that several threads miss
+at the same moment is computed only once ("single flight"): the first thread computes it,
+the others wait on that key's Event and get the same result (or the same exception).
+Results are stored through a backend. MemoryBackend (the default) is the OrderedDict described
+above. SqliteBackend keeps them in a SQLite file, keyed by a SHA-256 of the arguments that is the
+same in every run, so a restarted program gets cache hits right away. Every row also stores a
+hash of the function's source code, and rows from an older version of the function are deleted.
+With normalize_args=True keys are built through the function's signature (signature_key_builder):
+keyword arguments are moved to their positions and defaults are filled in, and unhashable
+arguments are replaced by hashable stand-ins (freeze_arg): a list becomes a tagged tuple,
+a dict or set a frozenset, and a NumPy array a (dtype, shape, SHA-1 of the data) tuple.
+Memoization makes slow_fibonacci linear, but every level still goes through three wrappers,
+so it hits the recursion limit a little above n = 200. fast_fibonacci uses fast doubling
+(F(2k) = F(k) * (2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2) in a loop over the bits of n:
+O(log n) big-int multiplications, no cache and no recursion.
 
 5. Stacking Decorators: 
 When you stack decorators like on update_record or slow_fibonacci, 
@@ -211,4 +1375,18 @@ For update_record:
 6. functools.wraps: This is crucial. 
 Without it, the decorated function (greet, simulate_long_task, etc.) would appear 
 to be named wrapper and lose its original docstring, making debugging and introspection difficult. @wraps copies these essential attributes from the original function to the wrapper.
+
+7. async def functions:
+Calling an async function only creates a coroutine; the body runs when it is awaited.
+A plain wrapper would therefore time and log the creation and cache the coroutine object
+(which can be awaited only once). Each decorator checks inspect.iscoroutinefunction(func)
+and returns an `async def` wrapper that awaits the call instead. The async memoize keeps one
+asyncio Task per missing key, so fetch_profile(42) awaited 5 times at once runs once.
+
+8. fused(...):
+Each decorator in a stack adds a Python frame and repacks *args/**kwargs. fused(memoize,
+time_execution, log_calls) generates the source of one wrapper that does the work of all
+three in the same order, compiles it with exec() (like dataclasses does for __init__) and
+keeps it in wrapper.fused_source. Configured decorators carry their options in a
+`fuse_options` attribute, which is how fused() knows what memoize(maxsize=2) meant.
 """
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Real HTTP I/O for the MultiThread example, fully offline.
+
+1. A local stand-in server (ThreadingHTTPServer) answers every GET after a configurable
+   latency and fails a configurable fraction of requests with HTTP 500.
+2. http_fetch() performs a real request and returns the same result dictionary as
+   Example_MultiThread.fetch_data, so it plugs straight into fetch_all(fetch=...).
+3. ConnectionPool keeps idle HTTP/1.1 keep-alive connections per host, so a worker thread
+   reuses an open socket instead of doing a TCP handshake for every request.
+   http:// URLs use HTTPConnection (port 80), https:// URLs HTTPSConnection (port 443).
+
+Running this file compares pooled and unpooled clients (requests/sec, p50/p99 latency):
+    python Example_HttpPool.py --requests 2000 --workers 16 --latency-ms 2
+"""
+
+import argparse
+import http.client
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from Example_MultiThread import fetch_all
+
+
+# ==============================================================================
+# 1. Local stand-in server
+# ==============================================================================
+class StandInHandler(BaseHTTPRequestHandler):
+    """Answers GET requests like a slow, slightly unreliable API."""
+    protocol_version = "HTTP/1.1"  # keep-alive, needed to see the effect of pooling
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid the 40 ms delayed-ACK stall
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(random.uniform(server.min_latency, server.max_latency))
+        if random.random() < server.error_rate:
+            status, body = 500, b"Simulated server error"
+        else:
+            status, body = 200, f"Data for {self.path}".encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate the benchmark
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the default listen backlog of 5 drops connections under load
+
+    min_latency = 0.001
+    max_latency = 0.005
+    error_rate = 0.0
+
+
+def start_local_server(min_latency: float = 0.001, max_latency: float = 0.005,
+                       error_rate: float = 0.0, port: int = 0) -> Tuple[StandInServer, str]:
+    """
+    Starts the stand-in server in a background thread.
+    Returns the server (call server.shutdown() when done) and its base URL.
+    port=0 lets the OS pick a free port.
+    """
+    server = StandInServer(("127.0.0.1", port), StandInHandler)
+    server.min_latency, server.max_latency, server.error_rate = min_latency, max_latency, error_rate
+    threading.Thread(target=server.serve_forever, name="stand-in-server", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+# ==============================================================================
+# 2. Per-host connection pool
+# ==============================================================================
+# Connection class and default port per URL scheme
+_SCHEMES = {"http": (http.client.HTTPConnection, 80), "https": (http.client.HTTPSConnection, 443)}
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of idle keep-alive connections, one list per (scheme, host, port).
+    A connection is either checked out by exactly one thread or idle in the pool.
+    """
+
+    def __init__(self, max_idle_per_host: int = 10, timeout: float = 10.0):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.created = 0  # how many TCP connections were opened in total
+
+    def acquire(self, host: str, port: int, scheme: str = "http") -> Tuple[http.client.HTTPConnection, bool]:
+        """Returns an idle connection for the host if there is one, else a new one. Also says if it was reused."""
+        with self._lock:
+            idle = self._idle.get((scheme, host, port))
+            if idle:
+                return idle.pop(), True
+        return self.connect(host, port, scheme), False
+
+    def connect(self, host: str, port: int, scheme: str = "http") -> http.client.HTTPConnection:
+        """Opens a new connection (it joins the pool when released)."""
+        connection_class, _ = _SCHEMES[scheme]
+        with self._lock:
+            self.created += 1
+        return connection_class(host, port, timeout=self.timeout)
+
+    def release(self, conn: http.client.HTTPConnection):
+        """Gives a connection back for reuse (closes it if the host already has enough idle ones)."""
+        scheme = "https" if isinstance(conn, http.client.HTTPSConnection) else "http"
+        with self._lock:
+            idle = self._idle.setdefault((scheme, conn.host, conn.port), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Closes all idle connections."""
+        with self._lock:
+            connections = [conn for idle in self._idle.values() for conn in idle]
+            self._idle.clear()
+        for conn in connections:
+            conn.close()
+
+
+# ==============================================================================
+# 3. Real fetch with the fetch_data result format
+# ==============================================================================
+def _request(conn: http.client.HTTPConnection, path: str) -> Tuple[int, str, bool]:
+    conn.request("GET", path)
+    response = conn.getresponse()
+    body = response.read()  # must be read completely before the connection can be reused
+    return response.status, body.decode(), response.will_close
+
+
+def http_fetch(url: str, task_id: int, pool: Optional[ConnectionPool] = None, timeout: float = 10.0) -> Dict[str, Any]:
+    """
+    GETs `url` and returns {"url", "content", "status", "duration_seconds"} (+ "error" on failure),
+    like Example_MultiThread.fetch_data. With a pool, keep-alive connections are reused.
+    `timeout` is the socket timeout for this request (FetchPolicy passes the time left to its deadline).
+    """
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    start_time = time.perf_counter()
+    try:
+        if parts.scheme not in _SCHEMES:
+            raise ValueError(f"Unsupported URL scheme {parts.scheme!r} (use http:// or https://)")
+        connection_class, default_port = _SCHEMES[parts.scheme]
+        host, port = parts.hostname, parts.port or default_port
+        if pool is None:
+            conn = connection_class(host, port, timeout=timeout)
+            try:
+                status, content, _ = _request(conn, path)
+            finally:
+                conn.close()
+        else:
+            conn, reused = pool.acquire(host, port, parts.scheme)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                status, content, will_close = _request(conn, path)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed the idle keep-alive connection; retry once on a fresh one
+                conn = pool.connect(host, port, parts.scheme)
+                conn.timeout = timeout
+                try:
+                    status, content, will_close = _request(conn, path)
+                except Exception:
+                    conn.close()
+                    raise
+            except Exception:
+                conn.close()
+                raise
+            if will_close:
+                conn.close()
+            else:
+                pool.release(conn)
+    except Exception as e:
+        return {"url": url, "content": None, "status": 500, "error": str(e)}
+
+    duration = time.perf_counter() - start_time
+    data = {"url": url, "content": content, "status": status, "duration_seconds": round(duration, 2)}
+    if status >= 400:
+        data["content"] = None
+        data["error"] = f"HTTP {status}: {content}"
+    return data
+
+
+# ==============================================================================
+# 4. Pooled vs unpooled benchmark
+# ==============================================================================
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_client(name: str, urls: List[str], workers: int, fetch: Callable[[str, int], Dict[str, Any]]):
+    """Runs all urls through fetch_all and prints throughput and latency percentiles."""
+    latencies: List[float] = []  # list.append is atomic, no lock needed
+
+    def timed_fetch(url: str, task_id: int) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        result = fetch(url, task_id)
+        latencies.append(time.perf_counter() - start_time)
+        return result
+
+    start_time = time.perf_counter()
+    results = fetch_all(urls, max_workers=workers, fetch=timed_fetch)
+    seconds = time.perf_counter() - start_time
+
+    latencies.sort()
+    errors = sum(1 for result in results if result.get("error"))
+    print(f"{name:9s} | {len(results) / seconds:9,.0f} req/s | p50 {percentile(latencies, 0.50) * 1000:7.2f} ms | "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms | errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled vs unpooled HTTP client against a local stand-in server.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="mean server latency (uniform 0.5x-1.5x)")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    server, base_url = start_local_server(latency * 0.5, latency * 1.5, args.error_rate)
+    urls = [f"{base_url}/api/items/{i}" for i in range(args.requests)]
+    print(f"{args.requests} requests, {args.workers} workers, server latency ~{args.latency_ms} ms, "
+          f"error rate {args.error_rate:.0%}")
+    try:
+        run_client("unpooled", urls, args.workers, http_fetch)
+        pool = ConnectionPool(max_idle_per_host=args.workers)
+        run_client("pooled", urls, args.workers, lambda url, task_id: http_fetch(url, task_id, pool=pool))
+        print(f"pooled client opened {pool.created} connections for {args.requests} requests")
+        pool.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
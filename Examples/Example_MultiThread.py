@@ -1,8 +1,12 @@
 
+import asyncio
 import threading
 import time
 import random
-from typing import List, Dict, Any
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlsplit
 
 # Shared list to store results from threads
 # Needs protection because multiple threads will write to it
@@ -10,29 +14,53 @@ results_list: List[Dict[str, Any]] = []
 # A lock to ensure only one thread modifies results_list at a time
 results_lock = threading.Lock()
 
-def simulate_fetch_data(url: str, task_id: int):
+def fetch_data(url: str, task_id: int, min_latency: float = 0.5, max_latency: float = 2.5,
+               verbose: bool = True, error_rate: float = 0.0, timeout: Optional[float] = None) -> Dict[str, Any]:
     """
-    Simulates fetching data from a URL (takes variable time).
-    Appends the result dictionary to the shared results_list safely.
+    Simulates fetching data from a URL (takes variable time) and returns the result dictionary.
 
     Args:
         url (str): The "URL" to fetch data from.
         task_id (int): An identifier for the task/thread.
+        min_latency, max_latency (float): Range of the simulated network latency in seconds.
+        verbose (bool): Print start/finish messages.
+        error_rate (float): Fraction of fetches that fail with a simulated network error.
+        timeout (float): Give up after this many seconds (like a socket timeout).
     """
-    print(f"[Thread-{task_id}] Starting fetch for: {url}")
+    if verbose:
+        print(f"[Thread-{task_id}] Starting fetch for: {url}")
     try:
         # Simulate network latency/processing time
-        sleep_duration = random.uniform(0.5, 2.5) # Sleep for 0.5 to 2.5 seconds
+        sleep_duration = random.uniform(min_latency, max_latency)
+        if timeout is not None and sleep_duration > timeout:
+            time.sleep(max(0.0, timeout))
+            raise TimeoutError(f"timed out after {timeout:.2f}s")
         time.sleep(sleep_duration)
+        if random.random() < error_rate:
+            raise ConnectionError("simulated network error")
 
         # Simulate successful data retrieval
         data = {"url": url, "content": f"Data for {url}", "status": 200, "duration_seconds": round(sleep_duration, 2)}
-        print(f"[Thread-{task_id}] Finished fetch for: {url} in {sleep_duration:.2f}s")
+        if verbose:
+            print(f"[Thread-{task_id}] Finished fetch for: {url} in {sleep_duration:.2f}s")
 
     except Exception as e:
         # Simulate an error during fetch
-        print(f"[Thread-{task_id}] Error fetching {url}: {e}")
+        if verbose:
+            print(f"[Thread-{task_id}] Error fetching {url}: {e}")
         data = {"url": url, "content": None, "status": 500, "error": str(e)}
+    return data
+
+def simulate_fetch_data(url: str, task_id: int):
+    """
+    Simulates fetching data from a URL (takes variable time).
+    Appends the result dictionary to the shared results_list safely.
+
+    Args:
+        url (str): The "URL" to fetch data from.
+        task_id (int): An identifier for the task/thread.
+    """
+    data = fetch_data(url, task_id)
 
     # --- Critical Section: Modifying shared data ---
     # Acquire the lock before accessing the shared results_list
@@ -41,6 +69,270 @@ def simulate_fetch_data(url: str, task_id: int):
     # The lock is automatically released when exiting the 'with' block
     # --- End Critical Section ---
 
+FetchFunc = Callable[[str, int], Dict[str, Any]]
+
+# --- Rate limiting, retries and deadlines ---
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` calls per second on average, with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """
+        Takes one token, sleeping until it is available.
+        Returns False (and takes nothing) if the wait would go past `deadline` (a time.monotonic() value).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            # Reserve the token now (the balance may go negative), sleep outside the lock
+            self._tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+
+class FetchPolicy(NamedTuple):
+    """
+    How fetch_iter/fetch_all treat each URL.
+
+    rate_limit: max requests per second per host (None = unlimited), `burst` = bucket capacity.
+    retries: extra attempts after a failed one (an "error" in the result, status >= 500 or an exception).
+    backoff, max_backoff: retry n waits a random time in [0, min(max_backoff, backoff * 2**n)] ("full jitter").
+    timeout: deadline in seconds for the whole URL - rate limit waits, attempts and backoffs included.
+    """
+    rate_limit: Optional[float] = None
+    burst: Optional[float] = None
+    retries: int = 0
+    backoff: float = 0.1
+    max_backoff: float = 5.0
+    timeout: Optional[float] = None
+
+
+class FetchStats:
+    """Thread-safe per-host counters filled in while fetching."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, float]] = {}
+
+    def record(self, host: str, start: float, end: float, attempts: int, ok: bool):
+        with self._lock:
+            stats = self.hosts.setdefault(host, {"urls": 0, "failed": 0, "attempts": 0, "retries": 0,
+                                                 "first_start": start, "last_end": end})
+            stats["urls"] += 1
+            stats["failed"] += not ok
+            stats["attempts"] += attempts
+            stats["retries"] += max(attempts - 1, 0) # 0 attempts: the deadline passed before the first one
+            stats["first_start"] = min(stats["first_start"], start)
+            stats["last_end"] = max(stats["last_end"], end)
+
+    def report(self) -> str:
+        """One line per host: URLs, failures, retries and URLs/sec."""
+        lines = [f"{'host':30} | {'URLs':>6} | {'failed':>6} | {'retries':>7} | {'URLs/sec':>8}"]
+        with self._lock:
+            for host, stats in sorted(self.hosts.items()):
+                elapsed = stats["last_end"] - stats["first_start"]
+                throughput = stats["urls"] / elapsed if elapsed > 0 else float("inf")
+                lines.append(f"{host:30} | {stats['urls']:6d} | {stats['failed']:6d} | {stats['retries']:7d} | "
+                             f"{throughput:8.1f}")
+        return "\n".join(lines)
+
+
+def _failed(result: Dict[str, Any]) -> bool:
+    return bool(result.get("error")) or result.get("status", 200) >= 500
+
+
+class ResilientFetch:
+    """
+    Wraps a fetch(url, task_id) function with a FetchPolicy.
+    When the policy has a timeout, `fetch` must accept a `timeout` keyword (fetch_data does).
+    """
+
+    def __init__(self, fetch: FetchFunc, policy: FetchPolicy, stats: Optional[FetchStats] = None):
+        self.fetch = fetch
+        self.policy = policy
+        self.stats = stats
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        if self.policy.rate_limit is None:
+            return None
+        with self._buckets_lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.policy.rate_limit, self.policy.burst)
+            return bucket
+
+    def __call__(self, url: str, task_id: int) -> Dict[str, Any]:
+        policy = self.policy
+        host = urlsplit(url).netloc or url
+        start = time.monotonic()
+        deadline = start + policy.timeout if policy.timeout is not None else None
+        bucket = self._bucket(host)
+
+        attempts = 0
+        result: Dict[str, Any] = {"url": url, "content": None, "status": 504, "error": "deadline exceeded"}
+        for attempt in range(policy.retries + 1):
+            if attempt:
+                delay = random.uniform(0, min(policy.max_backoff, policy.backoff * 2 ** (attempt - 1)))
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    break
+                time.sleep(delay)
+            if bucket is not None and not bucket.acquire(deadline):
+                break
+
+            attempts += 1
+            try:
+                if deadline is None:
+                    result = self.fetch(url, task_id)
+                else:
+                    result = self.fetch(url, task_id, timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                result = {"url": url, "content": None, "status": 500, "error": str(e)}
+            if not _failed(result):
+                break
+
+        if self.stats is not None:
+            self.stats.record(host, start, time.monotonic(), attempts, not _failed(result))
+        return result
+
+# --- Bounded worker pool (for many URLs) ---
+def fetch_iter(urls: Iterable[str], max_workers: int = 8, fetch: FetchFunc = fetch_data,
+               max_pending: Optional[int] = None, policy: Optional[FetchPolicy] = None,
+               stats: Optional[FetchStats] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Fetches `urls` with a fixed pool of `max_workers` threads and yields results in input order.
+
+    Every URL gets its own Future, so no shared list or lock is needed. At most `max_pending`
+    tasks (default: 2 * max_workers) are queued or running at any time: when the window is
+    full we wait for the oldest result before submitting more. That backpressure keeps
+    memory flat no matter how many URLs `urls` produces (it may be a lazy generator).
+
+    Args:
+        urls: The URLs to fetch.
+        max_workers (int): Number of worker threads.
+        fetch: Function called as fetch(url, task_id) in a worker thread.
+        max_pending (int): Size of the in-flight window.
+        policy (FetchPolicy): Per-host rate limit, retries with backoff and per-URL deadline.
+        stats (FetchStats): Collects per-host throughput and retry counts (print stats.report()).
+    """
+    if max_workers <= 0:
+        raise ValueError("max_workers must be positive")
+    if max_pending is None:
+        max_pending = 2 * max_workers
+    elif max_pending < 1:
+        raise ValueError("max_pending must be positive")
+    if max_pending < max_workers:
+        raise ValueError("max_pending must be at least max_workers")
+    if policy is not None or stats is not None:
+        fetch = ResilientFetch(fetch, policy or FetchPolicy(), stats)
+
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+    pending: Deque[Future] = deque()
+    try:
+        for task_id, url in enumerate(urls):
+            pending.append(pool.submit(fetch, url, task_id))
+            if len(pending) >= max_pending:
+                # Backpressure: the oldest task must finish before we submit another one
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Also runs if the caller stops iterating early: drop queued work, wait for running work
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def fetch_all(urls: Iterable[str], max_workers: int = 8, fetch: FetchFunc = fetch_data,
+              max_pending: Optional[int] = None, policy: Optional[FetchPolicy] = None,
+              stats: Optional[FetchStats] = None) -> List[Dict[str, Any]]:
+    """Fetches all `urls` with a bounded pool (see fetch_iter) and returns the results in input order."""
+    return list(fetch_iter(urls, max_workers=max_workers, fetch=fetch, max_pending=max_pending,
+                           policy=policy, stats=stats))
+
+# --- asyncio version (one event loop thread, many concurrent fetches) ---
+async def async_fetch_data(url: str, task_id: int, min_latency: float = 0.5, max_latency: float = 2.5,
+                           verbose: bool = True) -> Dict[str, Any]:
+    """Same as fetch_data, but waits with asyncio.sleep so the event loop can run other fetches."""
+    if verbose:
+        print(f"[Task-{task_id}] Starting fetch for: {url}")
+    try:
+        sleep_duration = random.uniform(min_latency, max_latency)
+        await asyncio.sleep(sleep_duration)
+
+        data = {"url": url, "content": f"Data for {url}", "status": 200, "duration_seconds": round(sleep_duration, 2)}
+        if verbose:
+            print(f"[Task-{task_id}] Finished fetch for: {url} in {sleep_duration:.2f}s")
+
+    except Exception as e:
+        if verbose:
+            print(f"[Task-{task_id}] Error fetching {url}: {e}")
+        data = {"url": url, "content": None, "status": 500, "error": str(e)}
+    return data
+
+AsyncFetchFunc = Callable[[str, int], Awaitable[Dict[str, Any]]]
+
+async def async_fetch_all(urls: Iterable[str], max_concurrency: int = 100,
+                          fetch: AsyncFetchFunc = async_fetch_data) -> List[Dict[str, Any]]:
+    """
+    Fetches all `urls` concurrently on the running event loop and returns results in input order.
+
+    A semaphore caps the number of fetches in flight. It is acquired *before* a task is created,
+    so only `max_concurrency` task objects exist at a time, even for 100k URLs.
+
+    Args:
+        urls: The URLs to fetch.
+        max_concurrency (int): Maximum number of fetches running at the same time.
+        fetch: Coroutine function called as fetch(url, task_id).
+    """
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be positive")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results: List[Optional[Dict[str, Any]]] = []
+    errors: List[BaseException] = []
+    running = set()
+
+    async def run(task_id: int, url: str):
+        try:
+            results[task_id] = await fetch(url, task_id)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            semaphore.release()
+
+    try:
+        for task_id, url in enumerate(urls):
+            await semaphore.acquire()
+            if errors:
+                semaphore.release()
+                break
+            results.append(None)
+            task = asyncio.create_task(run(task_id, url))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        if running:
+            await asyncio.gather(*running)
+    finally:
+        for task in running:
+            task.cancel()
+    if errors:
+        # fetch_data style functions return error dicts; only unexpected exceptions end up here
+        raise errors[0]
+    return results
+
 # --- Main Thread Logic ---
 if __name__ == "__main__":
     urls_to_fetch = [
@@ -83,6 +375,35 @@ if __name__ == "__main__":
     for result in results_list:
             print(f"  - URL: {result.get('url')}, Status: {result.get('status')}, Duration: {result.get('duration_seconds', 'N/A')}s, Error: {result.get('error')}")
 
+    # --- The same work with a bounded pool ---
+    # One thread per URL does not scale (50k URLs = 50k OS threads).
+    # fetch_all reuses a few worker threads and returns results in input order.
+    print("\nMain: Fetching the same URLs with fetch_all(max_workers=2)...")
+    start_time = time.time()
+    for result in fetch_all(urls_to_fetch, max_workers=2):
+        print(f"  - URL: {result.get('url')}, Status: {result.get('status')}, Duration: {result.get('duration_seconds', 'N/A')}s, Error: {result.get('error')}")
+    print(f"Total execution time with 2 workers: {time.time() - start_time:.2f} seconds.")
+
+    # --- Rate limits, retries and deadlines ---
+    # 30% of fetches fail, each host allows 4 requests/sec, every URL gets 3 retries and 2 seconds.
+    print("\nMain: Fetching 12 URLs with a FetchPolicy (flaky network)...")
+    stats = FetchStats()
+    policy = FetchPolicy(rate_limit=4, retries=3, backoff=0.05, timeout=2.0)
+    def flaky_fetch(url, task_id, timeout=None):
+        return fetch_data(url, task_id, 0.05, 0.2, verbose=False, error_rate=0.3, timeout=timeout)
+
+    urls = [f"http://{host}/api/items/{i}" for i in range(6) for host in ("example.com", "example.org")]
+    results = fetch_all(urls, max_workers=4, fetch=flaky_fetch, policy=policy, stats=stats)
+    print(f"  {sum(not _failed(r) for r in results)} of {len(results)} URLs succeeded")
+    print(stats.report())
+
+    # --- And with asyncio: no worker threads at all ---
+    print("\nMain: Fetching the same URLs with async_fetch_all(max_concurrency=2)...")
+    start_time = time.time()
+    for result in asyncio.run(async_fetch_all(urls_to_fetch, max_concurrency=2)):
+        print(f"  - URL: {result.get('url')}, Status: {result.get('status')}, Duration: {result.get('duration_seconds', 'N/A')}s, Error: {result.get('error')}")
+    print(f"Total execution time with asyncio: {time.time() - start_time:.2f} seconds.")
+
 """
 Explanation:
 
@@ -127,6 +448,27 @@ Result Processing:
     The total time is printed, which should be significantly less than the sum of all 
     individual sleep times if run sequentially.
 
+5. fetch_all / fetch_iter (bounded worker pool):
+    - A ThreadPoolExecutor keeps a fixed number of worker threads and a work queue.
+    - pool.submit() returns a Future per URL. Results are read from the futures in the order
+    the URLs were submitted, so there is no shared list and no lock.
+    - Only max_pending futures exist at a time. Before submitting more, the oldest one is
+    awaited (backpressure), so 50k URLs need no more memory than 50.
+
+6. FetchPolicy / ResilientFetch (rate limits, retries, deadlines):
+    - TokenBucket: each host gets a bucket that refills `rate_limit` tokens per second.
+    A request takes one token, or waits until one is available.
+    - Retries: failed attempts are retried with exponential backoff and "full jitter"
+    (a random wait between 0 and backoff * 2**n), so many workers do not retry in lock-step.
+    - Deadline: `timeout` covers everything for one URL (waiting for tokens, attempts, backoffs).
+    - FetchStats counts URLs, failures and retries per host; stats.report() prints them.
+
+7. async_fetch_all (asyncio):
+    - Waiting is done with `await asyncio.sleep()` instead of time.sleep(), so a single thread
+    can keep thousands of fetches waiting at once.
+    - An asyncio.Semaphore limits how many fetches run concurrently. It is acquired before each
+    task is created, which also bounds how many task objects exist at a time.
+
 This example demonstrates the fundamental pattern of creating, starting, synchronizing 
 (waiting for completion with join), and safely collecting results from multiple threads.
 """
\ No newline at end of file
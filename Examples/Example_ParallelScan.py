@@ -0,0 +1,203 @@
+"""
+Parallel Prefix Scan:
+
+- accumulate(values, func) is sequential: element i needs the result for element i-1.
+- For an associative func (add, mul, max, min, ...) the work can still be split:
+    1. Cut the values into one chunk per worker and scan every chunk on its own, in parallel.
+       The last value of a chunk is the "total" of that chunk.
+    2. Scan the chunk totals (just one number per worker, done here). That gives the offset of
+       every chunk: the combined total of all chunks before it.
+    3. In parallel again, combine every element of chunk k with offset k: func(offset, x).
+- The values live in a shared_memory buffer of int64 ('q') or float64 ('d'), so the workers
+  read and write them in place; only chunk boundaries and totals travel between processes.
+- Only associativity is needed (func(func(a, b), c) == func(a, func(b, c))), not commutativity:
+  the offset always stays on the left. func must be picklable (operator.add, max, a module-level
+  function; not a lambda).
+- The values must be ints or floats (not bools). A list with ints outside the int64 range is
+  scanned with plain accumulate() in this process, and a running int that leaves the int64 range
+  raises OverflowError. Ints are only mixed with floats when float64 holds them exactly (|x| <= 2**53).
+"""
+
+import operator
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, chunks are then scanned with itertools.accumulate
+    np = None
+
+
+# With NumPy the chunk scans run in C; other functions use accumulate() on a memoryview, which
+# raises OverflowError instead of wrapping (so lists of ints that might overflow use it too)
+_NUMPY_SCANS = {} if np is None else {
+    operator.add: np.add, operator.mul: np.multiply, max: np.maximum, min: np.minimum,
+}
+
+
+def _scan_chunk(name: str, typecode: str, start: int, end: int, func: Callable, vectorize: bool):
+    """Worker, phase 1: scan values[start:end] in place, return the chunk total."""
+    shm = shared_memory.SharedMemory(name=name) # pool workers share the parent's resource tracker
+    try:
+        if vectorize:
+            chunk = np.frombuffer(shm.buf, dtype=typecode, count=end - start, offset=start * 8)
+            _NUMPY_SCANS[func].accumulate(chunk, out=chunk)
+            total = chunk[-1].item()
+            del chunk # every view must be gone before shm.close()
+        else:
+            with shm.buf.cast(typecode) as view: # released even if the scan raises
+                view[start:end] = array(typecode, accumulate(view[start:end], func))
+                total = view[end - 1]
+        return total
+    finally:
+        shm.close()
+
+
+def _apply_offset(name: str, typecode: str, start: int, end: int, func: Callable, vectorize: bool, offset):
+    """Worker, phase 2: values[i] = func(offset, values[i]) for the chunk."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        if vectorize:
+            chunk = np.frombuffer(shm.buf, dtype=typecode, count=end - start, offset=start * 8)
+            _NUMPY_SCANS[func](offset, chunk, out=chunk)
+            del chunk
+        else:
+            with shm.buf.cast(typecode) as view:
+                view[start:end] = array(typecode, map(func, repeat(offset), view[start:end]))
+    finally:
+        shm.close()
+
+
+def _typecode(values) -> Optional[str]:
+    """'q' (int64) or 'd' (float64) for the shared buffer, None for ints that do not fit in int64."""
+    if np is not None and isinstance(values, np.ndarray):
+        kind = values.dtype.kind
+        if kind == "i" or (kind == "u" and values.dtype.itemsize < 8): # uint64 could wrap to negative
+            return "q"
+        if kind == "f":
+            return "d"
+        raise TypeError(f"parallel_scan needs an integer or float array, not {values.dtype}")
+    if all(type(x) is int for x in values): # the common cases first, one cheap pass each
+        return "q" if -2 ** 63 <= min(values) and max(values) < 2 ** 63 else None
+    if all(type(x) is float for x in values):
+        return "d"
+    has_float = False
+    for x in values:
+        if isinstance(x, float):
+            has_float = True
+        elif not isinstance(x, int) or isinstance(x, bool):
+            raise TypeError(f"parallel_scan needs ints or floats, not {type(x).__name__}")
+    if not has_float:
+        return _typecode([int(x) for x in values]) # int subclasses, e.g. IntEnum members
+    if any(not isinstance(x, float) and abs(x) > 2 ** 53 for x in values):
+        raise TypeError("parallel_scan would round ints above 2**53 to float64; convert them explicitly")
+    return "d"
+
+
+def _cannot_overflow(values: Sequence[int], func: Callable) -> bool:
+    """True if no int64 scan of values with func (add, mul, max, min) can leave the int64 range."""
+    if func is operator.add:
+        # Every running total is at most len(values) times the largest |value|
+        return len(values) * max(abs(min(values)), abs(max(values))) < 2 ** 63
+    if func is operator.mul:
+        # |x| < 2**x.bit_length(), so every running product stays below 2**(sum of bit lengths)
+        return sum(map(int.bit_length, values)) < 64
+    return True # max and min only pick existing values
+
+
+def plan_chunks(n: int, chunks: int) -> List[Tuple[int, int]]:
+    """Split range(n) into `chunks` (start, end) ranges of almost equal size (no empty ones)."""
+    chunks = max(1, min(chunks, n))
+    step, extra = divmod(n, chunks)
+    bounds = list(accumulate([step + 1] * extra + [step] * (chunks - extra), initial=0))
+    return list(zip(bounds, bounds[1:]))
+
+
+def parallel_scan(values: Sequence, func: Callable = operator.add, workers: Optional[int] = None):
+    """
+    Inclusive scan, equal to list(accumulate(values, func)) for an associative func.
+
+    Args:
+        values: ints (stored as int64) or floats (float64); a list or a NumPy array.
+            A list with ints outside the int64 range is scanned with accumulate() instead.
+        func: associative, picklable function of two arguments.
+        workers: processes (default: one per CPU core). workers=1 runs the same two phases
+            in this process, which is the baseline for the scaling benchmark.
+
+    Returns:
+        A list (a NumPy array for NumPy input). For a list of ints the result equals accumulate
+        exactly, or OverflowError is raised if a running value does not fit in int64: lists
+        only use the (wrapping) NumPy scans when no overflow is possible. A NumPy int array
+        wraps around on overflow, like any int64 array operation.
+        Float sums are grouped by chunk, so they can differ from accumulate in the last bits.
+    """
+    n = len(values)
+    numpy_input = np is not None and isinstance(values, np.ndarray)
+    if n == 0:
+        return values[:0] if numpy_input else []
+    workers = workers or os.cpu_count() or 1
+    typecode = _typecode(values)
+    if typecode is None:
+        return list(accumulate(values, func))
+    vectorize = func in _NUMPY_SCANS and (numpy_input or typecode == "d" or _cannot_overflow(values, func))
+
+    shm = shared_memory.SharedMemory(create=True, size=n * 8)
+    try:
+        if np is not None:
+            buffer = np.frombuffer(shm.buf, dtype=typecode, count=n)
+            buffer[:] = values
+            del buffer
+        else:
+            with shm.buf.cast(typecode) as view:
+                view[:] = array(typecode, values)
+
+        ranges = plan_chunks(n, workers)
+        if workers == 1:
+            totals = [_scan_chunk(shm.name, typecode, start, end, func, vectorize) for start, end in ranges]
+            for (start, end), offset in zip(ranges[1:], accumulate(totals[:-1], func)):
+                _apply_offset(shm.name, typecode, start, end, func, vectorize, offset)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                totals = list(pool.map(_scan_chunk, repeat(shm.name), repeat(typecode),
+                                       *zip(*ranges), repeat(func), repeat(vectorize)))
+                offsets = list(accumulate(totals[:-1], func)) # offset of chunk k = totals[0..k-1] combined
+                later = ranges[1:]
+                if later:
+                    list(pool.map(_apply_offset, repeat(shm.name), repeat(typecode),
+                                  *zip(*later), repeat(func), repeat(vectorize), offsets))
+
+        if numpy_input:
+            return np.frombuffer(shm.buf, dtype=typecode, count=n).copy()
+        with shm.buf.cast(typecode) as view:
+            return view.tolist()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def main():
+    print("\n--- Parallel Prefix Scan Example ---")
+    daily_transactions = [100, -50, 200, -120, 30, -40]
+    print(f"Transactions: {daily_transactions}")
+    print(f"Running balance (add):  {parallel_scan(daily_transactions, operator.add, workers=3)}")
+    print(f"accumulate, for comparison: {list(accumulate(daily_transactions))}")
+    temperatures = [15, 18, 17, 22, 20, 25, 23]
+    print(f"Running maximum (max):  {parallel_scan(temperatures, max, workers=2)}")
+    print(f"Factorials (mul):       {parallel_scan([1, 2, 3, 4, 5], operator.mul, workers=2)}")
+
+    n = 2_000_000
+    values = list(range(n))
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start_time = time.perf_counter()
+        result = parallel_scan(values, workers=workers)
+        print(f"{n:,} ints with {workers} worker(s): {time.perf_counter() - start_time:.2f}s, "
+              f"last = {result[-1]:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,19 @@
 from functools import reduce
 import operator # For common operations like add, mul
 import math     # For math.nan and math.isnan
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Sequence
 
-# --- Reduce Example (Aggregating Processed Data) ---
-print("\n--- Reduce Example (Aggregating Processed Data) ---")
-
-# Scenario: You have a list of numerical data (e.g., the Fahrenheit temperatures
-# that might be produced by a function like clean_convert_celsius_to_fahrenheit)
-# and you want to aggregate them into a single summary value.
-
-# Let's use a sample list of Fahrenheit temperatures (similar to what map might produce)
-fahrenheit_temps = [77.9, 64.4, 86.36, 60.44, 71.78]
-print(f"Sample Fahrenheit temperatures: {fahrenheit_temps}")
-
-# --- 1. Summing all temperatures ---
-# The function for reduce takes two arguments:
-# - accumulator: the accumulated value from the previous step
-# - current_element: the next element from the iterable
-
-# Using a lambda function for addition:
-# reduce(function, iterable)
-sum_of_temps = reduce(lambda accumulated_sum, current_temp: accumulated_sum + current_temp, fahrenheit_temps)
-
-# Alternatively, using operator.add for conciseness and potentially better performance:
-# sum_of_temps_op = reduce(operator.add, fahrenheit_temps)
-
-print(f"\nSum of all Fahrenheit temperatures: {sum_of_temps:.2f}")
-# How it works for fahrenheit_temps = [77.9, 64.4, 86.36, 60.44, 71.78]:
-# 1. accumulated_sum = 77.9 (first item), current_temp = 64.4 (second item)
-#    lambda(77.9, 64.4) returns 77.9 + 64.4 = 142.3
-# 2. accumulated_sum = 142.3, current_temp = 86.36
-#    lambda(142.3, 86.36) returns 142.3 + 86.36 = 228.66
-# 3. accumulated_sum = 228.66, current_temp = 60.44
-#    lambda(228.66, 60.44) returns 228.66 + 60.44 = 289.1
-# 4. accumulated_sum = 289.1, current_temp = 71.78
-#    lambda(289.1, 71.78) returns 289.1 + 71.78 = 360.88
-# Final result: 360.88
-
-# Using an initializer: reduce(function, iterable, initializer)
-# The initializer is used as the first 'accumulated_sum'.
-sum_with_initializer = reduce(lambda acc, val: acc + val, fahrenheit_temps, 1000)
-print(f"Sum with initializer 1000: {sum_with_initializer:.2f}") # 1000 + 360.88 = 1360.88
-
-# --- 2. Finding the maximum temperature ---
-# We need a function that returns the greater of two values.
+
+# Binary functions used with reduce in main()
 def find_max_temp(temp1, temp2):
     # print(f"Comparing {temp1} and {temp2}") # Uncomment to see steps
     return temp1 if temp1 > temp2 else temp2
 
-max_temp = reduce(find_max_temp, fahrenheit_temps)
-
-# Alternatively, using a lambda:
-# max_temp_lambda = reduce(lambda t1, t2: t1 if t1 > t2 else t2, fahrenheit_temps)
-# Or even simpler with the built-in max function (which can act as a binary function here):
-# max_temp_builtin = reduce(max, fahrenheit_temps)
-
-print(f"\nMaximum Fahrenheit temperature: {max_temp}") # Expected: 86.36
-
-# --- 3. Handling potential errors or filtering within the reduce logic ---
-# Let's say our temperature list might contain non-numeric data or NaNs
-# (Not a Number), which could come from failed conversions in a previous step.
-temperatures_with_issues = [77.9, 64.4, "error_data", float('nan'), 86.36, 60.44, 71.78]
-print(f"\nTemperatures with potential issues: {temperatures_with_issues}")
 
 def safe_sum_temps(accumulator, current_value):
     """Adds current_value to accumulator if it's a valid number, otherwise keeps accumulator."""
@@ -71,30 +23,240 @@ def safe_sum_temps(accumulator, current_value):
         print(f"Skipping invalid data: {current_value}")
         return accumulator # Return the accumulator unchanged
 
-# It's crucial to provide an initializer (e.g., 0.0 for a sum) when the first
-# element(s) of the iterable might be invalid, or if the iterable could be empty.
-# Otherwise, if the first element is invalid, it might be passed as the initial accumulator.
-sum_of_valid_temps = reduce(safe_sum_temps, temperatures_with_issues, 0.0)
-print(f"Sum of valid temperatures (ignoring errors and NaN): {sum_of_valid_temps:.2f}")
-# Expected: 77.9 + 64.4 + 86.36 + 60.44 + 71.78 = 360.88
 
-# --- Edge Cases ---
-# Reducing an empty list without an initializer raises a TypeError
-try:
-    reduce(operator.add, [])
-except TypeError as e:
-    print(f"\nError reducing empty list without initializer: {e}")
+# ==============================================================================
+# Parallel, tree-shaped reduce
+# ==============================================================================
+"""
+reduce() folds left, one element at a time, in one thread:
+    reduce(f, [a, b, c, d, e]) == f(f(f(f(a, b), c), d), e)
+
+For an ASSOCIATIVE function (f(f(a, b), c) == f(a, f(b, c))) the brackets can be moved:
+    f(f(a, b), f(c, f(d, e)))
+so parallel_reduce:
+1. Cuts the input into chunks and reduces every chunk with reduce() in a process pool.
+2. Combines the chunk results ("partials") pairwise, like the rounds of a tournament:
+   [p0, p1, p2, p3, p4] -> [f(p0, p1), f(p2, p3), p4] -> [f(f(p0, p1), f(p2, p3)), p4] -> ...
+   The order of the partials never changes, so f does not need to be commutative.
+
+Rules (what reduce allows but parallel_reduce does not):
+- func must be associative: operator.add, operator.mul, max, min, math.gcd, operator.or_ ...
+  operator.sub is not (the demo shows the wrong answer it gives).
+- func must accept its own results as EITHER argument, because two partials get combined.
+  safe_sum_temps above does not: it only checks the right argument, and a chunk whose first
+  item is "error_data" would use that string as its accumulator. Filter first, then reduce.
+- func must be picklable to reach the worker processes: operator functions, built-ins and
+  module-level functions are; lambdas and nested functions are not.
+- Floats: the additions are grouped differently, so a float sum can differ in the last bits.
+
+Empty and single-element inputs behave exactly like reduce:
+- empty, no initializer  -> TypeError
+- empty, initializer     -> the initializer (func is never called)
+- one item, no initializer -> that item (func is never called)
+- initializer given      -> used once, on the left: func(initializer, <result of the items>)
+"""
+
+_MISSING = object() # "no initializer" (None is a valid initializer)
+_CHUNKS_PER_WORKER = 4 # a few chunks per worker, so a slow chunk does not hold up the rest
+_ITERATOR_CHUNK_SIZE = 100_000 # for iterators, whose length is unknown
+
+
+def _chunks(iterable: Iterable, chunk_size: int) -> Iterator[Sequence]:
+    """Non-empty chunks of iterable. Slicing a range gives a range, which is tiny to pickle."""
+    if isinstance(iterable, Sequence):
+        for start in range(0, len(iterable), chunk_size):
+            yield iterable[start:start + chunk_size]
+    else:
+        iterator = iter(iterable)
+        while chunk := list(islice(iterator, chunk_size)):
+            yield chunk
+
+
+def _reduce_in_pool(pool: ProcessPoolExecutor, func: Callable, chunks: Iterator[Sequence],
+                    max_pending: int) -> List:
+    """reduce(func, chunk) for every chunk in the pool, in order, with at most max_pending chunks in flight."""
+    pending: Deque[Future] = deque()
+    partials = []
+    for chunk in chunks:
+        if len(pending) >= max_pending: # keeps memory bounded for long iterators
+            partials.append(pending.popleft().result())
+        pending.append(pool.submit(reduce, func, chunk))
+    partials.extend(future.result() for future in pending)
+    return partials
+
+
+def tree_reduce(func: Callable, values: Sequence):
+    """
+    Combines neighbours pairwise until one value is left: a balanced tree of func calls.
+
+    Besides allowing parallelism, the tree keeps both operands of func about the same size.
+    Multiplying 1..n left to right multiplies a huge number by a small one n times;
+    the tree multiplies numbers of similar size, which is much faster for big ints.
+    """
+    if not values:
+        raise TypeError("tree_reduce() of empty sequence")
+    while len(values) > 1:
+        paired = list(map(func, values[::2], values[1::2]))
+        if len(values) % 2:
+            paired.append(values[-1]) # the odd one out moves up a level unchanged
+        values = paired
+    return values[0]
+
+
+def parallel_reduce(func: Callable, iterable: Iterable, initializer=_MISSING,
+                    workers: Optional[int] = None, chunk_size: Optional[int] = None):
+    """
+    Equal to reduce(func, iterable[, initializer]) for an associative func, using a process pool.
+
+    Args:
+        func: associative, picklable function of two arguments (see the rules above).
+        iterable: a sequence (list, tuple, range) is sliced into chunks; any other iterable is
+            read chunk by chunk, so it can be a generator.
+        initializer: like reduce's third argument; combined once, on the left.
+        workers: processes (default: one per CPU core). workers=1 runs the same chunk + tree
+            steps in this process, which is the baseline for the benchmark.
+        chunk_size: items per chunk. Default: len(iterable) / (workers * 4) for sequences,
+            100,000 for other iterables.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        if isinstance(iterable, Sequence):
+            chunk_size = max(1, -(-len(iterable) // (workers * _CHUNKS_PER_WORKER))) # ceiling division
+        else:
+            chunk_size = _ITERATOR_CHUNK_SIZE
+
+    chunks = _chunks(iterable, chunk_size)
+    if workers == 1:
+        partials = [reduce(func, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = _reduce_in_pool(pool, func, chunks, workers * 2)
+
+    if not partials:
+        if initializer is _MISSING:
+            raise TypeError("parallel_reduce() of empty iterable with no initial value")
+        return initializer
+    result = tree_reduce(func, partials)
+    return result if initializer is _MISSING else func(initializer, result)
+
+
+def main():
+    print("\n--- Reduce Example (Aggregating Processed Data) ---")
+
+    # Scenario: You have a list of numerical data (e.g., the Fahrenheit temperatures
+    # that might be produced by a function like clean_convert_celsius_to_fahrenheit)
+    # and you want to aggregate them into a single summary value.
+
+    # Let's use a sample list of Fahrenheit temperatures (similar to what map might produce)
+    fahrenheit_temps = [77.9, 64.4, 86.36, 60.44, 71.78]
+    print(f"Sample Fahrenheit temperatures: {fahrenheit_temps}")
+
+    # --- 1. Summing all temperatures ---
+    # The function for reduce takes two arguments:
+    # - accumulator: the accumulated value from the previous step
+    # - current_element: the next element from the iterable
+
+    # Using a lambda function for addition:
+    # reduce(function, iterable)
+    sum_of_temps = reduce(lambda accumulated_sum, current_temp: accumulated_sum + current_temp, fahrenheit_temps)
+
+    # Alternatively, using operator.add for conciseness and potentially better performance:
+    # sum_of_temps_op = reduce(operator.add, fahrenheit_temps)
+
+    print(f"\nSum of all Fahrenheit temperatures: {sum_of_temps:.2f}")
+    # How it works for fahrenheit_temps = [77.9, 64.4, 86.36, 60.44, 71.78]:
+    # 1. accumulated_sum = 77.9 (first item), current_temp = 64.4 (second item)
+    #    lambda(77.9, 64.4) returns 77.9 + 64.4 = 142.3
+    # 2. accumulated_sum = 142.3, current_temp = 86.36
+    #    lambda(142.3, 86.36) returns 142.3 + 86.36 = 228.66
+    # 3. accumulated_sum = 228.66, current_temp = 60.44
+    #    lambda(228.66, 60.44) returns 228.66 + 60.44 = 289.1
+    # 4. accumulated_sum = 289.1, current_temp = 71.78
+    #    lambda(289.1, 71.78) returns 289.1 + 71.78 = 360.88
+    # Final result: 360.88
+
+    # Using an initializer: reduce(function, iterable, initializer)
+    # The initializer is used as the first 'accumulated_sum'.
+    sum_with_initializer = reduce(lambda acc, val: acc + val, fahrenheit_temps, 1000)
+    print(f"Sum with initializer 1000: {sum_with_initializer:.2f}") # 1000 + 360.88 = 1360.88
+
+    # --- 2. Finding the maximum temperature ---
+    # We need a function that returns the greater of two values (find_max_temp above).
+    max_temp = reduce(find_max_temp, fahrenheit_temps)
+
+    # Alternatively, using a lambda:
+    # max_temp_lambda = reduce(lambda t1, t2: t1 if t1 > t2 else t2, fahrenheit_temps)
+    # Or even simpler with the built-in max function (which can act as a binary function here):
+    # max_temp_builtin = reduce(max, fahrenheit_temps)
 
-# Reducing an empty list with an initializer returns the initializer
-sum_of_empty_with_init = reduce(operator.add, [], 0) # Initializer is 0
-print(f"Sum of empty list with initializer 0: {sum_of_empty_with_init}") # Output: 0
+    print(f"\nMaximum Fahrenheit temperature: {max_temp}") # Expected: 86.36
 
-# Reducing a list with one item without an initializer returns that item
-single_item_list = [100]
-result_single = reduce(operator.add, single_item_list)
-print(f"Reduce on single item list [100]: {result_single}") # Output: 100
+    # --- 3. Handling potential errors or filtering within the reduce logic ---
+    # Let's say our temperature list might contain non-numeric data or NaNs
+    # (Not a Number), which could come from failed conversions in a previous step.
+    temperatures_with_issues = [77.9, 64.4, "error_data", float('nan'), 86.36, 60.44, 71.78]
+    print(f"\nTemperatures with potential issues: {temperatures_with_issues}")
 
-print("\n--- End of Reduce Example ---")
+    # It's crucial to provide an initializer (e.g., 0.0 for a sum) when the first
+    # element(s) of the iterable might be invalid, or if the iterable could be empty.
+    # Otherwise, if the first element is invalid, it might be passed as the initial accumulator.
+    sum_of_valid_temps = reduce(safe_sum_temps, temperatures_with_issues, 0.0)
+    print(f"Sum of valid temperatures (ignoring errors and NaN): {sum_of_valid_temps:.2f}")
+    # Expected: 77.9 + 64.4 + 86.36 + 60.44 + 71.78 = 360.88
+
+    # --- Edge Cases ---
+    # Reducing an empty list without an initializer raises a TypeError
+    try:
+        reduce(operator.add, [])
+    except TypeError as e:
+        print(f"\nError reducing empty list without initializer: {e}")
+
+    # Reducing an empty list with an initializer returns the initializer
+    sum_of_empty_with_init = reduce(operator.add, [], 0) # Initializer is 0
+    print(f"Sum of empty list with initializer 0: {sum_of_empty_with_init}") # Output: 0
+
+    # Reducing a list with one item without an initializer returns that item
+    single_item_list = [100]
+    result_single = reduce(operator.add, single_item_list)
+    print(f"Reduce on single item list [100]: {result_single}") # Output: 100
+
+    # --- Parallel Reduce (associative functions only) ---
+    print("\n--- Parallel Reduce Example ---")
+    print(f"Sum, parallel_reduce(operator.add, ..., workers=2): "
+          f"{parallel_reduce(operator.add, fahrenheit_temps, workers=2):.2f}")
+    print(f"Sum with initializer 1000: {parallel_reduce(operator.add, fahrenheit_temps, 1000, workers=2):.2f}")
+    print(f"Maximum (find_max_temp is a module-level function, so it can be pickled): "
+          f"{parallel_reduce(find_max_temp, fahrenheit_temps, workers=2)}")
+    # Filter first instead of passing safe_sum_temps (see the rules above parallel_reduce)
+    valid_temps = [t for t in temperatures_with_issues if isinstance(t, (int, float)) and not math.isnan(t)]
+    print(f"Sum of valid temperatures: {parallel_reduce(operator.add, valid_temps, 0.0, workers=2):.2f}")
+
+    # Same edge-case behaviour as reduce
+    try:
+        parallel_reduce(operator.add, [], workers=2)
+    except TypeError as e:
+        print(f"Error reducing empty list without initializer: {e}")
+    print(f"Empty list with initializer 0: {parallel_reduce(operator.add, [], 0, workers=2)}")
+    print(f"Single item list [100]: {parallel_reduce(operator.add, [100], workers=2)}")
+
+    # operator.sub is NOT associative: (0 - 1) - 2 != 0 - (1 - 2), so moving the brackets changes the answer
+    print(f"reduce(operator.sub, range(10)):          {reduce(operator.sub, range(10))}")
+    print(f"parallel_reduce(operator.sub, range(10)): "
+          f"{parallel_reduce(operator.sub, range(10), workers=2, chunk_size=3)}  <- wrong, sub is not associative")
+
+    # The tree shape alone helps big-int products (workers=1: no processes involved)
+    n = 20_000
+    start_time = time.perf_counter()
+    left_fold = reduce(operator.mul, range(1, n + 1))
+    fold_seconds = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    tree = parallel_reduce(operator.mul, range(1, n + 1), workers=1, chunk_size=16)
+    tree_seconds = time.perf_counter() - start_time
+    assert tree == left_fold
+    print(f"{n:,}! ({left_fold.bit_length():,} bits): reduce {fold_seconds:.3f}s, "
+          f"tree-shaped {tree_seconds:.3f}s")
+
+    print("\n--- End of Reduce Example ---")
 
 """
 Explanation of functools.reduce():
@@ -142,4 +304,14 @@ Explanation of functools.reduce():
     It shines when the accumulation logic is more complex and doesn't have a direct built-in
     equivalent. For many transformations, list comprehensions or explicit loops might be
     preferred for clarity if `reduce` becomes too convoluted.
+
+6.  **Parallel Reduce (`parallel_reduce` above)**:
+    If the function is associative, the input can be split into chunks that are reduced in
+    separate processes, and the partial results combined pairwise in a tree. The result equals
+    `reduce` (floats aside), including the empty and single-item cases, but the function must be
+    associative, accept partial results as either argument, and be picklable (no lambdas).
 """
+
+
+if __name__ == "__main__":
+    main()
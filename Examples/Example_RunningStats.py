@@ -0,0 +1,210 @@
+"""
+Streaming Running Statistics:
+
+- track_running_maximum and the cumulative product in Example_Accumulate.py build a full list
+  before printing it. That is fine for 7 temperatures, not for an endless stream of sensor readings.
+- Here every statistic is a small operator object with an update(x) method. It keeps only the
+  state it needs (a few numbers, or a deque as long as the window) and returns the statistic
+  after x. Memory does not grow with the number of readings.
+- running_stats(readings, name=operator, ...) feeds every reading to all operators in ONE pass,
+  so the readings iterator is consumed once and can be unbounded (a generator, a socket, a file).
+"""
+
+import math
+import random
+from collections import deque
+from itertools import accumulate, islice
+from typing import Any, Deque, Dict, Iterable, Iterator, NamedTuple, Tuple
+
+
+# ==============================================================================
+# 1. Running maximum / minimum (what accumulate(values, max) computes, one value at a time)
+# ==============================================================================
+class RunningMax:
+    """Largest reading so far."""
+
+    def __init__(self):
+        self.value = None
+
+    def update(self, x):
+        if self.value is None or x > self.value:
+            self.value = x
+        return self.value
+
+
+class RunningMin:
+    """Smallest reading so far."""
+
+    def __init__(self):
+        self.value = None
+
+    def update(self, x):
+        if self.value is None or x < self.value:
+            self.value = x
+        return self.value
+
+
+# ==============================================================================
+# 2. Sliding-window maximum (monotonic deque)
+# ==============================================================================
+class SlidingWindowMax:
+    """
+    Maximum of the last `window` readings, amortized O(1) per reading.
+
+    The deque holds (index, value) pairs with decreasing values. A new reading first removes
+    every smaller value from the back (they can never be the maximum again while it is in the
+    window), then the front is dropped once it falls out of the window. The front is the maximum.
+    """
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        self.window = window
+        self._index = 0
+        self._candidates: Deque[Tuple[int, Any]] = deque()
+
+    def update(self, x):
+        candidates = self._candidates
+        while candidates and candidates[-1][1] <= x:
+            candidates.pop()
+        candidates.append((self._index, x))
+        if candidates[0][0] <= self._index - self.window:
+            candidates.popleft()
+        self._index += 1
+        return candidates[0][1]
+
+
+# ==============================================================================
+# 3. Running mean and variance (Welford's algorithm)
+# ==============================================================================
+class MeanVariance(NamedTuple):
+    count: int
+    mean: float
+    variance: float # population variance, like statistics.pvariance
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class RunningMeanVariance:
+    """
+    Welford's online algorithm: numerically stable, unlike keeping sum(x) and sum(x*x),
+    where the two big sums nearly cancel and lose most of their digits.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0 # sum of squared differences from the current mean
+
+    def update(self, x) -> MeanVariance:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean) # uses the old and the new mean
+        return MeanVariance(self.count, self.mean, self._m2 / self.count)
+
+
+# ==============================================================================
+# 4. Cumulative product in log space
+# ==============================================================================
+class LogProduct(NamedTuple):
+    sign: int        # -1, 0 or 1
+    log_abs: float   # log(|product|); -inf once a reading was 0
+
+    @property
+    def value(self) -> float:
+        """The product itself (inf if it does not fit in a float)."""
+        if self.sign == 0:
+            return 0.0
+        try:
+            return self.sign * math.exp(self.log_abs)
+        except OverflowError:
+            return self.sign * math.inf
+
+
+class LogCumulativeProduct:
+    """
+    Running product kept as sign and log(|product|), so it never overflows or underflows
+    (1e300 * 1e300 is inf as a float, but its log is just 1381.6).
+    """
+
+    def __init__(self):
+        self.sign = 1
+        self.log_abs = 0.0
+
+    def update(self, x) -> LogProduct:
+        if self.sign != 0:
+            if x == 0:
+                self.sign, self.log_abs = 0, -math.inf # the product stays 0 from here on
+            else:
+                if x < 0:
+                    self.sign = -self.sign
+                self.log_abs += math.log(abs(x))
+        return LogProduct(self.sign, self.log_abs)
+
+
+# ==============================================================================
+# 5. Several statistics in one pass
+# ==============================================================================
+def running_stats(readings: Iterable, **operators) -> Iterator[Dict[str, Any]]:
+    """
+    Feeds every reading to all operators and yields {"reading": x, name: statistic, ...}.
+
+    Example:
+        running_stats(sensor, high=RunningMax(), last_hour=SlidingWindowMax(3600), mv=RunningMeanVariance())
+    """
+    updates = [(name, operator.update) for name, operator in operators.items()]
+    for x in readings:
+        stats = {"reading": x}
+        for name, update in updates:
+            stats[name] = update(x)
+        yield stats
+
+
+def sensor_readings(seed: int = 0) -> Iterator[float]:
+    """An endless stream of simulated temperature readings (a random walk around 20 degrees)."""
+    rng = random.Random(seed)
+    temperature = 20.0
+    while True:
+        temperature += rng.gauss(0, 0.5) + (20.0 - temperature) * 0.01
+        yield round(temperature, 2)
+
+
+def main():
+    print("\n--- Running Statistics Example (Streaming, One Pass) ---")
+    temperatures = [15, 18, 17, 22, 20, 25, 23]
+    print(f"Temperatures: {temperatures}")
+    print("Value | Max | Min | Max of last 3 | Mean  | Stdev")
+    for stats in running_stats(temperatures, high=RunningMax(), low=RunningMin(),
+                               recent_high=SlidingWindowMax(3), mv=RunningMeanVariance()):
+        mv = stats["mv"]
+        print(f"{stats['reading']:5d} | {stats['high']:3d} | {stats['low']:3d} | {stats['recent_high']:14d} | "
+              f"{mv.mean:5.2f} | {mv.stdev:5.2f}")
+    # Same as list(accumulate(temperatures, max)), without building the list
+    print(f"Running max via accumulate, for comparison: {list(accumulate(temperatures, max))}")
+
+    print("\n--- Cumulative Product in Log Space ---")
+    numbers_to_multiply = [1, 2, 3, 4, 5]
+    product = LogCumulativeProduct()
+    print(f"Factorials: {[round(product.update(x).value) for x in numbers_to_multiply]}")
+    huge = LogCumulativeProduct()
+    for x in [1e200, 1e200, -1e200, 1e-150]:
+        result = huge.update(x)
+    print(f"1e200 * 1e200 * -1e200 * 1e-150: float math gives {1e200 * 1e200 * -1e200 * 1e-150}, "
+          f"log space gives sign {result.sign}, log10 {result.log_abs / math.log(10):.1f}")
+
+    print("\n--- 1,000,000 Sensor Readings, O(1) Memory ---")
+    # islice only to end the demo; the operators would run forever on sensor_readings()
+    stream = running_stats(islice(sensor_readings(), 1_000_000), high=RunningMax(), low=RunningMin(),
+                           last_minute_high=SlidingWindowMax(60), mv=RunningMeanVariance())
+    for stats in stream:
+        pass
+    mv = stats["mv"]
+    print(f"Readings: {mv.count:,}, mean {mv.mean:.2f}, stdev {mv.stdev:.2f}, "
+          f"max {stats['high']}, min {stats['low']}, max of the last 60: {stats['last_minute_high']}")
+
+
+if __name__ == "__main__":
+    main()
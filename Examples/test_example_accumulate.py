@@ -0,0 +1,88 @@
+# test_example_accumulate.py
+import random
+from itertools import accumulate
+
+import pytest
+from Example_Accumulate import FenwickLedger, running_balance_non_negative, show_running_balance_non_negative
+
+
+# --- FenwickLedger ---
+def test_ledger_matches_accumulate_through_appends_and_updates():
+    rng = random.Random(7)
+    transactions = [rng.randint(-500, 500) for _ in range(200)]
+    ledger = FenwickLedger(transactions, initial_balance=1000)
+
+    for step in range(300):
+        if step % 3 == 0:
+            amount = rng.randint(-500, 500)
+            transactions.append(amount)
+            ledger.append(amount)
+        else:
+            index, amount = rng.randrange(len(transactions)), rng.randint(-500, 500)
+            transactions[index] = amount
+            ledger.update(index, amount)
+
+        running_totals = list(accumulate(transactions, initial=1000))
+        count = rng.randint(0, len(transactions))
+        assert ledger.balance(count) == running_totals[count]
+        start = rng.randint(0, len(transactions))
+        stop = rng.randint(start, len(transactions))
+        assert ledger.range_sum(start, stop) == sum(transactions[start:stop])
+
+    assert len(ledger) == len(transactions) and ledger[-1] == transactions[-1]
+
+def test_ledger_built_by_appends_equals_bulk_build():
+    transactions = list(range(-50, 77))
+    appended = FenwickLedger()
+    for amount in transactions:
+        appended.append(amount)
+    bulk = FenwickLedger(transactions)
+    assert [appended.balance(i) for i in range(len(transactions) + 1)] == \
+           [bulk.balance(i) for i in range(len(transactions) + 1)]
+
+def test_ledger_bounds():
+    ledger = FenwickLedger([5, -3], initial_balance=10)
+    assert ledger.balance(0) == 10 and ledger.range_sum(1, 1) == 0
+    ledger.update(-1, 4) # negative indexes work like on a list
+    assert ledger.balance(2) == 19
+    with pytest.raises(IndexError):
+        ledger.balance(3)
+    with pytest.raises(IndexError):
+        ledger.range_sum(2, 1)
+    with pytest.raises(IndexError):
+        ledger.update(2, 0)
+
+
+# --- running_balance_non_negative ---
+def printed_balances(capsys, transactions, initial_balance):
+    """Runs the closure version and reads its table back: [initial, balance after each transaction]."""
+    show_running_balance_non_negative(transactions, initial_balance)
+    lines = capsys.readouterr().out.splitlines()
+    initial = [int(line.split(":")[1]) for line in lines if line.startswith("Initial Balance:")]
+    rows = [int(line.split("|")[1]) for line in lines if "|" in line and "Balance" not in line]
+    return initial + rows
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_floored_balance_equals_closure_version(capsys, seed):
+    rng = random.Random(seed)
+    transactions = [rng.randint(-300, 200) for _ in range(rng.randint(0, 60))]
+    initial_balance = rng.choice([-100, 0, 50, 1000])
+    expected = printed_balances(capsys, transactions, initial_balance)
+    assert running_balance_non_negative(transactions, initial_balance) == expected
+    assert running_balance_non_negative(iter(transactions), initial_balance, chunk_size=7) == expected
+
+def test_batch_floored_balance_long_ledger(capsys):
+    rng = random.Random(11)
+    # Up and down phases: some 4096-item blocks reach a new low, others do not
+    transactions = [rng.randint(-100, 60) if (i // 5000) % 2 else rng.randint(-60, 100) for i in range(30_000)]
+    expected = printed_balances(capsys, transactions, 100)
+    assert running_balance_non_negative(transactions, 100, chunk_size=10_000) == expected
+
+def test_batch_floored_balance_numpy():
+    np = pytest.importorskip("numpy")
+    rng = random.Random(3)
+    transactions = [rng.randint(-300, 200) for _ in range(10_000)]
+    expected = running_balance_non_negative(transactions, 25)
+    assert running_balance_non_negative(np.array(transactions), 25).tolist() == expected
+    floats = np.array(transactions, dtype=np.float64) / 100
+    assert np.allclose(running_balance_non_negative(floats, 0.25), np.array(expected) / 100)
@@ -0,0 +1,620 @@
+# test_example_decorator.py
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+
+import pytest
+from Example_Decorator import (
+    _MISSING, CURRENT_USER, LatencyHistogram, MemoryBackend, MetricsRegistry, PermissionResolver, SqliteBackend,
+    UserContext,
+    fast_fibonacci, fast_fibonacci_batch, freeze_arg, fused, log_calls, memoize, require_permission, signature_key_builder,
+    stable_digest, time_execution,
+)
+
+
+# --- log_calls ---
+class CountingRepr:
+    reprs = 0
+
+    def __repr__(self):
+        CountingRepr.reprs += 1
+        return "CountingRepr()"
+
+def test_log_calls_does_no_work_when_info_is_disabled(caplog):
+    caplog.set_level(logging.WARNING)
+    CountingRepr.reprs = 0
+    identity = log_calls(lambda x: x)
+    assert isinstance(identity(CountingRepr()), CountingRepr)
+    assert CountingRepr.reprs == 0
+    assert caplog.records == []
+
+def test_log_calls_sampling_and_truncation(caplog):
+    caplog.set_level(logging.INFO)
+
+    @log_calls(sample_every=3, max_repr=20)
+    def echo(value):
+        return value
+
+    for i in range(6):
+        echo("x" * 100)
+    entering = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Entering")]
+    assert len(entering) == 2 # calls 0 and 3
+    assert entering[0] == "Entering echo('xxxxxxx...xxxxxxxx')" # reprlib keeps both ends
+
+def test_log_calls_default_logs_full_reprs(caplog):
+    caplog.set_level(logging.INFO)
+    echo = log_calls(lambda value: value)
+    echo(list(range(1000)))
+    assert caplog.records[0].getMessage() == f"Entering <lambda>({list(range(1000))!r})"
+
+def test_log_calls_max_repr_shows_small_containers_in_full(caplog):
+    caplog.set_level(logging.INFO)
+    echo = log_calls(lambda *values: values, max_repr=200)
+    small = (list(range(10)), {i: i for i in range(8)}, [[[[[[[[1]]]]]]]], set(range(10)))
+    echo(*small)
+    assert caplog.records[0].getMessage() == f"Entering <lambda>({', '.join(map(repr, small))})"
+
+    caplog.clear()
+    big = [CountingRepr() for _ in range(10**5)]
+    CountingRepr.reprs = 0
+    echo(big)
+    # Each handler formats the entry and exit messages, reading at most 100 items each time
+    assert 0 < CountingRepr.reprs < len(big) // 100
+    message = caplog.records[0].getMessage()
+    assert message.startswith("Entering <lambda>([CountingRepr(), CountingRepr(),") and message.endswith("...)")
+    assert len(message) < 250
+
+def test_log_calls_always_logs_exceptions(caplog):
+    caplog.set_level(logging.INFO)
+
+    @log_calls(sample_every=1000)
+    def fail():
+        raise KeyError("boom")
+
+    fail_calls = 3
+    for _ in range(fail_calls):
+        with pytest.raises(KeyError):
+            fail()
+    assert sum(r.levelno == logging.ERROR for r in caplog.records) == fail_calls
+
+# --- time_execution metrics ---
+def test_latency_histogram_percentiles_within_bucket_error():
+    histogram = LatencyHistogram()
+    for ns in range(1, 100_001): # 1 ns .. 100 us, uniform
+        histogram.record(ns)
+    summary = histogram.summary()
+    assert summary.count == 100_000
+    assert summary.mean == pytest.approx(50_000.5e-9)
+    assert summary.max == pytest.approx(100e-6)
+    for value, expected in ((summary.p50, 50e-6), (summary.p95, 95e-6), (summary.p99, 99e-6)):
+        assert expected <= value <= expected * (1 + 1 / 16)
+
+def test_latency_histogram_loses_nothing_across_threads():
+    histogram = LatencyHistogram()
+
+    def record_many():
+        for ns in range(5000):
+            histogram.record(ns)
+
+    threads = [threading.Thread(target=record_many) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert histogram.summary().count == 20_000
+
+def test_time_execution_records_into_registry(tmp_path):
+    registry = MetricsRegistry()
+
+    @time_execution(name="work", log=False, registry=registry)
+    def work(fail=False):
+        if fail:
+            raise ValueError
+        return 1
+
+    for _ in range(5):
+        work()
+    with pytest.raises(ValueError):
+        work(fail=True)
+    assert registry.snapshot()["work"].count == 6
+
+    path = str(tmp_path / "metrics.prom")
+    text = registry.export_text(path)
+    assert 'function_latency_seconds_count{function="work"} 6' in text
+    with open(path) as f:
+        assert f.read() == text
+    assert "work" in registry.report()
+
+# --- async def ---
+def test_async_memoize_shares_one_task_per_key():
+    calls = []
+
+    @memoize
+    async def fetch(x):
+        calls.append(x)
+        await asyncio.sleep(0.01)
+        return x * 10
+
+    async def run():
+        first = await asyncio.gather(*(fetch(1) for _ in range(10)), fetch(2))
+        return first, await fetch(1)
+
+    results, again = asyncio.run(run())
+    assert results == [10] * 10 + [20] and again == 10
+    assert calls == [1, 2]
+    assert fetch.cache_info() == (10, 2, None, 2)
+
+def test_async_memoize_does_not_cache_errors():
+    calls = []
+
+    @memoize
+    async def flaky(x):
+        calls.append(x)
+        await asyncio.sleep(0)
+        if len(calls) == 1:
+            raise ValueError("first call fails")
+        return x
+
+    async def run():
+        outcomes = await asyncio.gather(flaky(1), flaky(1), return_exceptions=True)
+        return outcomes, await flaky(1)
+
+    outcomes, retried = asyncio.run(run())
+    assert all(isinstance(o, ValueError) for o in outcomes)
+    assert retried == 1 and len(calls) == 2
+
+def test_async_time_execution_and_log_calls_await_the_call(caplog):
+    caplog.set_level(logging.INFO)
+    registry = MetricsRegistry()
+
+    @log_calls
+    @time_execution(name="sleepy", log=False, registry=registry)
+    async def sleepy():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    assert asyncio.iscoroutinefunction(sleepy)
+    assert asyncio.run(sleepy()) == "done"
+    assert registry.snapshot()["sleepy"].max >= 0.04
+    assert "Exiting sleepy with result: 'done'" in caplog.text
+
+def test_async_require_permission():
+    @require_permission("admin")
+    async def drop_table():
+        return "dropped"
+
+    with pytest.raises(PermissionError): # the default user is an editor
+        asyncio.run(drop_table())
+
+# --- require_permission ---
+def make_resolver():
+    return PermissionResolver(
+        role_permissions={"viewer": {"view"}, "editor": {"edit"}, "admin": {"admin"}},
+        role_parents={"editor": {"viewer"}, "admin": {"editor"}},
+    )
+
+def test_resolver_expands_roles_and_caches_until_invalidated():
+    resolver = make_resolver()
+    bob = UserContext("bob", frozenset({"admin"}), frozenset({"export"}))
+    assert resolver.effective_permissions(bob) == {"view", "edit", "admin", "export"}
+
+    demoted = bob._replace(roles=frozenset({"viewer"}), extra_permissions=frozenset())
+    assert "admin" in resolver.effective_permissions(demoted) # still cached by user_id
+    resolver.invalidate("bob")
+    assert resolver.effective_permissions(demoted) == {"view"}
+
+def test_resolver_rejects_cycles_and_unknown_roles():
+    with pytest.raises(ValueError, match="cycle"):
+        PermissionResolver({"a": {"x"}, "b": {"y"}}, {"a": {"b"}, "b": {"a"}})
+    with pytest.raises(ValueError, match="Unknown role"):
+        PermissionResolver({"a": {"x"}}, {"a": {"ghost"}})
+
+def test_require_permission_uses_current_user_and_samples_grant_logs(caplog):
+    caplog.set_level(logging.DEBUG)
+    resolver = make_resolver()
+
+    @require_permission("edit", resolver=resolver, log_every=5)
+    def update(x):
+        return x
+
+    token = CURRENT_USER.set(UserContext("carol", frozenset({"editor"})))
+    try:
+        assert [update(i) for i in range(10)] == list(range(10))
+    finally:
+        CURRENT_USER.reset(token)
+    assert sum("granted to carol" in r.getMessage() for r in caplog.records) == 2
+
+    token = CURRENT_USER.set(UserContext("dave", frozenset({"viewer"})))
+    try:
+        with pytest.raises(PermissionError):
+            update(1)
+    finally:
+        CURRENT_USER.reset(token)
+
+# --- fast_fibonacci ---
+def iterative_fibonacci(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+def test_fast_fibonacci_matches_iteration():
+    for n in list(range(100)) + [1000, 4097]:
+        assert fast_fibonacci(n) == iterative_fibonacci(n)
+    with pytest.raises(ValueError):
+        fast_fibonacci(-1)
+
+def test_fast_fibonacci_batch_keeps_input_order():
+    ns = [30, 5, 5, 0, 2000, 1999, 2100, 1]
+    assert fast_fibonacci_batch(ns) == [iterative_fibonacci(n) for n in ns]
+    assert fast_fibonacci_batch([]) == []
+
+# --- fused ---
+def run_and_capture(caplog, func, calls):
+    caplog.clear()
+    results = []
+    for args in calls:
+        try:
+            results.append(func(*args))
+        except (TypeError, ValueError) as e:
+            results.append(repr(e))
+    return results, [(r.levelno, r.getMessage()) for r in caplog.records]
+
+def test_fused_matches_the_decorator_stack(caplog):
+    caplog.set_level(logging.DEBUG)
+
+    def build(fuse):
+        registry = MetricsRegistry()
+        decorators = [memoize(maxsize=2), time_execution(name="f", registry=registry), log_calls(max_repr=10)]
+
+        def divide(a, b):
+            if b == 0:
+                raise ValueError("b is zero")
+            return a / b
+
+        if fuse:
+            return fused(*decorators)(divide), registry
+        for decorator in reversed(decorators):
+            divide = decorator(divide)
+        return divide, registry
+
+    (stacked, stack_registry), (one_frame, fused_registry) = build(False), build(True)
+    calls = [(1, 2), (1, 2), (3, 0), (1, 4), (5, 1), (1, 2), ("x" * 50, 1)]
+    stack_results, stack_logs = run_and_capture(caplog, stacked, calls)
+    fused_results, fused_logs = run_and_capture(caplog, one_frame, calls)
+    assert fused_results == stack_results
+
+    def without_duration(logs):
+        return [(level, message.split(" took ")[0]) for level, message in logs]
+    assert without_duration(fused_logs) == without_duration(stack_logs)
+    assert one_frame.cache_info() == stacked.cache_info()
+    assert fused_registry.snapshot()["f"].count == stack_registry.snapshot()["f"].count
+    assert one_frame.__name__ == "divide" and "def wrapper" in one_frame.fused_source
+
+def test_fused_permission_and_validation():
+    @fused(require_permission("admin"), log_calls)
+    def drop_table():
+        return "dropped"
+
+    with pytest.raises(PermissionError): # the default user is an editor
+        drop_table()
+    with pytest.raises(ValueError):
+        fused(log_calls, log_calls)
+    with pytest.raises(TypeError):
+        fused(functools.lru_cache)
+    with pytest.raises(ValueError):
+        fused(memoize(thread_safe=True))(lambda: None)
+
+# --- memoize options ---
+def test_memoize_lru_eviction_and_cache_info():
+    @memoize(maxsize=2)
+    def square(x):
+        return x * x
+
+    for x in [1, 2, 1, 3, 2]: # 3 evicts 2, then 2 evicts 1
+        square(x)
+    info = square.cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 4, 2, 2)
+
+    square.cache_clear()
+    assert square.cache_info() == (0, 0, 2, 0)
+
+def test_memoize_ttl_expires():
+    calls = []
+
+    @memoize(ttl=0.05)
+    def now(x):
+        calls.append(x)
+        return len(calls)
+
+    assert now(1) == 1
+    assert now(1) == 1
+    time.sleep(0.06)
+    assert now(1) == 2
+
+def test_memoize_keyword_and_positional_args_differ():
+    @memoize
+    def add(a, b=0):
+        return a + b
+
+    assert add(1, 2) == add(1, b=2) == 3
+    assert add.cache_info().misses == 2
+
+
+# --- thread_safe=True: stress test with an Example_MultiThread style fan-out ---
+THREADS_PER_KEY = 20
+KEYS = 10
+
+def test_memoize_single_flight_computes_each_key_once():
+    compute_counts = {}
+    counts_lock = threading.Lock()
+
+    @memoize(thread_safe=True)
+    def slow_square(x):
+        with counts_lock:
+            compute_counts[x] = compute_counts.get(x, 0) + 1
+        time.sleep(0.05) # Long enough for every other thread to arrive while computing
+        return x * x
+
+    results = []
+    results_lock = threading.Lock()
+    start = threading.Barrier(KEYS * THREADS_PER_KEY)
+
+    def worker(x):
+        start.wait() # Release all threads at the same moment: every key starts cold
+        value = slow_square(x)
+        with results_lock:
+            results.append((x, value))
+
+    # One thread per call, started and joined like in Example_MultiThread.py
+    threads = [threading.Thread(target=worker, args=(x,)) for x in range(KEYS) for _ in range(THREADS_PER_KEY)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert compute_counts == {x: 1 for x in range(KEYS)}
+    assert sorted(results) == sorted((x, x * x) for x in range(KEYS) for _ in range(THREADS_PER_KEY))
+    info = slow_square.cache_info()
+    assert (info.misses, info.hits) == (KEYS, KEYS * (THREADS_PER_KEY - 1))
+
+def test_memoize_single_flight_shares_exceptions():
+    calls = []
+    start = threading.Barrier(5)
+
+    @memoize(thread_safe=True)
+    def fail(x):
+        calls.append(x)
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    errors = []
+
+    def worker():
+        start.wait()
+        try:
+            fail(1)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["boom"] * 5
+    assert calls == [1] # Computed once for all five threads
+    # The failure was not cached, so the next call computes again
+    with pytest.raises(ValueError):
+        fail(1)
+    assert calls == [1, 1]
+
+def test_memoize_thread_safe_recursion():
+    @memoize(thread_safe=True)
+    def fib(n):
+        return n if n <= 1 else fib(n - 1) + fib(n - 2)
+
+    assert fib(50) == 12586269025
+
+
+# --- SqliteBackend: results survive a restart ---
+def make_square(path, calls, **options):
+    """Decorate the same function again, like a restarted program would."""
+    @memoize(backend=SqliteBackend(str(path), **options))
+    def square(x, power=2):
+        calls.append(x)
+        return x ** power
+    return square
+
+def test_sqlite_backend_cold_restart_serves_hits(tmp_path):
+    calls = []
+    square = make_square(tmp_path / "cache.db", calls)
+    assert [square(x) for x in (1, 2, 3, 2)] == [1, 4, 9, 4]
+    assert calls == [1, 2, 3]
+    square.cache_backend.close()
+
+    restarted = make_square(tmp_path / "cache.db", calls)
+    assert [restarted(x) for x in (1, 2, 3)] == [1, 4, 9]
+    assert calls == [1, 2, 3] # No recomputation after the restart
+    assert restarted.cache_info().hits == 3
+
+def test_sqlite_backend_drops_other_versions(tmp_path):
+    path = str(tmp_path / "cache.db")
+    old = SqliteBackend(path)
+    old.bind(make_square)
+    old.version = "hash of an older source" # As if make_square had been edited since
+    old.set((1,), "stale")
+    old.close()
+
+    current = SqliteBackend(path)
+    current.bind(make_square)
+    assert current.get((1,)) is _MISSING
+    current.set((2,), 4)
+    current.close()
+
+    reopened = SqliteBackend(path)
+    reopened.bind(make_square)
+    assert reopened.get((2,)) == 4
+    assert len(reopened) == 1
+
+def test_sqlite_backend_ignores_rows_written_by_other_versions_after_bind(tmp_path):
+    path = str(tmp_path / "cache.db")
+    current = SqliteBackend(path, maxsize=2)
+    current.bind(make_square)
+    current.set((1,), 1)
+
+    # An older process, still running, writes to the same file after current.bind() cleaned it
+    old = SqliteBackend(path)
+    old.bind(make_square)
+    old.version = "hash of an older source"
+    old.set((2,), "stale")
+    old.set((3,), "stale")
+    old.close()
+
+    assert current.get((2,)) is _MISSING
+    assert len(current) == 1
+    current.set((4,), 16) # the stale rows do not count towards maxsize
+    assert (current.get((1,)), current.get((4,))) == (1, 16)
+    current.close()
+
+def test_sqlite_backend_lru_eviction(tmp_path):
+    calls = []
+    square = make_square(tmp_path / "cache.db", calls, maxsize=2)
+    for x in (1, 2, 1, 3): # 3 evicts 2, the least recently used
+        square(x)
+    assert square.cache_info().currsize == 2
+    square(1)
+    square(2)
+    assert calls == [1, 2, 3, 2]
+
+class SlowBackend(MemoryBackend):
+    """A thread-safe backend whose reads take a while, like a query on a busy disk."""
+    thread_safe = True
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        time.sleep(self.delay) # The "I/O" runs without any lock held
+        with self.lock:
+            return super().get(key)
+
+    def set(self, key, result):
+        with self.lock:
+            super().set(key, result)
+
+def run_threads(target, args_list):
+    threads = [threading.Thread(target=target, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_thread_safe_memoize_reads_backend_outside_its_lock():
+    @memoize(thread_safe=True, backend=SlowBackend(delay=0.1))
+    def square(x):
+        return x * x
+
+    for x in range(4):
+        square(x)
+    start = time.perf_counter()
+    run_threads(square, [(x,) for x in range(4)]) # four cache hits at the same time
+    assert time.perf_counter() - start < 0.3 # they overlap; under one lock they would take 0.4 s
+    assert square.cache_info().hits == 4
+
+@pytest.mark.parametrize("backend", ["slow", "sqlite"])
+def test_thread_safe_memoize_single_flight_with_unlocked_backend(backend, tmp_path):
+    calls = []
+    calls_lock = threading.Lock()
+
+    @memoize(thread_safe=True,
+             backend=SlowBackend(delay=0.001) if backend == "slow" else SqliteBackend(str(tmp_path / "cache.db")))
+    def slow_square(x):
+        with calls_lock:
+            calls.append(x)
+        time.sleep(0.01)
+        return x * x
+
+    start = threading.Barrier(40)
+    results = []
+
+    def worker(x):
+        start.wait()
+        for _ in range(5): # later rounds race with leaders that are just storing their result
+            results.append((x, slow_square(x)))
+
+    run_threads(worker, [(x % 4,) for x in range(40)])
+    assert sorted(calls) == [0, 1, 2, 3] # still computed once per key
+    assert sorted(results) == sorted((x % 4, (x % 4) ** 2) for x in range(40) for _ in range(5))
+    info = slow_square.cache_info()
+    assert (info.misses, info.hits) == (4, 196)
+
+
+# --- normalize_args=True: keys built through the signature ---
+def test_signature_key_normalizes_keywords_and_defaults():
+    def f(a, b=2):
+        return a + b
+
+    key = signature_key_builder(f)
+    assert key((1, 2), {}) == key((1,), {"b": 2}) == key((), {"b": 2, "a": 1}) == key((1,), {})
+    assert key((1, 3), {}) != key((1, 2), {})
+    with pytest.raises(TypeError):
+        key((1,), {"c": 3})
+
+def test_signature_key_with_var_args():
+    def f(a, *rest, flag=False, **options):
+        return a
+
+    key = signature_key_builder(f)
+    assert key((1, 2), {"x": 1}) == key((1, 2), {"x": 1, "flag": False})
+    assert key((1, 2), {}) != key((1,), {})
+
+def test_freeze_arg_structural_equality():
+    assert freeze_arg([1, [2, 3]]) == freeze_arg([1, [2, 3]])
+    assert freeze_arg([1, 2]) != freeze_arg((1, 2)) # A list is not a tuple
+    assert freeze_arg({"a": 1, "b": [2]}) == freeze_arg({"b": [2], "a": 1})
+    assert freeze_arg({1, 2}) == freeze_arg({2, 1})
+    with pytest.raises(TypeError):
+        freeze_arg(bytearray(b"mutable"))
+    # Frozen keys have a stable digest, so they also work with SqliteBackend
+    assert stable_digest(freeze_arg({"a": {1, 2}})) == stable_digest(freeze_arg({"a": {2, 1}}))
+
+def test_freeze_arg_accepts_container_subclasses():
+    class Items(list):
+        pass
+
+    Point = namedtuple("Point", "x y")
+    counts = defaultdict(list, {"a": [1]})
+    assert freeze_arg(counts) == freeze_arg({"a": [1]})
+    assert freeze_arg(Items([1, [2]])) == freeze_arg([1, [2]])
+    assert freeze_arg(OrderedDict(a=[1], b=2)) == freeze_arg(OrderedDict(a=[1], b=2))
+    assert freeze_arg(OrderedDict(a=1, b=2)) != freeze_arg(OrderedDict(b=2, a=1)) # like OrderedDict ==
+    assert freeze_arg(Point([1], 2)) == freeze_arg(([1], 2)) # a namedtuple holding a list
+
+def test_memoize_normalize_args():
+    calls = []
+
+    @memoize(normalize_args=True)
+    def total(values, scale=1):
+        calls.append(values)
+        return sum(values) * scale
+
+    assert total([1, 2, 3]) == 6
+    assert total([1, 2, 3], scale=1) == 6
+    assert total(values=[1, 2, 3]) == 6
+    assert total([1, 2, 3], 2) == 12
+    assert len(calls) == 2
+
+def test_freeze_arg_numpy_arrays():
+    np = pytest.importorskip("numpy")
+    a = np.arange(12).reshape(3, 4)
+    assert freeze_arg(a) == freeze_arg(a.copy())
+    assert freeze_arg(a.T) == freeze_arg(np.ascontiguousarray(a.T))
+    assert freeze_arg(a) != freeze_arg(a.reshape(4, 3))
+    assert freeze_arg(a) != freeze_arg(a.astype(np.float64))
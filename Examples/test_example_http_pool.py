@@ -0,0 +1,82 @@
+# test_example_http_pool.py
+import http.client
+import socket
+
+import pytest
+from Example_HttpPool import ConnectionPool, http_fetch, start_local_server
+from Example_MultiThread import fetch_all
+
+
+@pytest.fixture
+def local_server():
+    server, base_url = start_local_server(0, 0, 0) # no latency, no errors
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_opens_at_most_one_connection_per_worker(local_server):
+    _, base_url = local_server
+    pool = ConnectionPool(max_idle_per_host=4)
+    urls = [f"{base_url}/api/items/{i}" for i in range(100)]
+    results = fetch_all(urls, max_workers=4, fetch=lambda url, task_id: http_fetch(url, task_id, pool=pool))
+    pool.close()
+    assert [r["status"] for r in results] == [200] * 100
+    assert [r["content"] for r in results] == [f"Data for /api/items/{i}" for i in range(100)]
+    assert 1 <= pool.created <= 4 # every other request reused a keep-alive connection
+
+def test_http_500_maps_to_an_error_result(local_server):
+    server, base_url = local_server
+    server.error_rate = 1.0 # every request fails
+    result = http_fetch(f"{base_url}/api/items/1", 0, pool=ConnectionPool())
+    assert result["status"] == 500
+    assert result["content"] is None
+    assert result["error"] == "HTTP 500: Simulated server error"
+
+def test_stale_keep_alive_connection_is_replaced(local_server):
+    _, base_url = local_server
+    pool = ConnectionPool()
+    assert http_fetch(f"{base_url}/first", 0, pool=pool)["status"] == 200
+    # Make the idle connection look closed by the server: swap its socket for one whose peer is gone
+    conn, reused = pool.acquire(*local_server[0].server_address[:2])
+    assert reused
+    conn.sock.close()
+    conn.sock, peer = socket.socketpair()
+    peer.close()
+    pool.release(conn)
+
+    result = http_fetch(f"{base_url}/second", 1, pool=pool)
+    pool.close()
+    assert (result["status"], result["content"]) == (200, "Data for /second")
+    assert pool.created == 2 # the retry opened exactly one fresh connection
+
+def test_connection_errors_map_to_an_error_result():
+    with socket.socket() as probe: # a port nobody listens on
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    result = http_fetch(f"http://127.0.0.1:{port}/", 0, pool=ConnectionPool(), timeout=1.0)
+    assert result["status"] == 500 and result["content"] is None and result["error"]
+
+def test_https_urls_use_tls_connections_on_port_443():
+    pool = ConnectionPool()
+    conn, reused = pool.acquire("example.com", 443, "https")
+    assert isinstance(conn, http.client.HTTPSConnection) and not reused
+    pool.release(conn)
+    assert pool.acquire("example.com", 443, "http")[1] is False # plain and TLS connections are pooled apart
+    assert pool.acquire("example.com", 443, "https") == (conn, True)
+    pool.close()
+
+    opened = []
+
+    class RecordingPool(ConnectionPool):
+        def connect(self, host, port, scheme="http"):
+            opened.append((scheme, host, port))
+            raise ConnectionRefusedError("offline test")
+
+    http_fetch("https://example.com/a", 0, pool=RecordingPool())
+    http_fetch("http://example.com/b", 1, pool=RecordingPool())
+    assert opened == [("https", "example.com", 443), ("http", "example.com", 80)]
+
+def test_unsupported_schemes_map_to_an_error_result():
+    result = http_fetch("ftp://example.com/file", 0)
+    assert result["status"] == 500 and "Unsupported URL scheme 'ftp'" in result["error"]
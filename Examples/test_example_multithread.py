@@ -0,0 +1,208 @@
+# test_example_multithread.py
+import asyncio
+import threading
+import time
+
+import Example_MultiThread
+import pytest
+from Example_MultiThread import (
+    FetchPolicy, FetchStats, ResilientFetch, TokenBucket, async_fetch_all, fetch_all, fetch_iter,
+)
+
+
+class StubFetch:
+    """fetch(url, task_id) stand-in: records how many calls run at once, sleeps `delays[task_id]`."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, url, task_id):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delays.get(task_id, 0.001))
+        with self.lock:
+            self.running -= 1
+        return {"url": url, "content": f"Data for {url}", "status": 200}
+
+
+# --- fetch_iter / fetch_all: bounded pool ---
+def test_fetch_iter_backpressure_on_a_lazy_generator():
+    produced = 0
+
+    def urls():
+        nonlocal produced
+        for i in range(200):
+            produced += 1
+            yield f"http://example.com/{i}"
+
+    fetch = StubFetch()
+    consumed = 0
+    max_in_flight = 0
+    for result in fetch_iter(urls(), max_workers=3, fetch=fetch, max_pending=5):
+        consumed += 1
+        max_in_flight = max(max_in_flight, produced - consumed + 1) # +1: the result just handed to us
+        assert result["url"] == f"http://example.com/{consumed - 1}"
+    assert consumed == produced == 200
+    assert max_in_flight <= 5 # the generator is never read further ahead than the window
+    assert fetch.max_running <= 3
+
+def test_fetch_all_keeps_input_order_when_completion_order_differs():
+    urls = [f"http://example.com/{i}" for i in range(6)]
+    # The first URLs are the slowest, so they finish last
+    fetch = StubFetch(delays={i: 0.05 * (6 - i) for i in range(6)})
+    results = fetch_all(urls, max_workers=6, fetch=fetch)
+    assert [r["url"] for r in results] == urls
+    assert fetch.max_running > 1 # they really ran concurrently
+
+def test_fetch_iter_rejects_bad_pool_sizes():
+    with pytest.raises(ValueError):
+        list(fetch_iter(["u"], max_workers=0))
+    with pytest.raises(ValueError):
+        list(fetch_iter(["u"], max_workers=4, max_pending=2))
+    with pytest.raises(ValueError, match="max_pending must be positive"):
+        list(fetch_iter(["u"], max_workers=1, max_pending=0)) # not silently the default
+
+
+# --- FetchPolicy: rate limits, retries, deadlines, per-host stats ---
+class FlakyFetch:
+    """Fails (HTTP 500) the first `failures` attempts per URL, then succeeds; records every call."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def __call__(self, url, task_id, timeout=None):
+        with self.lock:
+            self.calls.append((url, time.monotonic(), timeout))
+            attempt = sum(1 for called_url, _, _ in self.calls if called_url == url)
+        if attempt <= self.failures:
+            return {"url": url, "content": None, "status": 500, "error": "simulated"}
+        return {"url": url, "content": f"Data for {url}", "status": 200}
+
+@pytest.fixture
+def max_jitter(monkeypatch):
+    """Full jitter always picks its upper bound, so backoff delays are predictable."""
+    monkeypatch.setattr(Example_MultiThread.random, "uniform", lambda low, high: high)
+
+def test_retries_stop_at_the_retry_count(max_jitter):
+    stats = FetchStats()
+    fetch = ResilientFetch(FlakyFetch(failures=10), FetchPolicy(retries=3, backoff=0.001), stats)
+    result = fetch("http://example.com/a", 0)
+    assert result["status"] == 500
+    assert len(fetch.fetch.calls) == 4 # one attempt + 3 retries
+    times = [called_at for _, called_at, _ in fetch.fetch.calls]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert all(gap >= delay for gap, delay in zip(gaps, [0.001, 0.002, 0.004])) # exponential backoff
+
+    flaky = ResilientFetch(FlakyFetch(failures=2), FetchPolicy(retries=3, backoff=0.001), stats)
+    assert flaky("http://example.com/b", 1)["status"] == 200
+    assert len(flaky.fetch.calls) == 3
+
+    host = stats.hosts["example.com"]
+    assert (host["urls"], host["failed"], host["attempts"], host["retries"]) == (2, 1, 7, 5)
+
+def test_exceptions_become_error_results():
+    def broken(url, task_id):
+        raise ConnectionError("connection refused")
+
+    result = ResilientFetch(broken, FetchPolicy(retries=1, backoff=0))("http://example.com/", 0)
+    assert (result["status"], result["error"]) == (500, "connection refused")
+
+def test_deadline_stops_retries_and_returns_504_when_nothing_ran(max_jitter):
+    # The next backoff (0.5 s) would end after the 0.2 s deadline: one attempt, no waiting
+    fetch = ResilientFetch(FlakyFetch(failures=10), FetchPolicy(retries=5, backoff=0.5, timeout=0.2))
+    start = time.monotonic()
+    assert fetch("http://example.com/a", 0)["status"] == 500
+    assert time.monotonic() - start < 0.2
+    assert len(fetch.fetch.calls) == 1
+    assert 0 < fetch.fetch.calls[0][2] <= 0.2 # the fetch got the time left as its timeout
+
+    # One token per second: the second URL cannot get a token before its deadline
+    stats = FetchStats()
+    limited = ResilientFetch(FlakyFetch(failures=0), FetchPolicy(rate_limit=1, burst=1, timeout=0.2), stats)
+    assert limited("http://example.com/1", 0)["status"] == 200
+    result = limited("http://example.com/2", 1)
+    assert (result["status"], result["error"]) == (504, "deadline exceeded")
+    assert len(limited.fetch.calls) == 1 # the second URL was never fetched
+    host = stats.hosts["example.com"]
+    assert (host["urls"], host["failed"], host["attempts"], host["retries"]) == (2, 1, 1, 0)
+
+def test_rate_limit_is_per_host():
+    rate = 10 # requests per second per host, no bursts
+    fetch = FlakyFetch(failures=0)
+    urls = [f"http://{host}/{i}" for i in range(6) for host in ("a.example", "b.example")]
+    stats = FetchStats()
+    start = time.monotonic()
+    results = fetch_all(urls, max_workers=4, fetch=fetch, policy=FetchPolicy(rate_limit=rate, burst=1), stats=stats)
+    elapsed = time.monotonic() - start
+    assert all(r["status"] == 200 for r in results)
+
+    for host in ("a.example", "b.example"):
+        times = sorted(called_at for url, called_at, _ in fetch.calls if host in url)
+        assert times[-1] - times[0] >= 5 / rate * 0.95 # 6 calls, at most `rate` per second
+    # The hosts have separate buckets, so they wait in parallel (one shared bucket: 1.1 s)
+    assert elapsed < 11 / rate * 0.8
+
+    report = stats.report().splitlines()
+    assert report[0].split() == ["host", "|", "URLs", "|", "failed", "|", "retries", "|", "URLs/sec"]
+    rows = {cells[0].strip(): cells[1:] for cells in (line.split("|") for line in report[1:])}
+    assert set(rows) == {"a.example", "b.example"}
+    for urls_count, failed, retries, throughput in rows.values():
+        assert (int(urls_count), int(failed), int(retries)) == (6, 0, 0)
+        assert float(throughput) <= rate * 1.5
+
+def test_token_bucket_rejects_bad_rates_and_respects_deadlines():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+    bucket = TokenBucket(rate=1, capacity=1)
+    assert bucket.acquire()
+    assert not bucket.acquire(deadline=time.monotonic() + 0.1) # the next token is a second away
+
+# --- async_fetch_all ---
+class AsyncStubFetch:
+    """Coroutine stand-in: counts concurrent calls, sleeps (task_id % 7) ms so tasks finish out of order."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.running = 0
+        self.max_running = 0
+        self.started = []
+
+    async def __call__(self, url, task_id):
+        self.started.append(task_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.001 * (task_id % 7))
+            if task_id in self.fail:
+                raise RuntimeError(f"unexpected failure for {url}")
+            return {"url": url, "status": 200}
+        finally:
+            self.running -= 1
+
+def test_async_fetch_all_limits_concurrency_and_keeps_order():
+    urls = [f"http://example.com/{i}" for i in range(50)]
+    fetch = AsyncStubFetch()
+    results = asyncio.run(async_fetch_all(urls, max_concurrency=4, fetch=fetch))
+    assert [r["url"] for r in results] == urls
+    assert fetch.max_running == 4
+
+def test_async_fetch_all_propagates_exceptions_and_stops():
+    urls = [f"http://example.com/{i}" for i in range(1000)]
+    fetch = AsyncStubFetch(fail={3})
+
+    async def run():
+        with pytest.raises(RuntimeError, match="example.com/3"):
+            await async_fetch_all(urls, max_concurrency=4, fetch=fetch)
+        # Nothing is left running in the background
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(run())
+    assert len(fetch.started) < len(urls) # no new URLs are started after the failure
+    with pytest.raises(ValueError):
+        asyncio.run(async_fetch_all(urls, max_concurrency=0))
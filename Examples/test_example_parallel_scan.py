@@ -0,0 +1,72 @@
+# test_example_parallel_scan.py
+import operator
+import random
+from itertools import accumulate
+
+import pytest
+from Example_ParallelScan import parallel_scan, plan_chunks
+
+
+def keep_first(a, b):
+    """Associative but not commutative: catches an offset combined on the wrong side."""
+    return a
+
+
+def test_plan_chunks_covers_everything_once():
+    assert plan_chunks(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert plan_chunks(2, 8) == [(0, 1), (1, 2)] # never an empty chunk
+    assert plan_chunks(0, 4) == [(0, 0)]
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+@pytest.mark.parametrize("func", [operator.add, max, min, keep_first])
+def test_parallel_scan_equals_accumulate_for_ints(workers, func):
+    rng = random.Random(workers)
+    values = [rng.randint(-10**6, 10**6) for _ in range(1001)]
+    assert parallel_scan(values, func, workers=workers) == list(accumulate(values, func))
+
+def test_parallel_scan_mul_and_floats():
+    values = [rng_value % 3 + 1 for rng_value in range(30)] # product stays within int64
+    assert parallel_scan(values, operator.mul, workers=3) == list(accumulate(values, operator.mul))
+    floats = [0.1 * i for i in range(100)]
+    assert parallel_scan(floats, workers=2) == pytest.approx(list(accumulate(floats)))
+
+def test_parallel_scan_edge_cases():
+    assert parallel_scan([], workers=2) == []
+    assert parallel_scan([42], workers=4) == [42]
+    for workers in (1, 2):
+        with pytest.raises(OverflowError): # a list never wraps around, with or without NumPy
+            parallel_scan([2**62, 2**62], workers=workers)
+        with pytest.raises(OverflowError):
+            parallel_scan([2**40, 2**40], operator.mul, workers=workers)
+
+def test_parallel_scan_exact_when_overflow_was_possible_but_did_not_happen():
+    values = [2**62, -2**62] * 500 + [3, -1] # too big for the quick bound, every running total fits
+    assert parallel_scan(values, workers=2) == list(accumulate(values))
+    factors = [-1, 2, 1, -3, 0, 5] * 20
+    assert parallel_scan(factors, operator.mul, workers=3) == list(accumulate(factors, operator.mul))
+
+def test_parallel_scan_rejects_values_it_would_change():
+    for values in ([True, False, True], [1, "2"], [1.5, None]):
+        with pytest.raises(TypeError):
+            parallel_scan(values, workers=1)
+    with pytest.raises(TypeError, match="2\\*\\*53"): # float64 would round 2**53 + 1
+        parallel_scan([2**53 + 1, 0.5], workers=1)
+    assert parallel_scan([1, 2, 0.5], workers=2) == list(accumulate([1, 2, 0.5])) # exact as floats
+
+def test_parallel_scan_falls_back_to_accumulate_for_big_ints():
+    values = [2**64, -3, 10**30, 7]
+    for workers in (1, 2):
+        assert parallel_scan(values, workers=workers) == list(accumulate(values))
+        assert parallel_scan(values, max, workers=workers) == list(accumulate(values, max))
+
+def test_parallel_scan_numpy():
+    np = pytest.importorskip("numpy")
+    values = np.arange(-5000, 5000, dtype=np.int64)
+    for func in (operator.add, max, operator.mul):
+        small = values % 3 + 1 if func is operator.mul else values
+        small = small[:30] if func is operator.mul else small
+        expected = list(accumulate(small.tolist(), func))
+        assert parallel_scan(small, func, workers=2).tolist() == expected
+    for dtype in (np.bool_, np.uint64): # would silently become 0/1 or wrap to negative int64
+        with pytest.raises(TypeError):
+            parallel_scan(np.ones(4, dtype=dtype), workers=1)
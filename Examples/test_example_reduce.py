@@ -0,0 +1,57 @@
+# test_example_reduce.py
+import math
+import operator
+import random
+from functools import reduce
+
+import pytest
+from Example_Reduce import find_max_temp, parallel_reduce, tree_reduce
+
+
+def concat(a, b):
+    """Associative but not commutative: catches partials combined out of order."""
+    return a + b
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+@pytest.mark.parametrize("func", [operator.add, max, min, find_max_temp, math.gcd])
+def test_parallel_reduce_equals_reduce(workers, func):
+    rng = random.Random(workers)
+    values = [rng.randint(1, 10**6) for _ in range(1001)]
+    assert parallel_reduce(func, values, workers=workers) == reduce(func, values)
+    assert parallel_reduce(func, values, 7, workers=workers, chunk_size=10) == reduce(func, values, 7)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_reduce_keeps_order(workers):
+    words = [str(i) for i in range(200)]
+    assert parallel_reduce(concat, words, ">", workers=workers, chunk_size=7) == ">" + "".join(words)
+
+def test_parallel_reduce_accepts_ranges_and_iterators():
+    assert parallel_reduce(operator.add, range(100_001), workers=2) == sum(range(100_001))
+    assert parallel_reduce(operator.add, (i for i in range(1000)), workers=2, chunk_size=64) == sum(range(1000))
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_reduce_edge_cases_match_reduce(workers):
+    with pytest.raises(TypeError):
+        parallel_reduce(operator.add, [], workers=workers)
+    with pytest.raises(TypeError):
+        parallel_reduce(operator.add, iter([]), workers=workers)
+    assert parallel_reduce(operator.add, [], 0, workers=workers) == 0
+    assert parallel_reduce(operator.add, [], None, workers=workers) is None # None is a real initializer
+    assert parallel_reduce(operator.add, [100], workers=workers) == 100
+    assert parallel_reduce(operator.add, [100], 1000, workers=workers) == 1100
+    single = object() # func is never called for a single item, like reduce (object() + ... would raise)
+    result = parallel_reduce(operator.add, [single], workers=workers)
+    assert result is single if workers == 1 else type(result) is object # a pickled copy from a worker
+
+def test_tree_reduce_shape():
+    calls = []
+
+    def record(a, b):
+        calls.append((a, b))
+        return a + b
+
+    assert tree_reduce(record, ["a", "b", "c", "d", "e"]) == "abcde"
+    assert calls == [("a", "b"), ("c", "d"), ("ab", "cd"), ("abcd", "e")]
+    with pytest.raises(TypeError):
+        tree_reduce(record, [])
@@ -0,0 +1,67 @@
+# test_example_running_stats.py
+import math
+import random
+import statistics
+import tracemalloc
+from itertools import accumulate, islice
+
+import pytest
+from Example_RunningStats import (
+    LogCumulativeProduct, RunningMax, RunningMeanVariance, RunningMin, SlidingWindowMax, running_stats,
+    sensor_readings,
+)
+
+
+def test_running_max_min_match_accumulate():
+    values = [random.Random(1).randint(-50, 50) for _ in range(500)]
+    high, low = RunningMax(), RunningMin()
+    assert [high.update(x) for x in values] == list(accumulate(values, max))
+    assert [low.update(x) for x in values] == list(accumulate(values, min))
+
+@pytest.mark.parametrize("window", [1, 2, 5, 64])
+def test_sliding_window_max_matches_brute_force(window):
+    rng = random.Random(window)
+    values = [rng.randint(0, 20) for _ in range(300)] # many ties
+    operator = SlidingWindowMax(window)
+    assert [operator.update(x) for x in values] == \
+           [max(values[max(0, i - window + 1):i + 1]) for i in range(len(values))]
+    with pytest.raises(ValueError):
+        SlidingWindowMax(0)
+
+def test_welford_matches_statistics_and_stays_stable():
+    rng = random.Random(2)
+    values = [1e9 + rng.random() for _ in range(10_000)] # big offset: sum-of-squares would lose the variance
+    operator = RunningMeanVariance()
+    for x in values:
+        result = operator.update(x)
+    assert result.count == len(values)
+    assert result.mean == pytest.approx(statistics.fmean(values), rel=1e-15)
+    assert result.variance == pytest.approx(statistics.pvariance(values), rel=1e-6)
+
+def test_log_product_signs_zero_and_overflow():
+    product = LogCumulativeProduct()
+    values = [2.0, -3.0, 0.5, -4.0]
+    results = [product.update(x) for x in values]
+    assert [r.value for r in results] == pytest.approx(list(accumulate(values, lambda a, b: a * b)))
+
+    product.update(1e308)
+    product.update(1e308)
+    assert product.sign == 1 and product.log_abs == pytest.approx(math.log(12) + 2 * math.log(1e308))
+    assert product.update(-1.0).value == -math.inf
+
+    assert product.update(0).value == 0.0
+    assert product.update(5).sign == 0 # stays zero
+
+def test_running_stats_one_pass_constant_memory():
+    readings = islice(sensor_readings(), 20_000) # an iterator: it can only be read once
+    tracemalloc.start()
+    try:
+        for stats in running_stats(readings, high=RunningMax(), window=SlidingWindowMax(10),
+                                   mv=RunningMeanVariance()):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert stats["mv"].count == 20_000
+    assert stats["high"] >= stats["window"] == max(list(islice(sensor_readings(), 20_000))[-10:])
+    assert peak < 100_000 # bytes; a list of 20k readings alone would be several times that
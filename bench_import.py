@@ -0,0 +1,45 @@
+# bench_import.py - import cost of the Day1/Day2 scripts, measured with `python -X importtime`
+# Usage: python bench_import.py [runs]   (from the repository root; covers every DayN folder listed below)
+import os
+import subprocess
+import sys
+from typing import Optional
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+MODULES = [
+    ("Day1", os.path.join(REPO_ROOT, "Day1")),
+    ("Day2", os.path.join(REPO_ROOT, "Day2")),
+]
+
+
+def import_time_us(module: str, path: str) -> Optional[int]:
+    """
+    Cumulative import time of `module` in microseconds, from a fresh interpreter.
+    stdin is closed, so a module that still called input() at import would fail here.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=path, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    if completed.returncode != 0:
+        return None
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    for line in completed.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return None
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for module, path in MODULES:
+        times = [import_time_us(module, path) for _ in range(runs)]
+        if None in times:
+            print(f"{module:15s} import failed (side effects at import time?)")
+        else:
+            print(f"{module:15s} best {min(times):6d} us, worst {max(times):6d} us over {runs} runs")
+
+
+if __name__ == "__main__":
+    main()